@@ -15,12 +15,51 @@ DB_CONFIG = {
 ARQUIVO_FAZENDAS = 'dados/fazendas.json'
 ARQUIVO_COLHEITAS = 'dados/colheitas.json'
 ARQUIVO_LOGS = 'dados/logs.txt'
+ARQUIVO_QUANTIS = 'dados/quantis.json'  # esboços de percentis (modulos.quantis)
+ARQUIVO_DIARIO_COLHEITAS = 'dados/colheitas_diario.jsonl'  # alterações após o snapshot
+ARQUIVO_BINARIO = 'dados/dados.bin'  # snapshot binário de fazendas e colheitas (modulos.binario)
+ARQUIVO_COLUNAR = 'dados/colheitas.col'  # colunas para leitura com mmap (modulos.mapeado)
+
+# Gravação das colheitas:
+# 'json' = reescreve colheitas.json inteiro a cada gravação;
+# 'diario' = acrescenta só as alterações ao diário (uma linha JSON cada) e
+# compacta o diário em colheitas.json ao atingir COMPACTAR_DIARIO_A_CADA linhas
+MODO_GRAVACAO_COLHEITAS = 'diario'
+COMPACTAR_DIARIO_A_CADA = 5000
+
+# Compressão dos arquivos JSON, do diário e dos backups (biblioteca padrão):
+# None = sem compressão; 'gzip' (.gz), 'lzma' (.xz) ou 'bz2' (.bz2).
+# Arquivos gravados com outro codec continuam sendo lidos (pela extensão).
+COMPRESSAO_ARQUIVOS = None
+
+# Armazenamento das colheitas em memória:
+# 'lista' = lista de dicionários; 'colunar' = arrays tipados (modulos.colunar)
+BACKEND_COLHEITAS = 'lista'
+
+# Usa NumPy nas análises (modulos.analise_numpy) quando estiver instalado;
+# nas colheitas em memória, só com BACKEND_COLHEITAS = 'colunar'
+USAR_NUMPY = True
+
+# Capacidade dos esboços de percentis (maior = mais preciso e mais memória)
+TAMANHO_ESBOCO_QUANTIS = 200
+
+# Agregação paralela do dashboard (modulos.paralelo):
+# processos a usar (1 = desativada; None = todos os núcleos) e o mínimo de
+# colheitas para compensar a criação dos processos
+PROCESSOS_AGREGACAO = 1
+MIN_COLHEITAS_PARALELO = 200000
+
+# Linhas por página da tabela de desempenho
+TAMANHO_PAGINA_TABELA = 20
 
 # Tuplas de configuração (dados imutáveis)
 TIPOS_COLHEITA = ('manual', 'mecânica', 'mista')
 TIPOS_PERDA = ('mecânica', 'raizame', 'palha', 'climática', 'pragas')
 VARIEDADES_CANA = ('RB867515', 'RB966928', 'SP813250', 'CTC4', 'CTC20')
 
+# Mês de início da safra (Centro-Sul: safra de abril a março do ano seguinte)
+MES_INICIO_SAFRA = 4
+
 # Parâmetros de análise (tupla)
 PARAMETROS_ANALISE = (
     ('perda_baixa', 5.0),      # até 5%
@@ -29,6 +68,14 @@ PARAMETROS_ANALISE = (
     ('perda_critica', float('inf'))  # acima de 15%
 )
 
+# Ícone de status de cada faixa de PARAMETROS_ANALISE (modulos.classificacao)
+ICONES_STATUS = {
+    'perda_baixa': "✓ ÓTIMO",
+    'perda_media': "⚠️ BOM",
+    'perda_alta': "⚠️ ATENÇÃO",
+    'perda_critica': "❌ CRÍTICO",
+}
+
 # Produtividade esperada por variedade (dicionário)
 PRODUTIVIDADE_ESPERADA = {
     'RB867515': 85.0,
@@ -38,6 +85,61 @@ PRODUTIVIDADE_ESPERADA = {
     'CTC20': 92.0
 }
 
+# Regras de recomendação (modulos.regras)
+# Cada regra: condições (campo, operador, limite), todas obrigatórias, e as
+# mensagens geradas quando dispara. Regras do mesmo 'grupo' são exclusivas:
+# vale a primeira que disparar, na ordem da tupla.
+# Campos: qualquer campo da colheita, 'perdas.<tipo>' (perda detalhada;
+# sem registro do tipo a regra não dispara) e 'produtividade_relativa'
+# (produtividade / PRODUTIVIDADE_ESPERADA da variedade).
+# Mensagens podem usar campos da colheita entre chaves (ex: {variedade}).
+REGRAS_RECOMENDACAO = (
+    {'id': 'perda_critica', 'grupo': 'perda_total',
+     'condicoes': (('percentual_perda_total', '>', 15),),
+     'mensagens': ("🚨 URGENTE: Perdas críticas! Requer ação imediata.",)},
+    {'id': 'perda_acima_media', 'grupo': 'perda_total',
+     'condicoes': (('percentual_perda_total', '>', 10),),
+     'mensagens': ("⚠️ Perdas acima da média. Revisar processo de colheita.",)},
+    {'id': 'perda_excelente', 'grupo': 'perda_total',
+     'condicoes': (('percentual_perda_total', '<=', 5),),
+     'mensagens': ("✓ Excelente desempenho! Manter práticas atuais.",)},
+    {'id': 'perda_mecanica',
+     'condicoes': (('perdas.mecânica', '>', 5),),
+     'mensagens': ("🔧 Revisar regulagem da colheitadeira (velocidade, altura de corte).",
+                   "📋 Verificar manutenção preventiva do equipamento.")},
+    {'id': 'perda_raizame',
+     'condicoes': (('perdas.raizame', '>', 3),),
+     'mensagens': ("🌱 Ajustar altura de corte para evitar arrancamento de raízes.",)},
+    {'id': 'perda_palha',
+     'condicoes': (('perdas.palha', '>', 3),),
+     'mensagens': ("🍂 Otimizar sistema de limpeza e extração da palha.",)},
+    {'id': 'perda_climatica',
+     'condicoes': (('perdas.climática', '>', 2),),
+     'mensagens': ("🌦️ Planejar colheita em períodos mais favoráveis.",
+                   "📅 Considerar sistema de monitoramento meteorológico.")},
+    {'id': 'perda_pragas',
+     'condicoes': (('perdas.pragas', '>', 2),),
+     'mensagens': ("🐛 Implementar controle integrado de pragas.",
+                   "🔬 Realizar análise fitossanitária do talhão.")},
+    {'id': 'mecanica_perda_alta',
+     'condicoes': (('tipo_colheita', '==', 'mecânica'), ('percentual_perda_total', '>', 10)),
+     'mensagens': ("👨‍🌾 Considerar colheita manual em talhões críticos.",
+                   "📊 Comparar custo-benefício entre métodos de colheita.")},
+    {'id': 'produtividade_baixa',
+     'condicoes': (('produtividade_relativa', '<', 0.8),),  # 80% do esperado
+     'mensagens': ("📉 Produtividade abaixo do esperado para {variedade}.",
+                   "🌾 Revisar manejo do talhão (adubação, irrigação).")},
+)
+
+# Capacidade do cache de recomendações por conteúdo da colheita (LRU)
+TAMANHO_CACHE_RECOMENDACOES = 1024
+
+# Recomendações quando nenhuma regra dispara
+RECOMENDACOES_PADRAO = (
+    "✓ Operação dentro dos parâmetros normais.",
+    "💡 Continuar monitoramento regular.",
+)
+
 # Mensagens do sistema (dicionário)
 MENSAGENS = {
     'sucesso_cadastro': '✓ Cadastro realizado com sucesso!',
@@ -0,0 +1,44 @@
+"""
+Benchmark: snapshot JSON x snapshot binário (modulos.binario)
+Mede tamanho em disco e tempo de gravação e de carga das colheitas
+
+Uso:
+    python scripts/benchmarks/benchmark_binario.py [quantidade]
+"""
+
+import os
+import sys
+
+from dados_sinteticos import gerar_colheitas, medir_tempo, diretorio_temporario
+from modulos import arquivo, binario
+from modulos.registros import Colheita
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    colheitas = [Colheita.from_dict(c) for c in gerar_colheitas(quantidade)]
+
+    with diretorio_temporario():
+        caminho_json = arquivo.ARQUIVO_COLHEITAS
+        caminho_binario = arquivo.ARQUIVO_BINARIO
+
+        t_grava_json = medir_tempo(lambda: arquivo.compactar_diario(colheitas))
+        t_grava_binario = medir_tempo(lambda: binario.gravar_snapshot(caminho_binario, [], colheitas))
+        t_carga_json = medir_tempo(lambda: list(arquivo.iterar_colheitas_json()))
+        t_carga_binario = medir_tempo(lambda: binario.ler_snapshot(caminho_binario))
+
+        tamanho_json = os.path.getsize(caminho_json)
+        tamanho_binario = os.path.getsize(caminho_binario)
+
+    print(f"Colheitas: {quantidade:,}")
+    print(f"{'':24}{'JSON':>14}{'binário':>14}{'razão':>10}")
+    print(f"{'Tamanho (MB)':24}{tamanho_json / 2**20:14.1f}{tamanho_binario / 2**20:14.1f}"
+          f"{tamanho_json / tamanho_binario:9.1f}x")
+    print(f"{'Gravação (ms)':24}{t_grava_json * 1000:14.1f}{t_grava_binario * 1000:14.1f}"
+          f"{t_grava_json / t_grava_binario:9.1f}x")
+    print(f"{'Carga (ms)':24}{t_carga_json * 1000:14.1f}{t_carga_binario * 1000:14.1f}"
+          f"{t_carga_json / t_carga_binario:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
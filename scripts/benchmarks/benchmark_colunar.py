@@ -0,0 +1,64 @@
+"""
+Benchmark: lista de dicionários x armazém colunar (modulos.colunar)
+Mede memória ocupada (tracemalloc) e tempo de agregação
+
+Uso:
+    python scripts/benchmarks/benchmark_colunar.py [quantidade]
+"""
+
+import sys
+import tracemalloc
+
+from dados_sinteticos import gerar_colheitas, medir_tempo
+from modulos.colunar import ArmazemColunar
+
+
+def medir_memoria(construir):
+    """Retorna (objeto, bytes alocados) ao executar a função construir"""
+    tracemalloc.start()
+    objeto = construir()
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, memoria
+
+
+def agregar_lista(colheitas):
+    """Produção e área por variedade sobre a lista de dicionários"""
+    resultado = {}
+    for c in colheitas:
+        soma = resultado.setdefault(c['variedade'], [0.0, 0.0])
+        soma[0] += c['quantidade_colhida']
+        soma[1] += c['area_colhida']
+    return resultado
+
+
+def agregar_colunar(armazem):
+    """Produção e área por variedade sobre as colunas"""
+    producao = armazem.somar_por('quantidade_colhida', 'variedade')
+    area = armazem.somar_por('area_colhida', 'variedade')
+    return {v: [producao[v][0], area[v][0]] for v in producao}
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    lista, mem_lista = medir_memoria(lambda: gerar_colheitas(quantidade))
+    armazem, mem_colunar = medir_memoria(lambda: ArmazemColunar(lista))
+
+    t_lista = medir_tempo(lambda: agregar_lista(lista))
+    t_colunar = medir_tempo(lambda: agregar_colunar(armazem))
+    t_soma_lista = medir_tempo(lambda: sum(c['quantidade_colhida'] for c in lista))
+    t_soma_colunar = medir_tempo(lambda: armazem.somar('quantidade_colhida'))
+
+    print(f"Colheitas: {quantidade:,}")
+    print(f"{'':28}{'lista de dicts':>16}{'colunar':>16}{'razão':>10}")
+    print(f"{'Memória (MB)':28}{mem_lista / 2**20:16.1f}{mem_colunar / 2**20:16.1f}"
+          f"{mem_lista / mem_colunar:9.1f}x")
+    print(f"{'Soma produção (ms)':28}{t_soma_lista * 1000:16.1f}{t_soma_colunar * 1000:16.1f}"
+          f"{t_soma_lista / t_soma_colunar:9.1f}x")
+    print(f"{'Agrupado por variedade (ms)':28}{t_lista * 1000:16.1f}{t_colunar * 1000:16.1f}"
+          f"{t_lista / t_colunar:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
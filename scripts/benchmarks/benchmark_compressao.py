@@ -0,0 +1,49 @@
+"""
+Benchmark: compressão dos arquivos de dados (COMPRESSAO_ARQUIVOS)
+Para cada codec mede o tamanho de colheitas.json e os tempos de gravação
+(snapshot) e de leitura (iterar_colheitas_json)
+
+Uso:
+    python scripts/benchmarks/benchmark_compressao.py [quantidade] [repeticoes]
+"""
+
+import os
+import sys
+
+from dados_sinteticos import gerar_colheitas, medir_tempo, diretorio_temporario
+from modulos import arquivo
+from modulos.registros import Colheita
+
+
+CODECS = (None, *arquivo.CODECS_COMPRESSAO)
+
+
+def medir_codec(codec, colheitas, repeticoes):
+    """Retorna (bytes, gravação, leitura) de um codec"""
+    arquivo.COMPRESSAO_ARQUIVOS = codec
+
+    t_gravacao = medir_tempo(lambda: arquivo.compactar_diario(colheitas), repeticoes)
+    t_leitura = medir_tempo(lambda: sum(1 for _ in arquivo.iterar_colheitas_json()), repeticoes)
+    tamanho = os.path.getsize(arquivo.caminho_compactado(arquivo.ARQUIVO_COLHEITAS))
+    return tamanho, t_gravacao, t_leitura
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    colheitas = [Colheita.from_dict(c) for c in gerar_colheitas(quantidade)]
+
+    with diretorio_temporario():
+        resultados = {codec: medir_codec(codec, colheitas, repeticoes) for codec in CODECS}
+
+    tamanho_original = resultados[None][0]
+    print(f"Colheitas: {quantidade:,}")
+    print(f"{'Codec':10}{'Tamanho (MB)':>14}{'razão':>8}{'Gravação (s)':>14}"
+          f"{'Leitura (s)':>13}")
+    for codec, (tamanho, t_gravacao, t_leitura) in resultados.items():
+        print(f"{codec or 'nenhum':10}{tamanho / 2**20:14.1f}{tamanho_original / tamanho:7.1f}x"
+              f"{t_gravacao:14.2f}{t_leitura:13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: carga do JSON x abertura do arquivo colunar mapeado (modulos.mapeado)
+Mede o tempo até os dados estarem prontos para análise e o tempo de uma
+análise vetorizada (modulos.analise_numpy) em memória e sobre o mapeamento
+
+Uso:
+    python scripts/benchmarks/benchmark_mapeado.py [quantidade]
+"""
+
+import os
+import sys
+
+from dados_sinteticos import gerar_colheitas, medir_tempo, diretorio_temporario
+from modulos import arquivo, analise_numpy, mapeado
+from modulos.colunar import ArmazemColunar
+
+
+def abrir_e_fechar(caminho):
+    """Abre o arquivo mapeado (lê o cabeçalho) e o fecha"""
+    with mapeado.ColheitasMapeadas(caminho) as mapeadas:
+        return len(mapeadas)
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    armazem = ArmazemColunar(gerar_colheitas(quantidade))
+
+    with diretorio_temporario():
+        caminho_colunar = arquivo.ARQUIVO_COLUNAR
+        arquivo.compactar_diario(armazem)
+        mapeado.gravar_mapeado(caminho_colunar, armazem)
+
+        t_carga_json = medir_tempo(lambda: ArmazemColunar(arquivo.iterar_colheitas_json()))
+        t_abertura = medir_tempo(lambda: abrir_e_fechar(caminho_colunar))
+
+        analisar = analise_numpy.analisar_produtividade_por_variedade
+        t_analise_memoria = medir_tempo(lambda: analisar(armazem))
+        with mapeado.ColheitasMapeadas(caminho_colunar) as mapeadas:
+            t_analise_mapeada = medir_tempo(lambda: analisar(mapeadas))
+            t_soma_memoria = medir_tempo(lambda: armazem.somar('quantidade_colhida'))
+            t_soma_mapeada = medir_tempo(lambda: mapeadas.somar('quantidade_colhida'))
+
+        tamanho_json = os.path.getsize(arquivo.ARQUIVO_COLHEITAS)
+        tamanho_colunar = os.path.getsize(caminho_colunar)
+
+    print(f"Colheitas: {quantidade:,}")
+    print(f"{'':32}{'JSON/memória':>14}{'mapeado':>14}{'razão':>10}")
+    print(f"{'Tamanho do arquivo (MB)':32}{tamanho_json / 2**20:14.1f}{tamanho_colunar / 2**20:14.1f}"
+          f"{tamanho_json / tamanho_colunar:9.1f}x")
+    print(f"{'Inicialização (ms)':32}{t_carga_json * 1000:14.1f}{t_abertura * 1000:14.3f}"
+          f"{t_carga_json / t_abertura:9.0f}x")
+    print(f"{'Análise por variedade (ms)':32}{t_analise_memoria * 1000:14.1f}{t_analise_mapeada * 1000:14.1f}"
+          f"{t_analise_memoria / t_analise_mapeada:9.1f}x")
+    print(f"{'Soma da produção (ms)':32}{t_soma_memoria * 1000:14.1f}{t_soma_mapeada * 1000:14.1f}"
+          f"{t_soma_memoria / t_soma_mapeada:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
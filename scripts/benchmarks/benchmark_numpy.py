@@ -0,0 +1,110 @@
+"""
+Benchmark: análises em Python puro x backend NumPy (modulos.analise_numpy)
+Mede analisar_produtividade_por_variedade, identificar_talhoes_criticos
+(com período) e comparar_metodos_colheita pelo mesmo despacho usado no
+sistema (modulos.analise) para 10 mil, 100 mil e 1 milhão de colheitas:
+
+    python lista    BACKEND_COLHEITAS = 'lista' (padrão: sempre Python puro)
+    python colunar  BACKEND_COLHEITAS = 'colunar' com USAR_NUMPY = False
+    numpy 1ª        colunar com NumPy logo após uma alteração dos dados
+                    (inclui empacotar as colunas)
+    numpy cache     colunar com NumPy e o pacote já montado
+
+O ganho compara a primeira chamada NumPy (com o empacotamento) ao padrão.
+Cada armazenamento é medido em um processo próprio (o tipo da lista
+global de colheitas é definido na importação dos módulos).
+
+Uso:
+    python scripts/benchmarks/benchmark_numpy.py [quantidade ...]
+"""
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+
+from dados_sinteticos import gerar_colheitas, medir_tempo
+import config  # noqa: E402  (caminho incluído por dados_sinteticos)
+
+
+# Análises medidas, chamadas sem o cache de resultados (__wrapped__)
+ANALISES = {
+    'variedade': lambda analise: analise.analisar_produtividade_por_variedade.__wrapped__(),
+    'talhoes': lambda analise: analise.identificar_talhoes_criticos.__wrapped__('01/01/1900', '31/12/2999'),
+    'metodos': lambda analise: analise.comparar_metodos_colheita.__wrapped__(),
+}
+
+
+def medir_armazenamento(backend, quantidades):
+    """
+    Mede as análises em um armazenamento (executado no processo filho)
+
+    Parâmetros:
+        backend (str): 'lista' ou 'colunar'
+        quantidades (list): quantidades de colheitas
+
+    Retorna:
+        dict: quantidade -> análise -> {medida: segundos}
+    """
+    config.BACKEND_COLHEITAS = backend
+    with contextlib.redirect_stdout(io.StringIO()):
+        from modulos import analise, cache, colheita
+
+    resultados = {}
+    for quantidade in quantidades:
+        with contextlib.redirect_stdout(io.StringIO()):
+            colheita.carregar_colheitas(gerar_colheitas(quantidade))
+
+        tempos = {}
+        for nome, funcao in ANALISES.items():
+            analise.USAR_NUMPY = False
+            tempos[nome] = {'python': medir_tempo(lambda: funcao(analise))}
+            if backend != 'colunar':
+                continue
+
+            analise.USAR_NUMPY = True
+
+            def primeira_chamada():
+                cache.registrar_alteracao()
+                funcao(analise)
+
+            tempos[nome]['numpy_primeira'] = medir_tempo(primeira_chamada)
+            analise.pacote_colheitas()
+            tempos[nome]['numpy_cache'] = medir_tempo(lambda: funcao(analise))
+        resultados[quantidade] = tempos
+
+    return resultados
+
+
+def main():
+    if sys.argv[1:2] == ['--armazenamento']:
+        quantidades = [int(q) for q in sys.argv[3:]]
+        print(json.dumps(medir_armazenamento(sys.argv[2], quantidades)))
+        return
+
+    from modulos import analise_numpy
+    if not analise_numpy.NUMPY_DISPONIVEL:
+        print("NumPy não instalado: pip install numpy")
+        return
+
+    quantidades = [int(q) for q in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    resultados = {}
+    for backend in ('lista', 'colunar'):
+        processo = subprocess.run([sys.executable, __file__, '--armazenamento', backend, *map(str, quantidades)],
+                                  capture_output=True, text=True, check=True)
+        resultados[backend] = json.loads(processo.stdout.splitlines()[-1])
+
+    print(f"{'colheitas':>10} {'análise':>10} {'python lista':>13} {'python colunar':>15}"
+          f" {'numpy 1ª':>9} {'numpy cache':>12} {'ganho':>7}   (ms)")
+    for quantidade in map(str, quantidades):
+        for nome in ANALISES:
+            t_lista = resultados['lista'][quantidade][nome]['python'] * 1000
+            colunar = {medida: t * 1000 for medida, t in resultados['colunar'][quantidade][nome].items()}
+            print(f"{int(quantidade):>10,} {nome:>10} {t_lista:13.1f} {colunar['python']:15.1f}"
+                  f" {colunar['numpy_primeira']:9.1f} {colunar['numpy_cache']:12.1f}"
+                  f" {t_lista / colunar['numpy_primeira']:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
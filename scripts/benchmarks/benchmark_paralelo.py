@@ -0,0 +1,49 @@
+"""
+Benchmark: agregação paralela por fazenda (modulos.paralelo)
+Mede agregar_em_paralelo com 1, 2, 4... processos (até o número de núcleos)
+e compara com a agregação em um único processo
+
+Uso:
+    python scripts/benchmarks/benchmark_paralelo.py [quantidade] [max_processos]
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+from dados_sinteticos import gerar_colheitas, medir_tempo
+from modulos import colheita, paralelo
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    max_processos = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    print(f"Gerando e carregando {quantidade:,} colheitas...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        colheita.carregar_colheitas(gerar_colheitas(quantidade))
+    print(f"Núcleos disponíveis: {os.cpu_count()}\n")
+
+    contagens = [1]
+    while contagens[-1] * 2 <= max_processos:
+        contagens.append(contagens[-1] * 2)
+    if contagens[-1] != max_processos:
+        contagens.append(max_processos)
+
+    referencia = paralelo.agregar_em_paralelo(1)
+    print(f"{'processos':>9} {'com esboços (s)':>16} {'só somas (s)':>13} {'aceleração':>11}")
+    base = None
+    for processos in contagens:
+        resultado = paralelo.agregar_em_paralelo(processos)
+        assert resultado['total'][0] == referencia['total'][0]
+        assert resultado['por_status'] == referencia['por_status']
+
+        com_esbocos = medir_tempo(lambda: paralelo.agregar_em_paralelo(processos))
+        so_somas = medir_tempo(lambda: paralelo.agregar_em_paralelo(processos, incluir_esbocos=False))
+        base = base or com_esbocos
+        print(f"{processos:>9} {com_esbocos:16.2f} {so_somas:13.2f} {base / com_esbocos:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
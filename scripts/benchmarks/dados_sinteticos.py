@@ -0,0 +1,113 @@
+"""
+Geração de colheitas sintéticas e utilitários comuns aos benchmarks
+Produz dicionários no mesmo formato de modulos.colheita.criar_colheita,
+sem passar pelas validações (para gerar milhões de registros rapidamente)
+"""
+
+import contextlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Permite importar os módulos do sistema (src/) e o config (config/)
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+sys.path.insert(0, os.path.join(RAIZ, 'config'))
+
+from config import TIPOS_COLHEITA, TIPOS_PERDA, VARIEDADES_CANA, PARAMETROS_ANALISE  # noqa: E402
+
+
+def _classificar(percentual):
+    for nome, limite in PARAMETROS_ANALISE:
+        if percentual <= limite:
+            return nome.replace('_', ' ').upper()
+    return "PERDA CRÍTICA"
+
+
+def gerar_colheitas(quantidade, num_fazendas=200, talhoes_por_fazenda=20, semente=42):
+    """
+    Gera uma lista de colheitas sintéticas
+
+    Parâmetros:
+        quantidade (int): número de colheitas
+        num_fazendas (int): número de fazendas distintas
+        talhoes_por_fazenda (int): talhões por fazenda
+        semente (int): semente do gerador aleatório (resultados reprodutíveis)
+
+    Retorna:
+        list: lista de dicionários de colheita
+    """
+    aleatorio = random.Random(semente)
+    inicio = date(2019, 4, 1).toordinal()
+    fim = date(2025, 3, 31).toordinal()
+    colheitas = []
+
+    for i in range(1, quantidade + 1):
+        id_fazenda = aleatorio.randint(1, num_fazendas)
+        codigo = f"T{aleatorio.randint(1, talhoes_por_fazenda):02d}"
+        ordinal = aleatorio.randint(inicio, fim)
+        # Registro no dia da colheita, com hora ao segundo (como carimbo_agora)
+        registro = datetime.fromordinal(ordinal) + timedelta(seconds=aleatorio.randint(6 * 3600, 20 * 3600))
+        area = round(aleatorio.uniform(5, 50), 1)
+        produtividade = aleatorio.uniform(60, 120)
+        colhida = area * produtividade
+
+        perdas = {}
+        for tipo in aleatorio.sample(TIPOS_PERDA, aleatorio.randint(1, 3)):
+            perdas[tipo] = round(aleatorio.uniform(0.1, 8), 1)
+        total = sum(perdas.values())
+        perdida = colhida / (1 - total / 100) - colhida
+
+        colheitas.append({
+            'id': i,
+            'id_fazenda': id_fazenda,
+            'nome_fazenda': f"Fazenda {id_fazenda}",
+            'codigo_talhao': codigo,
+            'data_colheita': date.fromordinal(ordinal).strftime('%d/%m/%Y'),
+            'data_ordinal': ordinal,
+            'data_registro': registro.strftime('%d/%m/%Y %H:%M:%S'),
+            'tipo_colheita': aleatorio.choice(TIPOS_COLHEITA),
+            'area_colhida': area,
+            'variedade': aleatorio.choice(VARIEDADES_CANA),
+            'quantidade_colhida': round(colhida, 2),
+            'quantidade_perdida': round(perdida, 2),
+            'produtividade': round(produtividade, 2),
+            'perdas_detalhadas': perdas,
+            'resumo_perdas': tuple(sorted(perdas.items(), key=lambda x: x[1], reverse=True)),
+            'percentual_perda_total': round(total, 2),
+            'status': _classificar(total),
+        })
+
+    return colheitas
+
+
+def medir_tempo(funcao, repeticoes=3):
+    """Retorna o menor tempo (segundos) entre as repetições"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+@contextlib.contextmanager
+def diretorio_temporario():
+    """
+    Executa o bloco em um diretório temporário com a pasta dados/
+    Os caminhos de config são relativos ao diretório atual: os arquivos
+    gravados pelo benchmark ficam no temporário, removido ao final
+    """
+    diretorio_original = os.getcwd()
+    temporario = tempfile.mkdtemp()
+    os.chdir(temporario)
+    try:
+        os.makedirs('dados')
+        yield temporario
+    finally:
+        os.chdir(diretorio_original)
+        shutil.rmtree(temporario, ignore_errors=True)
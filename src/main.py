@@ -5,10 +5,11 @@ Projeto: FIAP - Cap 6 - Python e Além
 
 import os
 import sys
+import time
 from datetime import datetime
 
 # Importação dos módulos
-from modulos import validacao, fazenda, colheita, analise, arquivo, database
+from modulos import validacao, fazenda, colheita, analise, analise_numpy, arquivo, database, cache, consolidacao, cubo, quantis, regras
 from config import TIPOS_COLHEITA, TIPOS_PERDA, VARIEDADES_CANA
 
 
@@ -161,7 +162,7 @@ def buscar_fazenda_id():
     
     if f:
         fazenda.exibir_fazenda_detalhada(f)
-    else
+    else:
         print(f"\nFazenda com ID {id_fazenda} nao encontrada!")
     
     pausar()
@@ -247,7 +248,7 @@ def adicionar_talhao():
     
     # Lista fazendas disponíveis
     lista = fazenda.listar_fazendas()
-    if not lista
+    if not lista:
         print("\nNenhuma fazenda cadastrada! Cadastre uma fazenda primeiro.")
         pausar()
         return
@@ -362,6 +363,7 @@ def menu_colheitas():
         print("4 - Colheitas de uma fazenda")
         print("5 - Colheitas de um talhao")
         print("6 - Estatisticas de colheitas")
+        print("7 - Colheitas por periodo ou safra")
         print("0 - Voltar")
         
         opcao = input("\nOpcao: ").strip()
@@ -378,6 +380,8 @@ def menu_colheitas():
             listar_colheitas_talhao()
         elif opcao == '6':
             exibir_estatisticas_colheitas()
+        elif opcao == '7':
+            listar_colheitas_periodo()
         elif opcao == '0':
             break
         else:
@@ -575,6 +579,38 @@ def listar_colheitas_talhao():
     pausar()
 
 
+def listar_colheitas_periodo():
+    """Lista colheitas de um período ou de uma safra"""
+    print("\n" + "=" * 70)
+    print("COLHEITAS POR PERIODO OU SAFRA")
+    print("=" * 70)
+    
+    safra = input("Safra (AAAA/AAAA) ou ENTER para informar datas: ").strip()
+    
+    if safra:
+        lista = colheita.buscar_colheitas_safra(safra)
+        titulo = f"Safra {safra}"
+    else:
+        inicio = input("Data inicial (DD/MM/AAAA): ").strip() or None
+        fim = input("Data final (DD/MM/AAAA): ").strip() or None
+        lista = colheita.buscar_colheitas_periodo(inicio, fim)
+        titulo = f"Periodo {inicio or '...'} a {fim or '...'}"
+    
+    if not lista:
+        print("\nNenhuma colheita encontrada.")
+    else:
+        print(f"\n{titulo}")
+        print("-" * 70)
+        
+        for c in lista:
+            print(f"\n  ID {c['id']}: {c['data_colheita']} - {c['nome_fazenda']} / {c['codigo_talhao']}")
+            print(f"  Producao: {c['quantidade_colhida']:.2f} t | Perda: {c['percentual_perda_total']:.2f}%")
+        
+        print(f"\nTotal: {len(lista)} colheita(s)")
+    
+    pausar()
+
+
 def exibir_estatisticas_colheitas():
     """Exibe estatísticas das colheitas"""
     print("\n" + "=" * 70)
@@ -620,10 +656,17 @@ def menu_analises():
         print("4 - Analise por Variedade")
         print("5 - Comparar Metodos de Colheita")
         print("6 - Identificar Talhoes Criticos")
+        print("7 - Estatisticas do Cache")
+        print("8 - Consolidado por Mes e Safra")
+        print("9 - Cubo de Perdas (dimensoes e filtros)")
+        print("10 - Analise rapida do arquivo colunar (mmap)")
         print("0 - Voltar")
         
         opcao = input("\nOpcao: ").strip()
         
+        if opcao not in ('0', '10'):
+            garantir_colheitas_carregadas()
+        
         if opcao == '1':
             limpar_tela()
             exibir_cabecalho()
@@ -642,6 +685,14 @@ def menu_analises():
             comparar_metodos()
         elif opcao == '6':
             exibir_talhoes_criticos()
+        elif opcao == '7':
+            exibir_estatisticas_cache()
+        elif opcao == '8':
+            exibir_consolidado_periodos()
+        elif opcao == '9':
+            exibir_cubo_perdas()
+        elif opcao == '10':
+            analisar_arquivo_colunar()
         elif opcao == '0':
             break
         else:
@@ -650,13 +701,93 @@ def menu_analises():
 
 
 def exibir_tabela_desempenho():
-    """Exibe tabela de desempenho"""
-    limpar_tela()
-    exibir_cabecalho()
+    """Exibe tabela de desempenho paginada (navegação, ordenação e filtros)"""
+    pagina = 1
+    ordenar_por = None
+    decrescente = False
+    filtros = {}
+    perda_minima = None
     
-    tabela = analise.gerar_tabela_desempenho()
-    analise.exibir_tabela(tabela)
-    pausar()
+    while True:
+        limpar_tela()
+        exibir_cabecalho()
+        
+        resultado = analise.paginar_desempenho(pagina, ordenar_por=ordenar_por, decrescente=decrescente,
+                                               filtros=filtros, perda_minima=perda_minima)
+        if resultado['pagina'] > resultado['total_paginas']:
+            pagina = resultado['total_paginas']
+            continue
+        analise.exibir_pagina_desempenho(resultado)
+        
+        print("\nP - Proxima | A - Anterior | <numero> - Ir para a pagina")
+        print("O - Ordenar | F - Filtrar | L - Limpar filtros | ENTER - Voltar")
+        opcao = input("\nOpcao: ").strip().lower()
+        
+        if opcao == '':
+            break
+        elif opcao == 'p':
+            pagina += 1
+        elif opcao == 'a':
+            pagina = max(1, pagina - 1)
+        elif opcao.isdigit():
+            pagina = max(1, int(opcao))
+        elif opcao == 'o':
+            campo = input(f"Ordenar por ({', '.join(analise.ORDENACOES_DESEMPENHO)}): ").strip().lower()
+            if campo in analise.ORDENACOES_DESEMPENHO:
+                ordenar_por = campo
+                decrescente = input("Ordem decrescente? (s/n): ").strip().lower() == 's'
+                pagina = 1
+            else:
+                print("✗ Ordenação inválida!")
+                pausar()
+        elif opcao == 'f':
+            novos_filtros = ler_filtros_desempenho()
+            if novos_filtros is not None:
+                filtros, perda_minima = novos_filtros
+                pagina = 1
+        elif opcao == 'l':
+            filtros = {}
+            perda_minima = None
+            pagina = 1
+        else:
+            print("Opcao invalida!")
+            pausar()
+
+
+def ler_filtros_desempenho():
+    """
+    Lê os filtros da tabela de desempenho (ENTER = sem filtro)
+    
+    Retorna:
+        tuple: (filtros, perda_minima), ou None se alguma entrada for inválida
+    """
+    filtros = {}
+    
+    id_fazenda = input("ID da fazenda (ENTER = todas): ").strip()
+    if id_fazenda:
+        if not id_fazenda.isdigit():
+            print("✗ ID inválido!")
+            pausar()
+            return None
+        filtros['id_fazenda'] = int(id_fazenda)
+    
+    tipo = input(f"Tipo de colheita ({', '.join(TIPOS_COLHEITA)}; ENTER = todos): ").strip().lower()
+    if tipo:
+        if tipo not in TIPOS_COLHEITA:
+            print("✗ Tipo inválido!")
+            pausar()
+            return None
+        filtros['tipo_colheita'] = tipo
+    
+    perda_minima = None
+    entrada = input("Perda mínima em % (ENTER = sem mínimo): ").strip()
+    if entrada:
+        perda_minima = validacao.validar_float(entrada.replace(',', '.'))
+        if perda_minima is None:
+            pausar()
+            return None
+    
+    return filtros, perda_minima
 
 
 def exibir_analise_variedade():
@@ -690,7 +821,7 @@ def comparar_metodos():
     print("COMPARAÇÃO DE MÉTODOS DE COLHEITA")
     print("=" * 70)
     
-    comparacao = colheita.comparar_metodos_colheita()
+    comparacao = analise.comparar_metodos_colheita()
     
     print(f"\nManual:")
     print(f"  Colheitas: {comparacao['manual']['quantidade']}")
@@ -717,27 +848,249 @@ def exibir_talhoes_criticos():
     print("TALHÕES CRÍTICOS (Maiores Perdas)")
     print("=" * 70)
     
-    criticos = analise.identificar_talhoes_criticos()
+    criticos = analise.identificar_talhoes_criticos(top_k=10)
     
     if not criticos:
         print("\nNenhum dado disponivel.")
     else:
         print(f"\nTop 10 Talhoes com Maiores Perdas:\n")
-        for i, (fazenda, talhao, perda, num_colh) in enumerate(criticos[:10], 1):
+        for i, (fazenda, talhao, perda, num_colh) in enumerate(criticos, 1):
             print(f"  {i}. {fazenda} - {talhao}")
             print(f"     Perda Media: {perda}% ({num_colh} colheita(s))")
     
     pausar()
 
 
+def montar_tabela_consolidada(titulo_grupo, resumos, nome_grupo=str):
+    """
+    Monta uma tabela (lista de listas) a partir dos resumos consolidados
+    
+    Parâmetros:
+        titulo_grupo (str): título da primeira coluna
+        resumos (dict): grupo -> resumo (modulos.consolidacao)
+        nome_grupo (function): converte o grupo em texto
+    
+    Retorna:
+        list: tabela para analise.exibir_tabela
+    """
+    tabela = [[titulo_grupo, 'Colheitas', 'Producao(t)', 'Area(ha)', 'Prod.(t/ha)', 'Perda(%)']]
+    for grupo, resumo in resumos.items():
+        tabela.append([
+            nome_grupo(grupo),
+            resumo['num_colheitas'],
+            f"{resumo['producao_total']:.1f}",
+            f"{resumo['area_total']:.1f}",
+            f"{resumo['produtividade_media']:.1f}",
+            f"{resumo['perda_media']:.1f}"
+        ])
+    return tabela
+
+
+def exibir_consolidado_periodos():
+    """Exibe produção e perdas consolidadas por safra e por mês"""
+    print("\n" + "=" * 70)
+    print("CONSOLIDADO POR MES E SAFRA")
+    print("=" * 70)
+    
+    safras = consolidacao.listar_safras()
+    if not safras:
+        print("\nNenhuma colheita com data registrada.")
+        pausar()
+        return
+    
+    print(f"\nSafras disponiveis: {', '.join(safras)}")
+    safra = input("Safra (AAAA/AAAA) ou ENTER para todas: ").strip()
+    
+    if not safra:
+        analise.exibir_tabela(montar_tabela_consolidada('Safra', consolidacao.consultar_safra()))
+    elif safra not in safras:
+        print(f"\nNenhuma colheita na safra {safra}.")
+    else:
+        def nome_mes(periodo):
+            return f"{periodo[1]:02d}/{periodo[0]}"
+        
+        def nome_fazenda(id_fazenda):
+            registro = fazenda.buscar_fazenda_por_id(id_fazenda)
+            return registro['nome'][:20] if registro else f"ID {id_fazenda}"
+        
+        print(f"\nSafra {safra} - por mes:")
+        analise.exibir_tabela(montar_tabela_consolidada(
+            'Mes', consolidacao.consultar_mensal(safra=safra), nome_mes))
+        print(f"\nSafra {safra} - por fazenda:")
+        analise.exibir_tabela(montar_tabela_consolidada(
+            'Fazenda', consolidacao.consultar_safra(safra, agrupar_por='fazenda'), nome_fazenda))
+        print(f"\nSafra {safra} - por variedade:")
+        analise.exibir_tabela(montar_tabela_consolidada(
+            'Variedade', consolidacao.consultar_safra(safra, agrupar_por='variedade')))
+    
+    pausar()
+
+
+def exibir_cubo_perdas():
+    """Exibe perdas agrupadas por dimensões do cubo, com filtro opcional de fazenda"""
+    print("\n" + "=" * 70)
+    print("CUBO DE PERDAS")
+    print("=" * 70)
+    
+    print(f"\nDimensoes: {', '.join(cubo.DIMENSOES)}")
+    entrada = input("Agrupar por (ex: variedade,tipo_colheita,mes) [variedade,tipo_colheita]: ").strip()
+    dimensoes = tuple(d.strip() for d in (entrada or 'variedade,tipo_colheita').split(',') if d.strip())
+    
+    filtros = {}
+    id_fazenda = input("ID da fazenda (ENTER = todas): ").strip()
+    if id_fazenda:
+        if not id_fazenda.isdigit():
+            print("✗ ID inválido!")
+            pausar()
+            return
+        filtros['fazenda'] = int(id_fazenda)
+    
+    resultado = cubo.consultar_cubo(dimensoes, filtros)
+    
+    if not resultado:
+        print("\nNenhum dado disponivel.")
+    else:
+        def nome_valor(dimensao, valor):
+            if valor is None:
+                return '-'
+            if dimensao == 'fazenda':
+                registro = fazenda.buscar_fazenda_por_id(valor)
+                return registro['nome'][:20] if registro else f"ID {valor}"
+            if dimensao == 'talhao':
+                return f"{valor[0]}/{valor[1]}"
+            if dimensao == 'mes':
+                return f"{valor[1]:02d}/{valor[0]}"
+            return str(valor)
+        
+        tabela = [[d.capitalize() for d in dimensoes] + ['Colheitas', 'Producao(t)', 'Prod.(t/ha)', 'Perda(%)']]
+        for grupo in sorted(resultado, key=lambda g: tuple((v is None, v) for v in g)):
+            resumo = resultado[grupo]
+            tabela.append(
+                [nome_valor(d, v) for d, v in zip(dimensoes, grupo)] + [
+                    resumo['num_colheitas'],
+                    f"{resumo['producao_total']:.1f}",
+                    f"{resumo['produtividade_media']:.1f}",
+                    f"{resumo['perda_media']:.1f}"
+                ]
+            )
+        analise.exibir_tabela(tabela)
+    
+    pausar()
+
+
+def exibir_estatisticas_cache():
+    """Exibe acertos e falhas do cache de análises"""
+    print("\n" + "=" * 70)
+    print("CACHE DE ANÁLISES")
+    print("=" * 70)
+    
+    stats = cache.obter_estatisticas_cache()
+    print(f"\nVersão dos dados: {stats['versao']}")
+    print(f"Resultados guardados: {stats['resultados_guardados']}\n")
+    
+    for nome, contadores in stats['funcoes'].items():
+        total = contadores['acertos'] + contadores['falhas']
+        taxa = contadores['acertos'] / total * 100 if total else 0
+        print(f"  {nome}:")
+        print(f"     Acertos: {contadores['acertos']} | Falhas: {contadores['falhas']} ({taxa:.1f}% de acertos)")
+    
+    if stats['lru']:
+        print("\nCaches por conteúdo (LRU):\n")
+    for nome, contadores in stats['lru'].items():
+        total = contadores['acertos'] + contadores['falhas']
+        taxa = contadores['acertos'] / total * 100 if total else 0
+        print(f"  {nome}: {contadores['itens']}/{contadores['capacidade']} itens")
+        print(f"     Acertos: {contadores['acertos']} | Falhas: {contadores['falhas']} "
+              f"({taxa:.1f}% de acertos) | Descartes: {contadores['descartes']}")
+    
+    pausar()
+
+
 # ==================== RECOMENDAÇÕES ====================
 
+def analisar_arquivo_colunar():
+    """
+    Analisa o arquivo colunar diretamente sobre o mapeamento em memória,
+    sem carregar as colheitas (abrir o arquivo lê apenas o cabeçalho)
+    """
+    print("\n" + "=" * 70)
+    print("ANÁLISE RÁPIDA DO ARQUIVO COLUNAR (MMAP)")
+    print("=" * 70)
+    
+    inicio = time.perf_counter()
+    mapeadas = arquivo.abrir_colunar()
+    tempo_abertura = time.perf_counter() - inicio
+    if mapeadas is None:
+        pausar()
+        return
+    
+    with mapeadas:
+        modificado = datetime.fromtimestamp(os.path.getmtime(arquivo.ARQUIVO_COLUNAR))
+        print(f"\nArquivo: {arquivo.ARQUIVO_COLUNAR} (gravado em {modificado.strftime('%d/%m/%Y %H:%M')})")
+        print(f"Colheitas: {len(mapeadas)} | Aberto em {tempo_abertura * 1000:.1f} ms")
+        if colheita.alteracoes_pendentes:
+            print("⚠️ Há alterações não salvas: o arquivo reflete a última gravação")
+        
+        if not mapeadas:
+            pausar()
+            return
+        
+        producao = mapeadas.somar('quantidade_colhida')
+        area = mapeadas.somar('area_colhida')
+        print(f"\nProdução total: {producao:,.2f} ton | Área colhida: {area:,.2f} ha")
+        
+        producao_variedade = mapeadas.somar_por('quantidade_colhida', 'variedade')
+        area_variedade = mapeadas.somar_por('area_colhida', 'variedade')
+        perda_variedade = mapeadas.somar_por('percentual_perda_total', 'variedade')
+        print("\nPor variedade:")
+        for variedade, (soma, quantidade) in producao_variedade.items():
+            area_total = area_variedade[variedade][0]
+            produtividade = soma / area_total if area_total > 0 else 0
+            perda_media = perda_variedade[variedade][0] / quantidade
+            print(f"  {variedade}: {quantidade} colheita(s), {produtividade:.2f} ton/ha, "
+                  f"perda média {perda_media:.2f}%")
+        
+        if analise.usar_numpy():
+            criticos = analise_numpy.identificar_talhoes_criticos(mapeadas, top_k=5)
+            print("\nTalhões com maiores perdas:")
+            for i, (nome_fazenda, talhao, perda, num_colh) in enumerate(criticos, 1):
+                print(f"  {i}. {nome_fazenda} - {talhao}: {perda}% ({num_colh} colheita(s))")
+    
+    pausar()
+
+
 def menu_recomendacoes():
     """Menu de recomendações"""
-    limpar_tela()
-    exibir_cabecalho()
-    
-    print("\nRECOMENDACOES\n")
+    while True:
+        limpar_tela()
+        exibir_cabecalho()
+        
+        print("\nRECOMENDACOES\n")
+        print("1 - Recomendacoes de uma colheita")
+        print("2 - Resumo de recomendacoes por fazenda")
+        print("3 - Exportar recomendacoes de todas as colheitas")
+        print("0 - Voltar")
+        
+        opcao = input("\nOpcao: ").strip()
+        
+        if opcao == '1':
+            recomendar_colheita()
+        elif opcao == '2':
+            exibir_resumo_recomendacoes()
+        elif opcao == '3':
+            exportar_recomendacoes()
+        elif opcao == '0':
+            break
+        else:
+            print("Opcao invalida!")
+            pausar()
+
+
+def recomendar_colheita():
+    """Exibe as recomendações de uma colheita"""
+    print("\n" + "=" * 70)
+    print("RECOMENDACOES DE UMA COLHEITA")
+    print("=" * 70 + "\n")
     
     lista = colheita.listar_colheitas()
     
@@ -776,6 +1129,51 @@ def menu_recomendacoes():
     pausar()
 
 
+def exibir_resumo_recomendacoes():
+    """Exibe quantas vezes cada recomendação dispara em cada fazenda"""
+    print("\n" + "=" * 70)
+    print("RESUMO DE RECOMENDACOES POR FAZENDA")
+    print("=" * 70)
+    
+    contagem = regras.contar_regras_por_fazenda(colheita.colheitas)
+    
+    if not contagem:
+        print("\nNenhuma colheita registrada para analise.")
+    else:
+        for id_fazenda in sorted(contagem):
+            registro = fazenda.buscar_fazenda_por_id(id_fazenda)
+            nome = registro['nome'] if registro else f"ID {id_fazenda}"
+            total = len(colheita.buscar_colheitas_fazenda(id_fazenda))
+            print(f"\n{nome} ({total} colheita(s)):")
+            
+            por_regra = contagem[id_fazenda]
+            for id_regra in sorted(por_regra, key=por_regra.get, reverse=True):
+                mensagem = regras.MENSAGENS_REGRAS[id_regra][0]
+                if '{' in mensagem:
+                    mensagem = id_regra
+                print(f"  {por_regra[id_regra]:>5}x  {mensagem}")
+    
+    pausar()
+
+
+def exportar_recomendacoes():
+    """Exporta as recomendações de todas as colheitas em relatório texto"""
+    if not colheita.colheitas:
+        print("\nNenhuma colheita registrada.")
+        pausar()
+        return
+    
+    linhas = []
+    for c, recomendacoes in regras.recomendar_lote(colheita.colheitas):
+        linhas.append(f"Colheita #{c['id']} - {c['nome_fazenda']} / {c['codigo_talhao']} "
+                      f"({c['data_colheita']}) - Perda: {c['percentual_perda_total']:.2f}%")
+        linhas.extend(f"  {i}. {rec}" for i, rec in enumerate(recomendacoes, 1))
+        linhas.append("")
+    
+    arquivo.exportar_relatorio_texto("recomendacoes", "\n".join(linhas))
+    pausar()
+
+
 # ==================== GERENCIAMENTO DE ARQUIVOS ====================
 
 def menu_arquivos():
@@ -791,6 +1189,9 @@ def menu_arquivos():
         print("4 - Visualizar logs")
         print("5 - Status dos arquivos")
         print("6 - Criar backup")
+        print("7 - Salvar snapshot binario")
+        print("8 - Carregar snapshot binario")
+        print("9 - Salvar arquivo colunar (mmap)")
         print("0 - Voltar")
         
         opcao = input("\nOpcao: ").strip()
@@ -809,6 +1210,12 @@ def menu_arquivos():
         elif opcao == '6':
             arquivo.backup_dados()
             pausar()
+        elif opcao == '7':
+            salvar_binario()
+        elif opcao == '8':
+            carregar_binario()
+        elif opcao == '9':
+            salvar_colunar()
         elif opcao == '0':
             break
         else:
@@ -821,9 +1228,10 @@ def salvar_json():
     print("\nSalvando dados...")
     
     sucesso_f = arquivo.salvar_fazendas_json(fazenda.listar_fazendas())
-    sucesso_c = arquivo.salvar_colheitas_json(colheita.listar_colheitas())
+    sucesso_c = salvar_colheitas()
+    sucesso_q = arquivo.salvar_quantis_json(quantis.exportar_esbocos())
     
-    if sucesso_f and sucesso_c:
+    if sucesso_f and sucesso_c and sucesso_q:
         print("Dados salvos com sucesso!")
     else:
         print("Houve erros ao salvar alguns dados.")
@@ -831,29 +1239,132 @@ def salvar_json():
     pausar()
 
 
+def salvar_colheitas():
+    """
+    Grava as colheitas (no modo diário, apenas as alterações pendentes) e
+    atualiza o arquivo colunar (mmap) quando houve alterações
+    
+    Retorna:
+        bool: True se gravado com sucesso
+    """
+    havia_alteracoes = bool(colheita.alteracoes_pendentes)
+    sucesso = arquivo.salvar_colheitas_json(colheita.listar_colheitas(), colheita.alteracoes_pendentes)
+    if sucesso:
+        colheita.marcar_alteracoes_gravadas()
+        if havia_alteracoes or not arquivo.colunar_atualizado():
+            arquivo.salvar_colunar(colheita.colheitas)
+    return sucesso
+
+
+# Carga das colheitas adiada na inicialização (arquivo colunar atualizado):
+# a análise rápida usa o arquivo mapeado e os demais menus carregam o JSON
+carga_adiada = [False]
+
+
+def garantir_colheitas_carregadas():
+    """Carrega as colheitas do JSON se a carga foi adiada na inicialização"""
+    if carga_adiada[0]:
+        carga_adiada[0] = False
+        print("\nCarregando colheitas...")
+        carregar_colheitas_arquivo()
+
+
+def carregar_colheitas_arquivo():
+    """
+    Carrega as colheitas dos arquivos de dados em fluxo: cada registro lido
+    do snapshot (com o diário aplicado) vai direto para a memória, sem
+    montar antes a árvore JSON ou uma lista intermediária
+    
+    Retorna:
+        int: quantidade de colheitas carregadas (0 se não houver dados ou
+             em caso de erro; a memória não é alterada nesses casos)
+    """
+    if (arquivo.localizar_arquivo(arquivo.ARQUIVO_COLHEITAS) is None
+            and arquivo.localizar_arquivo(arquivo.ARQUIVO_DIARIO_COLHEITAS) is None):
+        return 0
+    
+    try:
+        colheita.carregar_colheitas(arquivo.iterar_colheitas_json(), arquivo.carregar_quantis_json(), gravadas=True)
+    except Exception as e:
+        print(f"✗ Erro ao carregar colheitas: {e}")
+        arquivo.registrar_log(f"Erro ao carregar colheitas: {e}", "ERRO")
+        return 0
+    
+    arquivo.registrar_log(f"Colheitas carregadas do JSON: {len(colheita.colheitas)} registros", "INFO")
+    return len(colheita.colheitas)
+
+
 def carregar_json():
     """Carrega dados de JSON"""
     print("\nCarregando dados...")
     
     fazendas_carregadas = arquivo.carregar_fazendas_json()
-    colheitas_carregadas = arquivo.carregar_colheitas_json()
     
     if fazendas_carregadas:
-        fazenda.fazendas.clear()
-        fazenda.fazendas.extend(fazendas_carregadas)
+        fazenda.carregar_fazendas(fazendas_carregadas)
         print(f"{len(fazendas_carregadas)} fazenda(s) carregada(s)")
+        verificar_consistencia_dados()
     
-    if colheitas_carregadas:
-        colheita.colheitas.clear()
-        colheita.colheitas.extend(colheitas_carregadas)
-        print(f"{len(colheitas_carregadas)} colheita(s) carregada(s)")
+    num_colheitas = carregar_colheitas_arquivo()
+    if num_colheitas:
+        print(f"{num_colheitas} colheita(s) carregada(s)")
     
-    if not fazendas_carregadas and not colheitas_carregadas:
+    if not fazendas_carregadas and not num_colheitas:
         print("Nenhum dado encontrado para carregar.")
     
     pausar()
 
 
+def salvar_binario():
+    """Salva fazendas e colheitas no snapshot binário"""
+    print("\nSalvando snapshot binario...")
+    
+    if arquivo.salvar_binario(fazenda.listar_fazendas(), colheita.listar_colheitas()):
+        print(f"Snapshot salvo em {arquivo.ARQUIVO_BINARIO} "
+              f"({os.path.getsize(arquivo.ARQUIVO_BINARIO)} bytes)")
+    
+    pausar()
+
+
+def carregar_binario():
+    """Carrega fazendas e colheitas do snapshot binário (substitui os dados em memória)"""
+    print("\nCarregando snapshot binario...")
+    
+    dados = arquivo.carregar_binario()
+    if dados is not None:
+        fazendas_carregadas, colheitas_carregadas = dados
+        fazenda.carregar_fazendas(fazendas_carregadas)
+        verificar_consistencia_dados()
+        # Os arquivos JSON não correspondem ao snapshot: a próxima gravação
+        # regrava as colheitas por inteiro (gravadas=False)
+        colheita.carregar_colheitas(colheitas_carregadas)
+        print(f"{len(fazendas_carregadas)} fazenda(s) e {len(colheitas_carregadas)} colheita(s) carregada(s)")
+    
+    pausar()
+
+
+def salvar_colunar():
+    """Salva as colheitas no arquivo colunar (leitura com mmap)"""
+    print("\nSalvando arquivo colunar...")
+    
+    if arquivo.salvar_colunar(colheita.colheitas):
+        print(f"Arquivo salvo em {arquivo.ARQUIVO_COLUNAR} "
+              f"({os.path.getsize(arquivo.ARQUIVO_COLUNAR)} bytes)")
+    
+    pausar()
+
+
+def verificar_consistencia_dados():
+    """Verifica índices e totais após uma carga e avisa sobre inconsistências"""
+    inconsistencias = fazenda.verificar_consistencia_fazendas()
+    
+    for problema in inconsistencias:
+        print(f"Aviso: {problema}")
+        arquivo.registrar_log(f"Inconsistencia nos dados: {problema}", "AVISO")
+    
+    return not inconsistencias
+
+
 def exportar_relatorio():
     """Exporta relatório em texto"""
     print("\nExportar Relatorio\n")
@@ -956,13 +1467,12 @@ def carregar_bd():
         colheitas_bd = database.buscar_colheitas()
         
         if fazendas_bd:
-            fazenda.fazendas.clear()
-            fazenda.fazendas.extend(fazendas_bd)
+            fazenda.carregar_fazendas(fazendas_bd)
             print(f"{len(fazendas_bd)} fazenda(s) carregada(s)")
+            verificar_consistencia_dados()
         
         if colheitas_bd:
-            colheita.colheitas.clear()
-            colheita.colheitas.extend(colheitas_bd)
+            colheita.carregar_colheitas(colheitas_bd)
             print(f"{len(colheitas_bd)} colheita(s) carregada(s)")
         
         if not fazendas_bd and not colheitas_bd:
@@ -982,8 +1492,8 @@ def carregar_dados_exemplo():
     arquivo.registrar_log("Carregando dados de exemplo", "INFO")
     
     # Limpa dados existentes
-    fazenda.fazendas.clear()
-    colheita.colheitas.clear()
+    fazenda.carregar_fazendas([])
+    colheita.carregar_colheitas([])
     
     # Fazenda 1
     f1 = fazenda.criar_fazenda(
@@ -1080,11 +1590,16 @@ def main():
     # Tenta carregar dados existentes
     fazendas_carregadas = arquivo.carregar_fazendas_json()
     if fazendas_carregadas:
-        fazenda.fazendas.extend(fazendas_carregadas)
-    
-    colheitas_carregadas = arquivo.carregar_colheitas_json()
-    if colheitas_carregadas:
-        colheita.colheitas.extend(colheitas_carregadas)
+        fazenda.carregar_fazendas(fazendas_carregadas)
+        verificar_consistencia_dados()
+    
+    # Com o arquivo colunar atualizado, a carga das colheitas (JSON) só
+    # acontece quando um menu precisar delas
+    if arquivo.colunar_atualizado():
+        carga_adiada[0] = True
+        arquivo.registrar_log("Carga das colheitas adiada (arquivo colunar atualizado)", "INFO")
+    else:
+        carregar_colheitas_arquivo()
     
     # Loop principal
     while True:
@@ -1093,6 +1608,10 @@ def main():
         
         opcao = menu_principal()
         
+        # Só a análise rápida (menu de análises) dispensa as colheitas em memória
+        if opcao not in ('0', '4'):
+            garantir_colheitas_carregadas()
+        
         if opcao == '1':
             menu_fazendas()
         elif opcao == '2':
@@ -1113,7 +1632,9 @@ def main():
             print("\n" + "=" * 70)
             print("Salvando dados antes de sair...")
             arquivo.salvar_fazendas_json(fazenda.listar_fazendas())
-            arquivo.salvar_colheitas_json(colheita.listar_colheitas())
+            if not carga_adiada[0]:
+                salvar_colheitas()
+                arquivo.salvar_quantis_json(quantis.exportar_esbocos())
             print("Dados salvos!")
             arquivo.registrar_log("Sistema encerrado", "INFO")
             print("\nObrigado por usar o sistema!")
@@ -3,15 +3,110 @@ Módulo de análise e recomendações
 Capítulo 4: Estruturas de dados avançadas (tabelas de memória, análises)
 """
 
-from modulos.colheita import colheitas, comparar_metodos_colheita
+import heapq
+from modulos.colheita import colheitas, buscar_colheitas_periodo, estatisticas_acumuladas, converter_data_ordinal
+from modulos.colheita import comparar_metodos_colheita as comparar_metodos_por_tipo
 from modulos.fazenda import fazendas
-from config import PRODUTIVIDADE_ESPERADA, PARAMETROS_ANALISE
+from modulos.categorias import codigo, valor
+from modulos.classificacao import classificar_lote, indice_faixa, ICONES_FAIXAS
+from modulos import analise_numpy
+from modulos.cache import memorizar, versao_atual
+from modulos.colunar import ArmazemColunar
+from modulos.quantis import resumo_percentis
+from modulos import paralelo, regras
+from modulos.consolidacao import QTD, SOMA_PERCENTUAL
+from config import PRODUTIVIDADE_ESPERADA, PARAMETROS_ANALISE, USAR_NUMPY, TAMANHO_PAGINA_TABELA
 
 
-def gerar_tabela_desempenho():
+def usar_numpy():
+    """
+    Indica se as análises devem usar o backend NumPy
+    
+    Retorna:
+        bool: True se USAR_NUMPY estiver ativo e o NumPy instalado
+    """
+    return USAR_NUMPY and analise_numpy.NUMPY_DISPONIVEL
+
+
+# Colheitas empacotadas para o NumPy: [versão dos dados, pacote]
+_pacote_numpy = [None, None]
+
+
+def usar_numpy_colheitas():
+    """
+    Indica se as análises das colheitas em memória devem usar o NumPy
+    Só com o armazenamento colunar: o empacotamento é uma cópia das
+    colunas; a partir da lista de dicionários, empacotar custa mais que a
+    própria análise em Python puro
+    
+    Retorna:
+        bool: True se usar_numpy() e as colheitas estiverem em ArmazemColunar
+    """
+    return usar_numpy() and isinstance(colheitas, ArmazemColunar)
+
+
+def pacote_colheitas():
+    """
+    Retorna as colheitas empacotadas para o NumPy, empacotando de novo
+    só quando os dados mudaram (versão de modulos.cache)
+    
+    Retorna:
+        dict: pacote de analise_numpy.empacotar_colheitas
+    """
+    versao = versao_atual()
+    if _pacote_numpy[0] != versao:
+        _pacote_numpy[1] = analise_numpy.empacotar_colheitas(colheitas)
+        _pacote_numpy[0] = versao
+    return _pacote_numpy[1]
+
+
+def pacote_periodo(inicio=None, fim=None):
+    """
+    Retorna o pacote das colheitas de um período (filtro sobre o pacote em cache)
+    
+    Parâmetros:
+        inicio: data inicial (DD/MM/AAAA ou date), opcional
+        fim: data final (DD/MM/AAAA ou date), opcional
+    
+    Retorna:
+        dict: pacote do período ou None se alguma data for inválida
+    """
+    if inicio is None and fim is None:
+        return pacote_colheitas()
+    ordinal_inicio = converter_data_ordinal(inicio) if inicio is not None else None
+    ordinal_fim = converter_data_ordinal(fim) if fim is not None else None
+    if (inicio is not None and ordinal_inicio is None) or (fim is not None and ordinal_fim is None):
+        return None
+    return analise_numpy.filtrar_periodo(pacote_colheitas(), ordinal_inicio, ordinal_fim)
+
+
+def selecionar_colheitas(inicio=None, fim=None):
+    """
+    Seleciona as colheitas a analisar
+    Sem datas, usa todas; com datas, usa o índice por data (sem varrer tudo)
+    
+    Parâmetros:
+        inicio: data inicial (DD/MM/AAAA ou date), opcional
+        fim: data final (DD/MM/AAAA ou date), opcional
+    
+    Retorna:
+        list: colheitas selecionadas
+    """
+    if inicio is None and fim is None:
+        return colheitas
+    return buscar_colheitas_periodo(inicio, fim)
+
+
+@memorizar
+def gerar_tabela_desempenho(inicio=None, fim=None):
     """
     Gera uma tabela (matriz) de desempenho das colheitas
     Estrutura de dados: lista de listas (tabela de memória)
+    Para exibir no console, use paginar_desempenho (formata só a página)
+    
+    Parâmetros:
+        inicio: data inicial do período (opcional)
+        fim: data final do período (opcional)
     
     Retorna:
         list: tabela com dados de desempenho
@@ -21,7 +116,10 @@ def gerar_tabela_desempenho():
         ['ID', 'Fazenda', 'Talhão', 'Tipo', 'Prod.(t/ha)', 'Perda(%)', 'Status']
     ]
     
-    for colheita in colheitas:
+    selecionadas = selecionar_colheitas(inicio, fim)
+    icones = classificar_lote((c['percentual_perda_total'] for c in selecionadas), icone=True)
+    
+    for colheita, icone in zip(selecionadas, icones):
         linha = [
             colheita['id'],
             colheita['nome_fazenda'][:20],  # limita o tamanho
@@ -29,7 +127,7 @@ def gerar_tabela_desempenho():
             colheita['tipo_colheita'][:3].upper(),
             f"{colheita['produtividade']:.1f}",
             f"{colheita['percentual_perda_total']:.1f}",
-            obter_icone_status(colheita['percentual_perda_total'])
+            icone
         ]
         tabela.append(linha)
     
@@ -39,6 +137,7 @@ def gerar_tabela_desempenho():
 def obter_icone_status(percentual_perda):
     """
     Retorna um ícone de status baseado no percentual de perda
+    (mesma tabela de faixas do status da colheita)
     
     Parâmetro:
         percentual_perda (float): percentual de perda
@@ -46,14 +145,7 @@ def obter_icone_status(percentual_perda):
     Retorna:
         str: ícone de status
     """
-    if percentual_perda <= 5:
-        return "✓ ÓTIMO"
-    elif percentual_perda <= 10:
-        return "⚠️ BOM"
-    elif percentual_perda <= 15:
-        return "⚠️ ATENÇÃO"
-    else:
-        return "❌ CRÍTICO"
+    return ICONES_FAIXAS[indice_faixa(percentual_perda)]
 
 
 def exibir_tabela(tabela):
@@ -94,30 +186,201 @@ def exibir_tabela(tabela):
     print(f"Total de registros: {len(tabela) - 1}")
 
 
-def analisar_produtividade_por_variedade():
+# ---------- Tabela de desempenho paginada ----------
+
+# Colunas da tabela de desempenho: (título, largura fixa, formatação)
+COLUNAS_DESEMPENHO = (
+    ('ID', 7, lambda c: str(c['id'])),
+    ('Fazenda', 22, lambda c: c['nome_fazenda'][:20]),  # limita o tamanho
+    ('Talhão', 8, lambda c: c['codigo_talhao']),
+    ('Tipo', 6, lambda c: c['tipo_colheita'][:3].upper()),
+    ('Prod.(t/ha)', 13, lambda c: f"{c['produtividade']:.1f}"),
+    ('Perda(%)', 10, lambda c: f"{c['percentual_perda_total']:.1f}"),
+    ('Status', 12, lambda c: obter_icone_status(c['percentual_perda_total'])),
+)
+
+# Ordenações aceitas: nome -> chave de ordenação da colheita
+ORDENACOES_DESEMPENHO = {
+    'id': lambda c: c['id'],
+    'data': lambda c: (c['data_ordinal'] is None, c['data_ordinal'] or 0),
+    'fazenda': lambda c: (c['nome_fazenda'], c['codigo_talhao']),
+    'produtividade': lambda c: c['produtividade'],
+    'perda': lambda c: c['percentual_perda_total'],
+}
+
+
+def filtrar_colheitas(lista_colheitas, filtros=None, perda_minima=None):
+    """
+    Gera as colheitas que atendem aos filtros (sem copiar a lista)
+
+    Parâmetros:
+        lista_colheitas (iterable): colheitas
+        filtros (dict): campo -> valor ou conjunto/lista de valores aceitos
+                        (ex: {'id_fazenda': 2, 'status': ['PERDA ALTA']})
+        perda_minima (float): percentual de perda mínimo (opcional)
+
+    Retorna:
+        generator: colheitas filtradas, na ordem da lista
+    """
+    condicoes = []
+    for campo, aceito in (filtros or {}).items():
+        if isinstance(aceito, (set, frozenset, list, tuple)):
+            condicoes.append((campo, frozenset(aceito)))
+        else:
+            condicoes.append((campo, frozenset((aceito,))))
+
+    for colheita in lista_colheitas:
+        if perda_minima is not None and colheita['percentual_perda_total'] < perda_minima:
+            continue
+        if all(colheita[campo] in aceitos for campo, aceitos in condicoes):
+            yield colheita
+
+
+def paginar_desempenho(pagina=1, tamanho_pagina=TAMANHO_PAGINA_TABELA, ordenar_por=None,
+                       decrescente=False, filtros=None, perda_minima=None, inicio=None, fim=None):
+    """
+    Seleciona uma página da tabela de desempenho
+    Filtro e ordenação são aplicados às colheitas, antes de qualquer
+    formatação; com ordenação, só as colheitas até o fim da página são
+    ordenadas (heapq.nsmallest / nlargest)
+
+    Parâmetros:
+        pagina (int): número da página (a partir de 1)
+        tamanho_pagina (int): linhas por página
+        ordenar_por (str): chave de ORDENACOES_DESEMPENHO (None = ordem de registro)
+        decrescente (bool): ordem decrescente
+        filtros (dict): filtros de filtrar_colheitas
+        perda_minima (float): percentual de perda mínimo (opcional)
+        inicio: data inicial do período (opcional)
+        fim: data final do período (opcional)
+
+    Retorna:
+        dict: pagina, total_paginas, total_registros e colheitas da página,
+              ou None se a ordenação for inválida
+    """
+    if ordenar_por is not None and ordenar_por not in ORDENACOES_DESEMPENHO:
+        print(f"✗ Ordenação inválida! Use: {', '.join(ORDENACOES_DESEMPENHO)}")
+        return None
+
+    tamanho_pagina = max(1, tamanho_pagina)
+    pagina = max(1, pagina)
+    inicio_pagina = (pagina - 1) * tamanho_pagina
+    fim_pagina = inicio_pagina + tamanho_pagina
+    selecionadas = filtrar_colheitas(selecionar_colheitas(inicio, fim), filtros, perda_minima)
+
+    if ordenar_por is None:
+        # Percorre uma vez: guarda só a página e conta o total
+        total = 0
+        colheitas_pagina = []
+        for colheita in selecionadas:
+            if inicio_pagina <= total < fim_pagina:
+                colheitas_pagina.append(colheita)
+            total += 1
+    else:
+        candidatas = list(selecionadas)
+        total = len(candidatas)
+        escolher = heapq.nlargest if decrescente else heapq.nsmallest
+        colheitas_pagina = escolher(fim_pagina, candidatas, key=ORDENACOES_DESEMPENHO[ordenar_por])[inicio_pagina:]
+
+    return {
+        'pagina': pagina,
+        'total_paginas': max(1, -(-total // tamanho_pagina)),
+        'total_registros': total,
+        'colheitas': colheitas_pagina,
+    }
+
+
+def gerar_linhas_tabela(colheitas_pagina, ajustar_larguras=False):
+    """
+    Gera as linhas de texto da tabela de desempenho de uma página
+
+    Parâmetros:
+        colheitas_pagina (iterable): colheitas da página
+        ajustar_larguras (bool): False = larguras fixas de COLUNAS_DESEMPENHO
+                                 (formata e emite linha a linha); True =
+                                 larguras medidas nas linhas da página
+
+    Retorna:
+        generator: cabeçalho, separadores e linhas formatadas
+    """
+    titulos = [titulo for titulo, _, _ in COLUNAS_DESEMPENHO]
+    celulas = ([formatar(c) for _, _, formatar in COLUNAS_DESEMPENHO] for c in colheitas_pagina)
+
+    if ajustar_larguras:
+        celulas = list(celulas)
+        larguras = [
+            max([len(titulo)] + [len(linha[i]) for linha in celulas]) + 2
+            for i, titulo in enumerate(titulos)
+        ]
+    else:
+        larguras = [largura for _, largura, _ in COLUNAS_DESEMPENHO]
+
+    separador = "=" * sum(larguras)
+    yield separador
+    yield "".join(titulo.ljust(largura) for titulo, largura in zip(titulos, larguras))
+    yield separador
+    for linha in celulas:
+        yield "".join(texto.ljust(largura) for texto, largura in zip(linha, larguras))
+    yield separador
+
+
+def exibir_pagina_desempenho(resultado, ajustar_larguras=False):
+    """
+    Exibe uma página da tabela de desempenho
+
+    Parâmetros:
+        resultado (dict): retorno de paginar_desempenho
+        ajustar_larguras (bool): ajusta as larguras às linhas da página
+    """
+    if not resultado or not resultado['total_registros']:
+        print("Nenhum dado para exibir")
+        return
+
+    print()
+    for linha in gerar_linhas_tabela(resultado['colheitas'], ajustar_larguras):
+        print(linha)
+    print(f"Página {resultado['pagina']} de {resultado['total_paginas']} | "
+          f"Total de registros: {resultado['total_registros']}")
+
+
+@memorizar
+def analisar_produtividade_por_variedade(inicio=None, fim=None):
     """
     Analisa produtividade por variedade de cana
     
+    Parâmetros:
+        inicio: data inicial do período (opcional)
+        fim: data final do período (opcional)
+    
     Retorna:
         dict: análise por variedade
     """
-    analise = {}
+    if usar_numpy_colheitas():
+        pacote = pacote_periodo(inicio, fim)
+        if pacote is not None:  # datas inválidas: a seleção abaixo avisa
+            return analise_numpy.analisar_produtividade_por_variedade(colheitas, pacote=pacote)
+    
+    # Agrupa pelo código da variedade (dicionário de categorias)
+    grupos = {}  # código -> dados da variedade
     
-    for colheita in colheitas:
-        variedade = colheita['variedade']
+    for colheita in selecionar_colheitas(inicio, fim):
+        cod = codigo('variedade', colheita['variedade'])
+        dados = grupos.get(cod)
         
-        if variedade not in analise:
-            analise[variedade] = {
+        if dados is None:
+            dados = grupos[cod] = {
                 'colheitas': [],
                 'producao_total': 0,
                 'area_total': 0,
                 'perdas': []
             }
         
-        analise[variedade]['colheitas'].append(colheita['id'])
-        analise[variedade]['producao_total'] += colheita['quantidade_colhida']
-        analise[variedade]['area_total'] += colheita['area_colhida']
-        analise[variedade]['perdas'].append(colheita['percentual_perda_total'])
+        dados['colheitas'].append(colheita['id'])
+        dados['producao_total'] += colheita['quantidade_colhida']
+        dados['area_total'] += colheita['area_colhida']
+        dados['perdas'].append(colheita['percentual_perda_total'])
+    
+    analise = {valor('variedade', cod): dados for cod, dados in grupos.items()}
     
     # Calcula médias e comparações
     for variedade in analise:
@@ -140,45 +403,73 @@ def analisar_produtividade_por_variedade():
     return analise
 
 
-def identificar_talhoes_criticos():
+@memorizar
+def identificar_talhoes_criticos(inicio=None, fim=None, top_k=None):
     """
     Identifica talhões com maiores perdas
+    Sem período, usa as somas por talhão mantidas a cada colheita
+    registrada (sem percorrer as colheitas); com período e armazenamento
+    colunar, agrupa com o backend vetorizado; com top_k, seleciona os
+    maiores com heap (heapq.nlargest) em vez de ordenar tudo
+    
+    Parâmetros:
+        inicio: data inicial do período (opcional)
+        fim: data final do período (opcional)
+        top_k (int): quantidade de talhões a retornar (None = todos)
     
     Retorna:
         list: lista de tuplas (fazenda, talhão, perda_media, num_colheitas)
     """
-    # Agrupa colheitas por talhão
-    talhoes = {}
-    
-    for colheita in colheitas:
-        chave = (colheita['id_fazenda'], colheita['codigo_talhao'])
-        
-        if chave not in talhoes:
-            talhoes[chave] = {
-                'nome_fazenda': colheita['nome_fazenda'],
-                'perdas': [],
-                'colheitas': 0
-            }
+    if inicio is None and fim is None:
+        talhoes = estatisticas_acumuladas['por_talhao']
+    else:
+        pacote = pacote_periodo(inicio, fim) if usar_numpy_colheitas() else None
+        if pacote is not None:
+            return analise_numpy.identificar_talhoes_criticos(colheitas, top_k, pacote=pacote)
         
-        talhoes[chave]['perdas'].append(colheita['percentual_perda_total'])
-        talhoes[chave]['colheitas'] += 1
+        # Agrupa colheitas do período por talhão (soma e contagem)
+        talhoes = {}
+        for colheita in selecionar_colheitas(inicio, fim):
+            chave = (colheita['id_fazenda'], colheita['codigo_talhao'])
+            dados = talhoes.get(chave)
+            if dados is None:
+                dados = talhoes[chave] = [colheita['nome_fazenda'], 0, 0]
+            dados[1] += colheita['percentual_perda_total']
+            dados[2] += 1
     
     # Calcula média de perdas e cria tuplas
-    resultado = []
-    for (id_fazenda, codigo_talhao), dados in talhoes.items():
-        perda_media = sum(dados['perdas']) / len(dados['perdas'])
-        tupla = (dados['nome_fazenda'], codigo_talhao, round(perda_media, 2), dados['colheitas'])
-        resultado.append(tupla)
-    
-    # Ordena por perda média (decrescente)
-    resultado.sort(key=lambda x: x[2], reverse=True)
+    resultado = (
+        (nome_fazenda, codigo_talhao, round(soma_perdas / quantidade, 2), quantidade)
+        for (_, codigo_talhao), (nome_fazenda, soma_perdas, quantidade) in talhoes.items()
+    )
+    
+    # Seleciona por perda média (decrescente); empates mantêm a ordem original
+    if top_k is not None:
+        return heapq.nlargest(top_k, resultado, key=lambda x: x[2])
+    return sorted(resultado, key=lambda x: x[2], reverse=True)
+
+
+@memorizar
+def comparar_metodos_colheita():
+    """
+    Compara perdas entre métodos de colheita (manual vs mecânica)
+    Com a lista de dicionários, usa o índice por tipo de colheita (percorre
+    só as colheitas manuais e mecânicas); com o armazenamento colunar, em
+    que ler linha a linha é mais lento, agrupa o pacote NumPy em cache
+    (montado uma vez por versão dos dados, com cópia direta das colunas)
     
-    return resultado
+    Retorna:
+        dict: comparação entre métodos
+    """
+    if usar_numpy_colheitas():
+        return analise_numpy.comparar_metodos_colheita(colheitas, pacote=pacote_colheitas())
+    return comparar_metodos_por_tipo()
 
 
 def gerar_recomendacoes(colheita):
     """
     Gera recomendações baseadas nos dados de uma colheita
+    As regras ficam em config.REGRAS_RECOMENDACAO (modulos.regras)
     
     Parâmetro:
         colheita (dict): dicionário da colheita
@@ -186,89 +477,118 @@ def gerar_recomendacoes(colheita):
     Retorna:
         list: lista de recomendações (strings)
     """
-    recomendacoes = []
-    
-    # Análise de perda total
-    perda_total = colheita['percentual_perda_total']
-    
-    if perda_total > 15:
-        recomendacoes.append("🚨 URGENTE: Perdas críticas! Requer ação imediata.")
-    elif perda_total > 10:
-        recomendacoes.append("⚠️ Perdas acima da média. Revisar processo de colheita.")
-    elif perda_total <= 5:
-        recomendacoes.append("✓ Excelente desempenho! Manter práticas atuais.")
-    
-    # Análise por tipo de perda
-    perdas = colheita['perdas_detalhadas']
-    
-    if 'mecânica' in perdas and perdas['mecânica'] > 5:
-        recomendacoes.append("🔧 Revisar regulagem da colheitadeira (velocidade, altura de corte).")
-        recomendacoes.append("📋 Verificar manutenção preventiva do equipamento.")
-    
-    if 'raizame' in perdas and perdas['raizame'] > 3:
-        recomendacoes.append("🌱 Ajustar altura de corte para evitar arrancamento de raízes.")
-    
-    if 'palha' in perdas and perdas['palha'] > 3:
-        recomendacoes.append("🍂 Otimizar sistema de limpeza e extração da palha.")
-    
-    if 'climática' in perdas and perdas['climática'] > 2:
-        recomendacoes.append("🌦️ Planejar colheita em períodos mais favoráveis.")
-        recomendacoes.append("📅 Considerar sistema de monitoramento meteorológico.")
-    
-    if 'pragas' in perdas and perdas['pragas'] > 2:
-        recomendacoes.append("🐛 Implementar controle integrado de pragas.")
-        recomendacoes.append("🔬 Realizar análise fitossanitária do talhão.")
+    return regras.recomendar(colheita)
+
+
+def calcular_indicadores_dashboard(num_criticos=3):
+    """
+    Calcula todos os indicadores do dashboard em uma única passagem
+    pelas colheitas (produção, perdas, área, métodos e status); os
+    talhões críticos vêm das somas por talhão já mantidas
+    Com PROCESSOS_AGREGACAO > 1 e muitas colheitas, a passagem é dividida
+    por fazenda entre processos (modulos.paralelo)
     
-    # Análise de tipo de colheita
-    if colheita['tipo_colheita'] == 'mecânica' and perda_total > 10:
-        recomendacoes.append("👨‍🌾 Considerar colheita manual em talhões críticos.")
-        recomendacoes.append("📊 Comparar custo-benefício entre métodos de colheita.")
+    Parâmetro:
+        num_criticos (int): quantidade de talhões críticos a retornar
     
-    # Análise de produtividade
-    variedade = colheita['variedade']
-    if variedade in PRODUTIVIDADE_ESPERADA:
-        esperado = PRODUTIVIDADE_ESPERADA[variedade]
-        if colheita['produtividade'] < esperado * 0.8:  # 80% do esperado
-            recomendacoes.append(f"📉 Produtividade abaixo do esperado para {variedade}.")
-            recomendacoes.append("🌾 Revisar manejo do talhão (adubação, irrigação).")
+    Retorna:
+        dict: indicadores consolidados (vazio se não houver colheitas)
+    """
+    if not colheitas:
+        return {}
     
-    # Se não houver recomendações específicas
-    if not recomendacoes:
-        recomendacoes.append("✓ Operação dentro dos parâmetros normais.")
-        recomendacoes.append("💡 Continuar monitoramento regular.")
+    producao_total = 0
+    perda_total = 0
+    area_total = 0
+    metodos = {'manual': [0, 0], 'mecânica': [0, 0]}  # tipo -> [quantidade, soma_perdas]
+    status_count = {}
     
-    return recomendacoes
+    if paralelo.usar_paralelo(len(colheitas)):
+        # Somas parciais por fazenda calculadas em processos e mescladas
+        agregado = paralelo.agregar_em_paralelo(incluir_esbocos=False)
+        _, producao_total, perda_total, area_total, _ = agregado['total']
+        for tipo, metodo in metodos.items():
+            totais = agregado['por_tipo'].get(tipo)
+            if totais is not None:
+                metodo[0] = totais[QTD]
+                metodo[1] = totais[SOMA_PERCENTUAL]
+        status_count = agregado['por_status']
+    else:
+        for c in colheitas:
+            percentual = c['percentual_perda_total']
+            producao_total += c['quantidade_colhida']
+            perda_total += c['quantidade_perdida']
+            area_total += c['area_colhida']
+            
+            metodo = metodos.get(c['tipo_colheita'])
+            if metodo is not None:
+                metodo[0] += 1
+                metodo[1] += percentual
+            
+            status_count[c['status']] = status_count.get(c['status'], 0) + 1
+    
+    def media(quantidade, soma):
+        return soma / quantidade if quantidade else 0
+    
+    media_manual = media(*metodos['manual'])
+    media_mecanica = media(*metodos['mecânica'])
+    
+    return {
+        'total_colheitas': len(colheitas),
+        'producao_total': producao_total,
+        'perda_total': perda_total,
+        'area_total': area_total,
+        'produtividade_media': producao_total / area_total if area_total > 0 else 0,
+        'comparacao': {
+            'manual': {
+                'quantidade': metodos['manual'][0],
+                'perda_media': round(media_manual, 2)
+            },
+            'mecanica': {
+                'quantidade': metodos['mecânica'][0],
+                'perda_media': round(media_mecanica, 2)
+            },
+            'diferenca': round(media_mecanica - media_manual, 2)
+        },
+        'status': status_count,
+        # Ranking mantido incrementalmente (somas por talhão + heap)
+        'criticos': identificar_talhoes_criticos(top_k=num_criticos),
+        # Percentis estimados pelos esboços mantidos a cada colheita
+        'percentis': {
+            'tipo_colheita': resumo_percentis('tipo_colheita'),
+            'variedade': resumo_percentis('variedade')
+        }
+    }
 
 
 def gerar_dashboard():
     """
     Gera um dashboard com indicadores principais
     Procedimento que exibe informações consolidadas
+    (os indicadores vêm de calcular_indicadores_dashboard)
     """
     print("\n" + "="*70)
     print(" "*20 + "📊 DASHBOARD - GESTÃO DE COLHEITAS")
     print("="*70)
     
-    if not colheitas:
+    indicadores = calcular_indicadores_dashboard()
+    
+    if not indicadores:
         print("\nℹ️ Nenhuma colheita registrada ainda.")
         print("="*70)
         return
     
-    # Estatísticas gerais
-    total_colheitas = len(colheitas)
-    producao_total = sum(c['quantidade_colhida'] for c in colheitas)
-    perda_total = sum(c['quantidade_perdida'] for c in colheitas)
-    area_total = sum(c['area_colhida'] for c in colheitas)
+    total_colheitas = indicadores['total_colheitas']
     
     print(f"\n📈 INDICADORES GERAIS:")
     print(f"  • Total de Colheitas: {total_colheitas}")
-    print(f"  • Produção Total: {producao_total:.2f} toneladas")
-    print(f"  • Área Total Colhida: {area_total:.2f} hectares")
-    print(f"  • Produtividade Média: {(producao_total/area_total):.2f} ton/ha")
-    print(f"  • Perda Total: {perda_total:.2f} toneladas")
+    print(f"  • Produção Total: {indicadores['producao_total']:.2f} toneladas")
+    print(f"  • Área Total Colhida: {indicadores['area_total']:.2f} hectares")
+    print(f"  • Produtividade Média: {indicadores['produtividade_media']:.2f} ton/ha")
+    print(f"  • Perda Total: {indicadores['perda_total']:.2f} toneladas")
     
     # Comparação de métodos
-    comparacao = comparar_metodos_colheita()
+    comparacao = indicadores['comparacao']
     
     print(f"\n⚖️ COMPARAÇÃO DE MÉTODOS:")
     print(f"  • Manual: {comparacao['manual']['quantidade']} colheitas - "
@@ -279,18 +599,13 @@ def gerar_dashboard():
           f"({'maior' if comparacao['diferenca'] > 0 else 'menor'} na mecânica)")
     
     # Distribuição por status
-    status_count = {}
-    for c in colheitas:
-        status = c['status']
-        status_count[status] = status_count.get(status, 0) + 1
-    
     print(f"\n📊 DISTRIBUIÇÃO POR STATUS:")
-    for status, count in sorted(status_count.items()):
+    for status, count in sorted(indicadores['status'].items()):
         percentual = (count / total_colheitas) * 100
         print(f"  • {status}: {count} ({percentual:.1f}%)")
     
     # Talhões críticos
-    criticos = identificar_talhoes_criticos()[:3]  # Top 3
+    criticos = indicadores['criticos']
     
     if criticos:
         print(f"\n⚠️ TALHÕES CRÍTICOS (Maiores Perdas):")
@@ -298,6 +613,18 @@ def gerar_dashboard():
             print(f"  {i}. {fazenda} - {talhao}: {perda_media}% "
                   f"({num_colheitas} colheita{'s' if num_colheitas > 1 else ''})")
     
+    # Percentis de perda e produtividade (p50 / p90 / p99)
+    titulos = {'tipo_colheita': 'POR MÉTODO', 'variedade': 'POR VARIEDADE'}
+    for dimensao, grupos in indicadores['percentis'].items():
+        if not grupos:
+            continue
+        print(f"\n📐 PERCENTIS {titulos[dimensao]} (p50 / p90 / p99):")
+        for grupo, metricas in grupos.items():
+            perda = metricas['percentual_perda_total']
+            produtividade = metricas['produtividade']
+            print(f"  • {grupo}: Perda {perda[50]:.1f}% / {perda[90]:.1f}% / {perda[99]:.1f}% | "
+                  f"Prod. {produtividade[50]:.1f} / {produtividade[90]:.1f} / {produtividade[99]:.1f} t/ha")
+    
     print("\n" + "="*70)
 
 
@@ -345,8 +672,7 @@ def gerar_relatorio_completo():
     print("📋 TABELA DE DESEMPENHO:")
     print("="*70)
     
-    tabela = gerar_tabela_desempenho()
-    exibir_tabela(tabela)
+    exibir_pagina_desempenho(paginar_desempenho(), ajustar_larguras=True)
     
     print("\n" + "="*70)
 
@@ -0,0 +1,283 @@
+"""
+Análises vetorizadas com NumPy (backend opcional de modulos.analise)
+
+NOTA: NumPy é uma dependência OPCIONAL
+- Sem NumPy, modulos.analise usa as versões em Python puro
+- Para usar, instale: pip install numpy
+
+As colheitas são empacotadas uma única vez em arrays (valores numéricos e
+códigos de categoria) e os agrupamentos são feitos com np.bincount.
+Com o armazenamento colunar (BACKEND_COLHEITAS = 'colunar') o
+empacotamento é uma cópia direta de memória de cada coluna, sem percorrer
+os registros. Um pacote serve para várias análises e, com filtrar_periodo,
+para qualquer período (modulos.analise guarda o pacote por versão dos dados).
+Os resultados têm o mesmo formato das funções de modulos.analise.
+"""
+
+import heapq
+
+try:
+    import numpy as np  # type: ignore  # Importação opcional
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    NUMPY_DISPONIVEL = False
+
+from modulos.colunar import ArmazemColunar, SEM_DATA
+from modulos.mapeado import ColheitasMapeadas
+from config import PRODUTIVIDADE_ESPERADA
+
+
+def _fatorar(valores):
+    """
+    Converte uma sequência de valores em códigos inteiros
+    Os códigos seguem a ordem de primeira aparição
+
+    Parâmetro:
+        valores (iterable): valores a codificar
+
+    Retorna:
+        tuple: (array de códigos, lista de valores por código)
+    """
+    mapa = {}
+    codigos = np.fromiter((mapa.setdefault(v, len(mapa)) for v in valores), dtype=np.int64)
+    return codigos, list(mapa)
+
+
+def empacotar_colheitas(lista_colheitas):
+    """
+    Empacota colheitas em arrays NumPy para as análises vetorizadas
+
+    Parâmetro:
+        lista_colheitas: lista de colheitas ou ArmazemColunar (inclusive
+                         ColheitasMapeadas, de um arquivo mapeado)
+
+    Retorna:
+        dict: arrays por campo e tabelas de categorias
+    """
+    if isinstance(lista_colheitas, ArmazemColunar):
+        # Cópia direta de cada coluna (a cópia evita prender os arrays do
+        # armazém, que não poderiam crescer enquanto exportam o buffer);
+        # as colunas de um arquivo mapeado (somente leitura) são usadas
+        # sem cópia quando já têm o tipo pedido
+        armazem = lista_colheitas
+        copiar = not isinstance(armazem, ColheitasMapeadas)
+
+        def coluna(campo, tipo):
+            return np.asarray(armazem.coluna(campo)).astype(tipo, copy=copiar)
+
+        return {
+            'lista': armazem,
+            'data': coluna('data_ordinal', np.int64),
+            'ids': coluna('id', np.int64),
+            'producao': coluna('quantidade_colhida', np.float64),
+            'area': coluna('area_colhida', np.float64),
+            'percentual_perda': coluna('percentual_perda_total', np.float64),
+            'variedade': coluna('variedade', np.intp),
+            'variedades': armazem.categorias['variedade'],
+            'tipo': coluna('tipo_colheita', np.intp),
+            'tipos': armazem.categorias['tipo_colheita'],
+            # Chave única do talhão: id_fazenda nos bits altos, código do talhão nos baixos
+            'talhao': (coluna('id_fazenda', np.int64) << 32) | coluna('codigo_talhao', np.int64),
+        }
+
+    n = len(lista_colheitas)
+    variedade, variedades = _fatorar(c['variedade'] for c in lista_colheitas)
+    tipo, tipos = _fatorar(c['tipo_colheita'] for c in lista_colheitas)
+    talhao, _ = _fatorar((c['id_fazenda'], c['codigo_talhao']) for c in lista_colheitas)
+
+    return {
+        'lista': lista_colheitas,
+        'data': np.fromiter((SEM_DATA if c['data_ordinal'] is None else c['data_ordinal']
+                             for c in lista_colheitas), dtype=np.int64, count=n),
+        'ids': np.fromiter((c['id'] for c in lista_colheitas), dtype=np.int64, count=n),
+        'producao': np.fromiter((c['quantidade_colhida'] for c in lista_colheitas), dtype=np.float64, count=n),
+        'area': np.fromiter((c['area_colhida'] for c in lista_colheitas), dtype=np.float64, count=n),
+        'percentual_perda': np.fromiter((c['percentual_perda_total'] for c in lista_colheitas),
+                                        dtype=np.float64, count=n),
+        'variedade': variedade,
+        'variedades': variedades,
+        'tipo': tipo,
+        'tipos': tipos,
+        'talhao': talhao,
+    }
+
+
+def filtrar_periodo(pacote, ordinal_inicio=None, ordinal_fim=None):
+    """
+    Seleciona em um pacote as colheitas de um período (inclusive), em ordem
+    de data como modulos.colheita.buscar_colheitas_periodo (colheitas sem
+    data ficam de fora)
+
+    Parâmetros:
+        pacote (dict): colheitas empacotadas (empacotar_colheitas)
+        ordinal_inicio (int): data ordinal inicial (None = sem limite)
+        ordinal_fim (int): data ordinal final (None = sem limite)
+
+    Retorna:
+        dict: pacote do período; 'posicoes' liga cada linha à colheita da lista
+    """
+    datas = pacote['data']
+    mascara = datas != SEM_DATA
+    if ordinal_inicio is not None:
+        mascara &= datas >= ordinal_inicio
+    if ordinal_fim is not None:
+        mascara &= datas <= ordinal_fim
+    posicoes = np.flatnonzero(mascara)
+    posicoes = posicoes[np.argsort(datas[posicoes], kind='stable')]
+
+    periodo = {campo: (valores[posicoes] if isinstance(valores, np.ndarray) else valores)
+               for campo, valores in pacote.items()}
+    periodo['posicoes'] = posicoes
+    return periodo
+
+
+def _grupos_por_aparicao(chaves):
+    """
+    Agrupa chaves inteiras numerando os grupos pela primeira aparição
+
+    Parâmetro:
+        chaves (ndarray): chave de grupo de cada colheita
+
+    Retorna:
+        tuple: (grupo de cada colheita, posição da primeira colheita de cada grupo)
+    """
+    _, primeira, inversa = np.unique(chaves, return_index=True, return_inverse=True)
+    ordem = np.argsort(primeira, kind='stable')
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(len(ordem))
+    return posicao[inversa.ravel()], primeira[ordem]
+
+
+def analisar_produtividade_por_variedade(lista_colheitas, pacote=None):
+    """
+    Analisa produtividade por variedade de cana (versão vetorizada)
+
+    Parâmetros:
+        lista_colheitas: colheitas a analisar
+        pacote (dict): colheitas já empacotadas (opcional)
+
+    Retorna:
+        dict: análise por variedade (mesmo formato de modulos.analise)
+    """
+    if pacote is None:
+        pacote = empacotar_colheitas(lista_colheitas)
+    if not len(pacote['ids']):
+        return {}
+
+    grupo, primeira = _grupos_por_aparicao(pacote['variedade'])
+    num_grupos = len(primeira)
+    contagem = np.bincount(grupo, minlength=num_grupos)
+    producao = np.bincount(grupo, weights=pacote['producao'], minlength=num_grupos)
+    area = np.bincount(grupo, weights=pacote['area'], minlength=num_grupos)
+
+    # Listas de IDs e perdas por grupo (ordenação estável mantém a ordem original)
+    ordenacao = np.argsort(grupo, kind='stable')
+    limites = np.cumsum(contagem)[:-1]
+    ids_grupos = np.split(pacote['ids'][ordenacao], limites)
+    perdas_grupos = np.split(pacote['percentual_perda'][ordenacao], limites)
+    soma_perdas = np.bincount(grupo, weights=pacote['percentual_perda'], minlength=num_grupos)
+
+    analise = {}
+    for g in range(num_grupos):
+        variedade = pacote['variedades'][pacote['variedade'][primeira[g]]]
+        num = int(contagem[g])
+        dados = {
+            'colheitas': ids_grupos[g].tolist(),
+            'producao_total': float(producao[g]),
+            'area_total': float(area[g]),
+            'perdas': perdas_grupos[g].tolist(),
+        }
+        dados['produtividade_media'] = dados['producao_total'] / dados['area_total'] if dados['area_total'] > 0 else 0
+        dados['perda_media'] = float(soma_perdas[g]) / num
+        dados['num_colheitas'] = num
+
+        # Compara com produtividade esperada
+        if variedade in PRODUTIVIDADE_ESPERADA:
+            esperado = PRODUTIVIDADE_ESPERADA[variedade]
+            dados['produtividade_esperada'] = esperado
+            dados['diferenca_esperado'] = dados['produtividade_media'] - esperado
+            dados['percentual_esperado'] = (dados['produtividade_media'] / esperado * 100) if esperado > 0 else 0
+        else:
+            dados['produtividade_esperada'] = None
+            dados['diferenca_esperado'] = None
+            dados['percentual_esperado'] = None
+
+        analise[variedade] = dados
+
+    return analise
+
+
+def identificar_talhoes_criticos(lista_colheitas, top_k=None, pacote=None):
+    """
+    Identifica talhões com maiores perdas (versão vetorizada)
+
+    Parâmetros:
+        lista_colheitas: colheitas a analisar
+        top_k (int): quantidade de talhões a retornar (None = todos)
+        pacote (dict): colheitas já empacotadas (opcional)
+
+    Retorna:
+        list: lista de tuplas (fazenda, talhão, perda_media, num_colheitas)
+    """
+    if pacote is None:
+        pacote = empacotar_colheitas(lista_colheitas)
+    if not len(pacote['ids']):
+        return []
+
+    grupo, primeira = _grupos_por_aparicao(pacote['talhao'])
+    contagem = np.bincount(grupo)
+    medias = np.bincount(grupo, weights=pacote['percentual_perda']) / contagem
+
+    lista = pacote['lista']
+    if 'posicoes' in pacote:
+        primeira = pacote['posicoes'][primeira]
+    resultado = []
+    for g, posicao in enumerate(primeira.tolist()):
+        colheita = lista[posicao]
+        resultado.append((colheita['nome_fazenda'], colheita['codigo_talhao'],
+                          round(float(medias[g]), 2), int(contagem[g])))
+
+    if top_k is not None:
+        return heapq.nlargest(top_k, resultado, key=lambda x: x[2])
+    return sorted(resultado, key=lambda x: x[2], reverse=True)
+
+
+def comparar_metodos_colheita(lista_colheitas, pacote=None):
+    """
+    Compara perdas entre métodos de colheita (versão vetorizada)
+
+    Parâmetros:
+        lista_colheitas: colheitas a analisar
+        pacote (dict): colheitas já empacotadas (opcional)
+
+    Retorna:
+        dict: comparação entre métodos (mesmo formato de modulos.colheita)
+    """
+    if pacote is None:
+        pacote = empacotar_colheitas(lista_colheitas)
+
+    num_tipos = len(pacote['tipos'])
+    contagem = np.bincount(pacote['tipo'], minlength=num_tipos)
+    soma = np.bincount(pacote['tipo'], weights=pacote['percentual_perda'], minlength=num_tipos)
+
+    def resumo(tipo):
+        if tipo not in pacote['tipos']:
+            return 0, 0
+        cod = pacote['tipos'].index(tipo)
+        quantidade = int(contagem[cod])
+        return quantidade, (float(soma[cod]) / quantidade if quantidade else 0)
+
+    qtd_manual, media_manual = resumo('manual')
+    qtd_mecanica, media_mecanica = resumo('mecânica')
+
+    return {
+        'manual': {
+            'quantidade': qtd_manual,
+            'perda_media': round(media_manual, 2)
+        },
+        'mecanica': {
+            'quantidade': qtd_mecanica,
+            'perda_media': round(media_mecanica, 2)
+        },
+        'diferenca': round(media_mecanica - media_manual, 2)
+    }
@@ -3,10 +3,146 @@ Módulo de manipulação de arquivos
 Capítulo 5: Arquivos texto e JSON
 """
 
+import bz2
+import functools
+import gzip
 import json
+import lzma
 import os
+import shutil
+import zlib
 from datetime import datetime
-from config import ARQUIVO_FAZENDAS, ARQUIVO_COLHEITAS, ARQUIVO_LOGS
+from modulos import binario, mapeado
+from modulos.registros import Fazenda, Colheita, para_dict
+from config import (ARQUIVO_FAZENDAS, ARQUIVO_COLHEITAS, ARQUIVO_LOGS, ARQUIVO_QUANTIS, ARQUIVO_BINARIO,
+                    ARQUIVO_COLUNAR,
+                    ARQUIVO_DIARIO_COLHEITAS, MODO_GRAVACAO_COLHEITAS, COMPACTAR_DIARIO_A_CADA,
+                    COMPRESSAO_ARQUIVOS)
+
+
+# Operações aceitas no diário de colheitas
+OPERACOES_DIARIO = ('incluir', 'atualizar', 'remover', 'limpar')
+
+# Linhas no diário desde o último snapshot: [quantidade]
+_linhas_diario = [0]
+
+# Caracteres lidos por vez na leitura incremental de JSON
+TAMANHO_BLOCO_LEITURA = 1 << 16
+
+# Codecs de compressão (biblioteca padrão): extensão do arquivo e função de
+# abertura; todos comprimem e descomprimem em fluxo, bloco a bloco.
+# gzip usa o nível 6 (padrão do zlib): quase o mesmo tamanho do nível 9,
+# com gravação bem mais rápida
+CODECS_COMPRESSAO = {
+    'gzip': ('.gz', functools.partial(gzip.open, compresslevel=6)),
+    'lzma': ('.xz', lzma.open),
+    'bz2': ('.bz2', bz2.open),
+}
+
+# Erros de leitura de um arquivo compactado truncado ou corrompido
+# (o bz2 usa OSError comum: ver erro_descompressao)
+ERROS_DESCOMPRESSAO = (EOFError, gzip.BadGzipFile, lzma.LZMAError, zlib.error)
+
+if COMPRESSAO_ARQUIVOS is not None and COMPRESSAO_ARQUIVOS not in CODECS_COMPRESSAO:
+    raise ValueError(f"COMPRESSAO_ARQUIVOS inválido: '{COMPRESSAO_ARQUIVOS}' "
+                     f"(use None, {', '.join(repr(c) for c in CODECS_COMPRESSAO)})")
+
+
+def erro_descompressao(erro):
+    """
+    Indica se um erro de leitura vem de dados compactados truncados ou corrompidos
+    O bz2 sinaliza dados inválidos com OSError sem errno; erros do sistema
+    operacional (permissão negada, falha de disco) têm errno e não entram
+    
+    Parâmetro:
+        erro (Exception): erro da leitura
+    
+    Retorna:
+        bool: True se o erro indica dados compactados inválidos
+    """
+    return isinstance(erro, ERROS_DESCOMPRESSAO) or (type(erro) is OSError and erro.errno is None)
+
+
+def caminho_compactado(caminho):
+    """
+    Retorna o caminho de um arquivo de dados com a extensão do codec
+    configurado (COMPRESSAO_ARQUIVOS)
+    
+    Parâmetro:
+        caminho (str): caminho sem compressão (ex: dados/colheitas.json)
+    
+    Retorna:
+        str: caminho do arquivo gravado com o codec
+    """
+    if COMPRESSAO_ARQUIVOS is None:
+        return caminho
+    return caminho + CODECS_COMPRESSAO[COMPRESSAO_ARQUIVOS][0]
+
+
+def _variantes(caminho):
+    """Caminhos possíveis de um arquivo de dados: o do codec configurado primeiro"""
+    variantes = [caminho_compactado(caminho), caminho]
+    variantes += [caminho + extensao for extensao, _ in CODECS_COMPRESSAO.values()]
+    return list(dict.fromkeys(variantes))
+
+
+def localizar_arquivo(caminho):
+    """
+    Localiza um arquivo de dados gravado com qualquer codec
+    Permite ler os dados gravados antes de uma troca de COMPRESSAO_ARQUIVOS
+    
+    Parâmetro:
+        caminho (str): caminho sem compressão
+    
+    Retorna:
+        str: caminho existente (prefere o do codec configurado) ou None
+    """
+    for variante in _variantes(caminho):
+        if os.path.exists(variante):
+            return variante
+    return None
+
+
+def _remover_variantes(caminho, manter=None):
+    """Remove as versões de um arquivo de dados gravadas com outros codecs"""
+    for variante in _variantes(caminho):
+        if variante != manter and os.path.exists(variante):
+            os.remove(variante)
+
+
+def codec_do_arquivo(caminho):
+    """
+    Identifica o codec de um arquivo pela extensão
+    
+    Parâmetro:
+        caminho (str): caminho do arquivo
+    
+    Retorna:
+        str: 'gzip', 'lzma', 'bz2' ou None (sem compressão)
+    """
+    for codec, (extensao, _) in CODECS_COMPRESSAO.items():
+        if caminho.endswith(extensao):
+            return codec
+    return None
+
+
+def abrir_arquivo_dados(caminho, modo='r', codec=None):
+    """
+    Abre um arquivo de dados em modo texto (UTF-8), compactado ou não
+    A compressão/descompressão é feita em fluxo, sem carregar o arquivo
+    
+    Parâmetros:
+        caminho (str): caminho do arquivo
+        modo (str): 'r', 'w' ou 'a'
+        codec (str): codec do arquivo (padrão: identificado pela extensão)
+    
+    Retorna:
+        arquivo texto aberto
+    """
+    codec = codec or codec_do_arquivo(caminho)
+    if codec is None:
+        return open(caminho, modo, encoding='utf-8')
+    return CODECS_COMPRESSAO[codec][1](caminho, modo + 't', encoding='utf-8')
 
 
 def registrar_log(mensagem, tipo="INFO"):
@@ -98,9 +234,13 @@ def salvar_fazendas_json(lista_fazendas):
         # Cria diretório se não existir
         os.makedirs(os.path.dirname(ARQUIVO_FAZENDAS), exist_ok=True)
         
-        # Converte para JSON e salva
-        with open(ARQUIVO_FAZENDAS, 'w', encoding='utf-8') as arquivo:
-            json.dump(lista_fazendas, arquivo, ensure_ascii=False, indent=2)
+        # Converte registros em dicionários e salva em JSON (compactado
+        # conforme COMPRESSAO_ARQUIVOS)
+        fazendas_serializaveis = [para_dict(fazenda) for fazenda in lista_fazendas]
+        destino = caminho_compactado(ARQUIVO_FAZENDAS)
+        with abrir_arquivo_dados(destino, 'w') as arquivo:
+            json.dump(fazendas_serializaveis, arquivo, ensure_ascii=False, indent=2)
+        _remover_variantes(ARQUIVO_FAZENDAS, manter=destino)
         
         registrar_log(f"Fazendas salvas em JSON: {len(lista_fazendas)} registros", "INFO")
         return True
@@ -116,14 +256,15 @@ def carregar_fazendas_json():
     Leitura de arquivo JSON
     
     Retorna:
-        list: lista de fazendas ou lista vazia
+        list: lista de fazendas (registros Fazenda) ou lista vazia
     """
     try:
-        if not os.path.exists(ARQUIVO_FAZENDAS):
+        origem = localizar_arquivo(ARQUIVO_FAZENDAS)
+        if origem is None:
             return []
         
-        with open(ARQUIVO_FAZENDAS, 'r', encoding='utf-8') as arquivo:
-            fazendas = json.load(arquivo)
+        with abrir_arquivo_dados(origem) as arquivo:
+            fazendas = [Fazenda.from_dict(f) for f in json.load(arquivo)]
         
         registrar_log(f"Fazendas carregadas do JSON: {len(fazendas)} registros", "INFO")
         return fazendas
@@ -137,11 +278,57 @@ def carregar_fazendas_json():
         return []
 
 
-def salvar_colheitas_json(lista_colheitas):
+def _colheita_serializavel(colheita):
     """
-    Salva lista de colheitas em arquivo JSON
+    Copia uma colheita convertendo tuplas em listas (JSON não suporta tuplas)
+    
+    Parâmetro:
+        colheita (dict): colheita a gravar
+    
+    Retorna:
+        dict: cópia serializável
+    """
+    colheita_copia = colheita.copy()
+    if 'resumo_perdas' in colheita_copia:
+        colheita_copia['resumo_perdas'] = list(colheita_copia['resumo_perdas'])
+    return colheita_copia
+
+
+def salvar_colheitas_json(lista_colheitas, alteracoes=None):
+    """
+    Salva as colheitas em arquivo JSON
     Escrita de arquivo JSON com estrutura complexa
     
+    No modo 'diario' (MODO_GRAVACAO_COLHEITAS), com a lista de alterações
+    informada, apenas as alterações são acrescentadas ao diário; o snapshot
+    completo só é regravado ao compactar ou quando a lista inteira mudou.
+    
+    Parâmetros:
+        lista_colheitas (list): lista de colheitas a salvar
+        alteracoes (list): alterações desde a última gravação, pares
+                           (operação, dados) (opcional; None = snapshot)
+    
+    Retorna:
+        bool: True se salvo com sucesso
+    """
+    if (MODO_GRAVACAO_COLHEITAS == 'diario' and alteracoes is not None
+            and all(operacao in OPERACOES_DIARIO for operacao, _ in alteracoes)):
+        if not registrar_no_diario(alteracoes):
+            return False
+        if _linhas_diario[0] >= COMPACTAR_DIARIO_A_CADA:
+            return compactar_diario(lista_colheitas)
+        return True
+    
+    return compactar_diario(lista_colheitas)
+
+
+def compactar_diario(lista_colheitas):
+    """
+    Grava o snapshot completo das colheitas e descarta o diário
+    O snapshot é gravado em arquivo temporário e renomeado; o diário só é
+    removido depois (reaplicar o diário sobre o novo snapshot não altera o
+    resultado, pois as operações são idempotentes)
+    
     Parâmetro:
         lista_colheitas (list): lista de colheitas a salvar
     
@@ -152,18 +339,19 @@ def salvar_colheitas_json(lista_colheitas):
         # Cria diretório se não existir
         os.makedirs(os.path.dirname(ARQUIVO_COLHEITAS), exist_ok=True)
         
-        # Converte tuplas para listas (JSON não suporta tuplas)
-        colheitas_serializaveis = []
-        for colheita in lista_colheitas:
-            colheita_copia = colheita.copy()
-            # Converte tupla resumo_perdas para lista
-            if 'resumo_perdas' in colheita_copia:
-                colheita_copia['resumo_perdas'] = list(colheita_copia['resumo_perdas'])
-            colheitas_serializaveis.append(colheita_copia)
-        
-        # Salva em JSON
-        with open(ARQUIVO_COLHEITAS, 'w', encoding='utf-8') as arquivo:
+        colheitas_serializaveis = [_colheita_serializavel(c) for c in lista_colheitas]
+        
+        # Salva em JSON (arquivo temporário + troca atômica), compactado
+        # em fluxo conforme COMPRESSAO_ARQUIVOS
+        destino = caminho_compactado(ARQUIVO_COLHEITAS)
+        temporario = destino + '.tmp'
+        with abrir_arquivo_dados(temporario, 'w', codec=COMPRESSAO_ARQUIVOS) as arquivo:
             json.dump(colheitas_serializaveis, arquivo, ensure_ascii=False, indent=2)
+        os.replace(temporario, destino)
+        _remover_variantes(ARQUIVO_COLHEITAS, manter=destino)
+        
+        _remover_variantes(ARQUIVO_DIARIO_COLHEITAS)
+        _linhas_diario[0] = 0
         
         registrar_log(f"Colheitas salvas em JSON: {len(lista_colheitas)} registros", "INFO")
         return True
@@ -173,27 +361,261 @@ def salvar_colheitas_json(lista_colheitas):
         return False
 
 
-def carregar_colheitas_json():
+def _linha_diario(operacao, dados):
     """
-    Carrega lista de colheitas do arquivo JSON
-    Leitura de arquivo JSON
+    Monta o registro JSON de uma alteração do diário
+    
+    Parâmetros:
+        operacao (str): 'incluir', 'atualizar', 'remover' ou 'limpar'
+        dados: colheita (incluir), (id, campos) (atualizar), id (remover)
+               ou None (limpar)
     
     Retorna:
-        list: lista de colheitas ou lista vazia
+        dict: registro da alteração
+    """
+    if operacao == 'incluir':
+        return {'operacao': operacao, 'colheita': _colheita_serializavel(dados)}
+    if operacao == 'atualizar':
+        id_colheita, campos = dados
+        return {'operacao': operacao, 'id': id_colheita, 'campos': campos}
+    if operacao == 'remover':
+        return {'operacao': operacao, 'id': dados}
+    return {'operacao': operacao}
+
+
+def registrar_no_diario(alteracoes):
     """
+    Acrescenta alterações ao diário de colheitas (uma linha JSON cada)
+    
+    Parâmetro:
+        alteracoes (list): pares (operação, dados) — ver _linha_diario
+    
+    Retorna:
+        bool: True se gravado com sucesso
+    """
+    if not alteracoes:
+        return True
+    
     try:
-        if not os.path.exists(ARQUIVO_COLHEITAS):
-            return []
+        os.makedirs(os.path.dirname(ARQUIVO_DIARIO_COLHEITAS), exist_ok=True)
         
-        with open(ARQUIVO_COLHEITAS, 'r', encoding='utf-8') as arquivo:
-            colheitas = json.load(arquivo)
+        linhas = [
+            json.dumps(_linha_diario(operacao, dados), ensure_ascii=False) + '\n'
+            for operacao, dados in alteracoes
+        ]
+        # Continua o diário existente (mesmo que gravado com outro codec);
+        # no gzip, lzma e bz2 cada gravação acrescenta um novo bloco compactado
+        destino = localizar_arquivo(ARQUIVO_DIARIO_COLHEITAS) or caminho_compactado(ARQUIVO_DIARIO_COLHEITAS)
+        with abrir_arquivo_dados(destino, 'a') as arquivo:
+            arquivo.writelines(linhas)
+        _linhas_diario[0] += len(linhas)
+        
+        registrar_log(f"Diário de colheitas: {len(linhas)} alteração(ões) gravada(s)", "INFO")
+        return True
+    except Exception as e:
+        print(f"✗ Erro ao gravar diário de colheitas: {e}")
+        registrar_log(f"Erro ao gravar diário de colheitas: {e}", "ERRO")
+        return False
+
+
+def iterar_json(arquivo, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+    """
+    Gera os objetos de um arquivo JSON um a um, lendo em blocos
+    Aceita um array de objetos (formato de colheitas.json) ou objetos em
+    sequência (um por linha, JSONL); só o bloco atual fica em memória
+    
+    Parâmetros:
+        arquivo: arquivo texto aberto para leitura
+        tamanho_bloco (int): caracteres lidos por vez
+    
+    Retorna:
+        generator: objetos decodificados, na ordem do arquivo
+    
+    Exceções:
+        json.JSONDecodeError: conteúdo inválido
+    """
+    decodificador = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    fim_arquivo = False
+    em_array = None  # descoberto no primeiro caractere
+    
+    while True:
+        # Pula espaços e separadores, lendo mais se o bloco acabar
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) or fim_arquivo:
+                break
+            bloco = arquivo.read(tamanho_bloco)
+            fim_arquivo = not bloco
+            buffer, pos = buffer[pos:] + bloco, 0
+        
+        if pos >= len(buffer):
+            return
+        if em_array is None:
+            em_array = buffer[pos] == '['
+            if em_array:
+                pos += 1
+                continue
+        if em_array and buffer[pos] == ']':
+            return
+        
+        try:
+            objeto, pos_final = decodificador.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if fim_arquivo:
+                raise
+            # Objeto incompleto no fim do bloco: lê o próximo e tenta de novo
+            bloco = arquivo.read(tamanho_bloco)
+            fim_arquivo = not bloco
+            buffer, pos = buffer[pos:] + bloco, 0
+            continue
+        
+        yield objeto
+        pos = pos_final
+
+
+def _ler_diario():
+    """
+    Gera os registros do diário de colheitas
+    Linhas inválidas (ex: gravação interrompida) são ignoradas com aviso
+    
+    Retorna:
+        generator: registros (dict) com a chave 'operacao'
+    """
+    origem = localizar_arquivo(ARQUIVO_DIARIO_COLHEITAS)
+    if origem is None:
+        return
+    
+    numero = 0
+    try:
+        with abrir_arquivo_dados(origem) as arquivo:
+            for numero, linha in enumerate(arquivo, 1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                    registro['operacao']
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    print(f"⚠️ Linha {numero} do diário de colheitas inválida (ignorada)")
+                    registrar_log(f"Linha {numero} do diário de colheitas inválida", "AVISO")
+                    continue
+                yield registro
+    except (*ERROS_DESCOMPRESSAO, OSError) as e:
+        if codec_do_arquivo(origem) is None or not erro_descompressao(e):
+            raise
+        # Diário compactado interrompido no meio de uma gravação
+        print(f"⚠️ Diário de colheitas compactado incompleto após a linha {numero} (restante ignorado)")
+        registrar_log(f"Diário de colheitas compactado incompleto após a linha {numero}: {e}", "AVISO")
+
+
+def resumir_diario():
+    """
+    Lê o diário e resume o efeito final das alterações por ID de colheita
+    (o diário tem só as alterações, então cabe em memória)
+    
+    Retorna:
+        tuple: (limpo, efeitos, incluidas)
+            limpo (bool): o diário esvaziou as colheitas do snapshot
+            efeitos (dict): id -> [colheita incluída ou None, lista de campos
+                            atualizados, removida (bool), no lugar (bool)]
+            incluidas (dict): IDs incluídos pelo diário, na ordem em que
+                              entram no fim da lista
+    """
+    limpo = False
+    efeitos = {}
+    incluidas = {}
+    num_linhas = 0
+    
+    for registro in _ler_diario():
+        num_linhas += 1
+        operacao = registro['operacao']
         
-        # Converte listas de volta para tuplas onde necessário
-        for colheita in colheitas:
-            if 'resumo_perdas' in colheita and isinstance(colheita['resumo_perdas'], list):
-                colheita['resumo_perdas'] = tuple(tuple(item) for item in colheita['resumo_perdas'])
+        if operacao == 'limpar':
+            limpo = True
+            efeitos.clear()
+            incluidas.clear()
+        elif operacao == 'incluir':
+            colheita = Colheita.from_dict(registro['colheita'])
+            anterior = efeitos.get(colheita['id'])
+            # Incluída de novo após remoção: vai para o fim da lista
+            no_lugar = not (anterior and anterior[2])
+            efeitos[colheita['id']] = [colheita, [], False, no_lugar]
+            incluidas.setdefault(colheita['id'], None)
+        elif operacao == 'atualizar':
+            efeito = efeitos.setdefault(registro['id'], [None, [], False, True])
+            if not efeito[2]:
+                efeito[1].append(registro['campos'])
+        elif operacao == 'remover':
+            efeitos[registro['id']] = [None, [], True, False]
+            incluidas.pop(registro['id'], None)
+    
+    _linhas_diario[0] = num_linhas
+    return limpo, efeitos, incluidas
+
+
+def _aplicar_campos(colheita, lista_campos):
+    """Aplica atualizações de campos do diário a uma colheita"""
+    if not lista_campos:
+        return colheita
+    atualizada = colheita.copy()
+    for campos in lista_campos:
+        atualizada.update(campos)
+    return Colheita.from_dict(atualizada)
+
+
+def iterar_colheitas_json():
+    """
+    Gera as colheitas do snapshot JSON com as alterações do diário aplicadas,
+    uma a uma (leitura incremental; cada registro é convertido ao ser lido)
+    
+    Retorna:
+        generator: colheitas (registros Colheita), na ordem da lista
+    
+    Exceções:
+        json.JSONDecodeError, OSError: snapshot ilegível
+        ERROS_DESCOMPRESSAO: snapshot compactado truncado ou corrompido
+                             (bz2: OSError sem errno; ver erro_descompressao)
+    """
+    limpo, efeitos, incluidas = resumir_diario()
+    
+    origem = localizar_arquivo(ARQUIVO_COLHEITAS)
+    if origem is not None and not limpo:
+        with abrir_arquivo_dados(origem) as arquivo:
+            for dados in iterar_json(arquivo):
+                efeito = efeitos.get(dados['id'])
+                if efeito is None:
+                    yield Colheita.from_dict(dados)
+                    continue
+                colheita, lista_campos, removida, no_lugar = efeito
+                if removida or (colheita is not None and not no_lugar):
+                    continue
+                if colheita is None:
+                    colheita = Colheita.from_dict(dados)
+                else:
+                    del incluidas[dados['id']]  # substitui no lugar
+                yield _aplicar_campos(colheita, lista_campos)
+    
+    for id_colheita in incluidas:
+        colheita, lista_campos, _, _ = efeitos[id_colheita]
+        yield _aplicar_campos(colheita, lista_campos)
+
+
+def carregar_colheitas_json():
+    """
+    Carrega lista de colheitas do arquivo JSON
+    Leitura incremental do snapshot JSON seguida das alterações do diário
+    (para consumir as colheitas sem montar a lista, use iterar_colheitas_json)
+    
+    Retorna:
+        list: lista de colheitas (registros Colheita) ou lista vazia
+    """
+    try:
+        colheitas = list(iterar_colheitas_json())
         
-        registrar_log(f"Colheitas carregadas do JSON: {len(colheitas)} registros", "INFO")
+        registrar_log(f"Colheitas carregadas do JSON: {len(colheitas)} registros "
+                      f"({_linhas_diario[0]} alteração(ões) do diário)", "INFO")
         return colheitas
     except json.JSONDecodeError as e:
         print(f"✗ Erro ao decodificar JSON de colheitas: {e}")
@@ -205,6 +627,185 @@ def carregar_colheitas_json():
         return []
 
 
+def salvar_quantis_json(esbocos):
+    """
+    Salva os esboços de percentis em arquivo JSON (junto às colheitas,
+    compactado conforme COMPRESSAO_ARQUIVOS)
+    
+    Parâmetro:
+        esbocos (dict): estrutura gerada por quantis.exportar_esbocos
+    
+    Retorna:
+        bool: True se salvo com sucesso
+    """
+    try:
+        os.makedirs(os.path.dirname(ARQUIVO_QUANTIS), exist_ok=True)
+        
+        destino = caminho_compactado(ARQUIVO_QUANTIS)
+        temporario = destino + '.tmp'
+        with abrir_arquivo_dados(temporario, 'w', codec=COMPRESSAO_ARQUIVOS) as arquivo:
+            json.dump(esbocos, arquivo, ensure_ascii=False)
+        os.replace(temporario, destino)
+        _remover_variantes(ARQUIVO_QUANTIS, manter=destino)
+        
+        registrar_log(f"Esboços de percentis salvos: {len(esbocos['esbocos'])} esboços", "INFO")
+        return True
+    except Exception as e:
+        print(f"✗ Erro ao salvar esboços de percentis: {e}")
+        registrar_log(f"Erro ao salvar esboços de percentis: {e}", "ERRO")
+        return False
+
+
+def carregar_quantis_json():
+    """
+    Carrega os esboços de percentis do arquivo JSON
+    
+    Retorna:
+        dict: estrutura para quantis.restaurar_esbocos ou None se ausente/inválido
+    """
+    try:
+        origem = localizar_arquivo(ARQUIVO_QUANTIS)
+        if origem is None:
+            return None
+        
+        with abrir_arquivo_dados(origem) as arquivo:
+            return json.load(arquivo)
+    except Exception as e:
+        # Sem os esboços gravados, eles são recalculados a partir das colheitas
+        motivo = f"arquivo compactado truncado ou corrompido ({e})" if erro_descompressao(e) else e
+        print(f"⚠️ Esboços de percentis não carregados: {motivo}")
+        registrar_log(f"Erro ao carregar esboços de percentis: {motivo}", "AVISO")
+        return None
+
+
+def salvar_binario(lista_fazendas, lista_colheitas):
+    """
+    Salva fazendas e colheitas no snapshot binário (modulos.binario)
+    Contraparte binária de salvar_fazendas_json/salvar_colheitas_json
+    
+    Parâmetros:
+        lista_fazendas (list): lista de fazendas a salvar
+        lista_colheitas (list): lista de colheitas a salvar
+    
+    Retorna:
+        bool: True se salvo com sucesso
+    """
+    try:
+        os.makedirs(os.path.dirname(ARQUIVO_BINARIO), exist_ok=True)
+        
+        # Grava em arquivo temporário e substitui: o snapshot anterior só
+        # é descartado depois que o novo estiver completo
+        temporario = ARQUIVO_BINARIO + '.tmp'
+        resumo = binario.gravar_snapshot(temporario, lista_fazendas, lista_colheitas)
+        os.replace(temporario, ARQUIVO_BINARIO)
+        
+        registrar_log(f"Snapshot binário salvo: {resumo['fazendas']} fazendas, "
+                      f"{resumo['colheitas']} colheitas, {resumo['bytes']} bytes", "INFO")
+        return True
+    except Exception as e:
+        print(f"✗ Erro ao salvar snapshot binário: {e}")
+        registrar_log(f"Erro ao salvar snapshot binário: {e}", "ERRO")
+        return False
+
+
+def carregar_binario():
+    """
+    Carrega fazendas e colheitas do snapshot binário
+    Contraparte binária de carregar_fazendas_json/carregar_colheitas_json
+    
+    Retorna:
+        tuple: (fazendas, colheitas) ou None se ausente/inválido
+    """
+    try:
+        if not os.path.exists(ARQUIVO_BINARIO):
+            print(f"⚠️ Snapshot binário não encontrado: {ARQUIVO_BINARIO}")
+            return None
+        
+        fazendas, colheitas = binario.ler_snapshot(ARQUIVO_BINARIO)
+        
+        registrar_log(f"Snapshot binário carregado: {len(fazendas)} fazendas, "
+                      f"{len(colheitas)} colheitas", "INFO")
+        return fazendas, colheitas
+    except ValueError as e:
+        print(f"✗ Snapshot binário inválido: {e}")
+        registrar_log(f"Snapshot binário inválido: {e}", "ERRO")
+        return None
+    except Exception as e:
+        print(f"✗ Erro ao carregar snapshot binário: {e}")
+        registrar_log(f"Erro ao carregar snapshot binário: {e}", "ERRO")
+        return None
+
+
+def salvar_colunar(lista_colheitas):
+    """
+    Salva as colheitas no arquivo colunar para mmap (modulos.mapeado)
+    
+    Parâmetro:
+        lista_colheitas: lista de colheitas ou ArmazemColunar
+    
+    Retorna:
+        bool: True se salvo com sucesso
+    """
+    try:
+        os.makedirs(os.path.dirname(ARQUIVO_COLUNAR), exist_ok=True)
+        
+        temporario = ARQUIVO_COLUNAR + '.tmp'
+        resumo = mapeado.gravar_mapeado(temporario, lista_colheitas)
+        os.replace(temporario, ARQUIVO_COLUNAR)
+        
+        registrar_log(f"Arquivo colunar salvo: {resumo['colheitas']} colheitas, "
+                      f"{resumo['bytes']} bytes", "INFO")
+        return True
+    except Exception as e:
+        print(f"✗ Erro ao salvar arquivo colunar: {e}")
+        registrar_log(f"Erro ao salvar arquivo colunar: {e}", "ERRO")
+        return False
+
+
+def colunar_atualizado():
+    """
+    Indica se o arquivo colunar foi gravado depois dos arquivos de colheitas
+    (snapshot e diário), ou seja, se tem os mesmos dados que seriam carregados
+    
+    Retorna:
+        bool: True se o arquivo colunar existe e está atualizado
+    """
+    if not os.path.exists(ARQUIVO_COLUNAR):
+        return False
+    
+    fontes = [localizar_arquivo(ARQUIVO_COLHEITAS), localizar_arquivo(ARQUIVO_DIARIO_COLHEITAS)]
+    fontes = [fonte for fonte in fontes if fonte is not None]
+    if not fontes:
+        return False
+    
+    gravado = os.path.getmtime(ARQUIVO_COLUNAR)
+    return all(os.path.getmtime(fonte) <= gravado for fonte in fontes)
+
+
+def abrir_colunar():
+    """
+    Abre o arquivo colunar mapeado em memória (lê apenas o cabeçalho)
+    
+    Retorna:
+        ColheitasMapeadas: colheitas somente leitura (feche com fechar() ou
+                           with) ou None se ausente/inválido
+    """
+    try:
+        if not os.path.exists(ARQUIVO_COLUNAR):
+            print(f"⚠️ Arquivo colunar não encontrado: {ARQUIVO_COLUNAR}")
+            return None
+        
+        return mapeado.ColheitasMapeadas(ARQUIVO_COLUNAR)
+    except ValueError as e:
+        print(f"✗ Arquivo colunar inválido: {e}")
+        registrar_log(f"Arquivo colunar inválido: {e}", "ERRO")
+        return None
+    except Exception as e:
+        print(f"✗ Erro ao abrir arquivo colunar: {e}")
+        registrar_log(f"Erro ao abrir arquivo colunar: {e}", "ERRO")
+        return None
+
+
 def exportar_relatorio_texto(nome_arquivo, conteudo):
     """
     Exporta um relatório em formato texto
@@ -251,10 +852,32 @@ Data: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
         return False
 
 
+def _copiar_para_backup(origem, destino):
+    """
+    Copia um arquivo de dados para o backup em fluxo (bloco a bloco),
+    recompactando com COMPRESSAO_ARQUIVOS se a origem usar outro codec
+    
+    Parâmetros:
+        origem (str): arquivo de dados (compactado ou não)
+        destino (str): caminho do backup, sem a extensão do codec
+    
+    Retorna:
+        str: caminho do backup gravado
+    """
+    destino = caminho_compactado(destino)
+    if codec_do_arquivo(origem) == COMPRESSAO_ARQUIVOS:
+        shutil.copyfile(origem, destino)
+    else:
+        with abrir_arquivo_dados(origem) as entrada, \
+                abrir_arquivo_dados(destino, 'w', codec=COMPRESSAO_ARQUIVOS) as saida:
+            shutil.copyfileobj(entrada, saida, TAMANHO_BLOCO_LEITURA)
+    return destino
+
+
 def backup_dados():
     """
     Cria backup dos arquivos de dados
-    Cópia de arquivos JSON
+    Cópia de arquivos JSON em fluxo (compactados conforme COMPRESSAO_ARQUIVOS)
     
     Retorna:
         bool: True se backup criado com sucesso
@@ -263,20 +886,24 @@ def backup_dados():
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Backup de fazendas
-        if os.path.exists(ARQUIVO_FAZENDAS):
-            backup_fazendas = f"dados/backup_fazendas_{timestamp}.json"
-            with open(ARQUIVO_FAZENDAS, 'r', encoding='utf-8') as origem:
-                conteudo = origem.read()
-            with open(backup_fazendas, 'w', encoding='utf-8') as destino:
-                destino.write(conteudo)
+        origem = localizar_arquivo(ARQUIVO_FAZENDAS)
+        if origem is not None:
+            _copiar_para_backup(origem, f"dados/backup_fazendas_{timestamp}.json")
         
         # Backup de colheitas
-        if os.path.exists(ARQUIVO_COLHEITAS):
-            backup_colheitas = f"dados/backup_colheitas_{timestamp}.json"
-            with open(ARQUIVO_COLHEITAS, 'r', encoding='utf-8') as origem:
-                conteudo = origem.read()
-            with open(backup_colheitas, 'w', encoding='utf-8') as destino:
-                destino.write(conteudo)
+        origem = localizar_arquivo(ARQUIVO_COLHEITAS)
+        if origem is not None:
+            _copiar_para_backup(origem, f"dados/backup_colheitas_{timestamp}.json")
+        
+        # Backup do diário de colheitas (alterações posteriores ao snapshot)
+        origem = localizar_arquivo(ARQUIVO_DIARIO_COLHEITAS)
+        if origem is not None:
+            _copiar_para_backup(origem, f"dados/backup_colheitas_diario_{timestamp}.jsonl")
+        
+        # Backup dos esboços de percentis
+        origem = localizar_arquivo(ARQUIVO_QUANTIS)
+        if origem is not None:
+            _copiar_para_backup(origem, f"dados/backup_quantis_{timestamp}.json")
         
         print(f"\n✓ Backup criado com sucesso!")
         registrar_log(f"Backup de dados criado: {timestamp}", "INFO")
@@ -320,27 +947,32 @@ def verificar_integridade_arquivos():
     
     # Verifica fazendas
     try:
-        if os.path.exists(ARQUIVO_FAZENDAS):
-            with open(ARQUIVO_FAZENDAS, 'r', encoding='utf-8') as arquivo:
+        origem = localizar_arquivo(ARQUIVO_FAZENDAS)
+        if origem is not None:
+            with abrir_arquivo_dados(origem) as arquivo:
                 json.load(arquivo)
         else:
             status['fazendas'] = 'AUSENTE'
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, UnicodeDecodeError):
         status['fazendas'] = 'CORROMPIDO'
-    except Exception:
-        status['fazendas'] = 'ERRO'
+    except Exception as e:
+        # Arquivo compactado truncado ou com dados inválidos
+        status['fazendas'] = 'CORROMPIDO' if erro_descompressao(e) else 'ERRO'
     
     # Verifica colheitas
     try:
-        if os.path.exists(ARQUIVO_COLHEITAS):
-            with open(ARQUIVO_COLHEITAS, 'r', encoding='utf-8') as arquivo:
-                json.load(arquivo)
+        origem = localizar_arquivo(ARQUIVO_COLHEITAS)
+        if origem is not None:
+            with abrir_arquivo_dados(origem) as arquivo:
+                for _ in iterar_json(arquivo):  # valida sem montar a lista
+                    pass
         else:
             status['colheitas'] = 'AUSENTE'
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, UnicodeDecodeError):
         status['colheitas'] = 'CORROMPIDO'
-    except Exception:
-        status['colheitas'] = 'ERRO'
+    except Exception as e:
+        # Arquivo compactado truncado ou com dados inválidos
+        status['colheitas'] = 'CORROMPIDO' if erro_descompressao(e) else 'ERRO'
     
     # Verifica logs
     try:
@@ -366,9 +998,10 @@ def exibir_status_arquivos():
     
     status = verificar_integridade_arquivos()
     
+    # Arquivos de dados podem estar compactados (COMPRESSAO_ARQUIVOS)
     arquivos = {
-        'fazendas': ARQUIVO_FAZENDAS,
-        'colheitas': ARQUIVO_COLHEITAS,
+        'fazendas': localizar_arquivo(ARQUIVO_FAZENDAS) or caminho_compactado(ARQUIVO_FAZENDAS),
+        'colheitas': localizar_arquivo(ARQUIVO_COLHEITAS) or caminho_compactado(ARQUIVO_COLHEITAS),
         'logs': ARQUIVO_LOGS
     }
     
@@ -383,12 +1016,11 @@ def exibir_status_arquivos():
             tamanho = os.path.getsize(arquivo)
             print(f"   Tamanho: {tamanho} bytes")
             
-            # Conta registros se for JSON
-            if st == "OK" and arquivo.endswith('.json'):
+            # Conta registros se for JSON (leitura em fluxo)
+            if st == "OK" and tipo != 'logs':
                 try:
-                    with open(arquivo, 'r', encoding='utf-8') as f:
-                        dados = json.load(f)
-                        print(f"   Registros: {len(dados)}")
+                    with abrir_arquivo_dados(arquivo) as f:
+                        print(f"   Registros: {sum(1 for _ in iterar_json(f))}")
                 except:
                     pass
     
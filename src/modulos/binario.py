@@ -0,0 +1,438 @@
+"""
+Snapshot binário de fazendas e colheitas
+Estruturas de dados: colunas de tamanho fixo (módulo array), tabela de
+textos e seção esparsa de perdas; cabeçalho com struct
+
+Layout do arquivo (versão 1, little-endian):
+    cabeçalho   MAGICO, versão e quantidades de cada seção
+    textos      tamanho de cada texto (uint32) + bytes UTF-8 concatenados;
+                os campos de texto guardam a posição na tabela
+    fazendas    uma coluna por campo de ESQUEMA_FAZENDA + talhões por fazenda
+    talhões     uma coluna por campo de ESQUEMA_TALHAO, na ordem das fazendas
+    colheitas   uma coluna por campo de ESQUEMA_COLHEITA
+    perdas      perdas por colheita (uint16) e, para cada perda registrada,
+                tipo (posição do texto) e percentual (seção esparsa)
+    extras      JSON com o que não cabe nas colunas (campos fora do esquema,
+                valores de tipo inesperado, campos ausentes)
+
+Números ficam em doubles ('d') ou inteiros de 64 bits ('q'); textos
+repetidos (variedade, tipo, status, nome da fazenda...) são gravados uma
+única vez.
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+from modulos.categorias import CAMPOS_CATEGORICOS, internar
+from modulos.registros import Fazenda, Colheita
+
+
+# Identificação e versão do formato
+MAGICO = b'CANA'
+VERSAO_FORMATO = 1
+
+# Cabeçalho: mágico, versão, reservado, quantidades (textos, fazendas,
+# talhões, colheitas, perdas) e tamanhos em bytes (textos, extras)
+CABECALHO = struct.Struct('<4sHH7Q')
+
+# Array de inteiros sem sinal de 32 bits ('I' na maioria das plataformas)
+U32 = next(tipo for tipo in 'ILH' if array(tipo).itemsize == 4)
+
+# Valores que representam None nas colunas
+NULO_INTEIRO = -(1 << 63)
+NULO_TEXTO = 0xFFFFFFFF
+
+# Tipo de cada coluna: 'q' inteiro, 'd' double, 's' texto, 'c' coordenadas
+# (duas colunas 'd': latitude e longitude)
+TIPOS_ARRAY = {'q': 'q', 'd': 'd', 's': U32}
+
+ESQUEMA_FAZENDA = (
+    ('id', 'q'), ('nome', 's'), ('proprietario', 's'), ('documento', 's'),
+    ('tipo_documento', 's'), ('localizacao', 's'), ('area_total', 'd'),
+    ('data_cadastro', 's'),
+)
+
+ESQUEMA_TALHAO = (
+    ('codigo', 's'), ('area', 'd'), ('variedade', 's'), ('ano_plantio', 'q'),
+    ('coordenadas', 'c'), ('idade_anos', 'q'), ('status', 's'),
+)
+
+ESQUEMA_COLHEITA = (
+    ('id', 'q'), ('id_fazenda', 'q'), ('nome_fazenda', 's'), ('codigo_talhao', 's'),
+    ('data_colheita', 's'), ('data_ordinal', 'q'), ('data_registro', 's'),
+    ('tipo_colheita', 's'), ('area_colhida', 'd'), ('variedade', 's'),
+    ('quantidade_colhida', 'd'), ('quantidade_perdida', 'd'), ('produtividade', 'd'),
+    ('percentual_perda_total', 'd'), ('status', 's'),
+)
+
+# Campos gravados em seções próprias (não vão para os extras)
+CAMPOS_SECOES = {
+    'fazendas': frozenset(('talhoes',)),
+    'talhoes': frozenset(),
+    'colheitas': frozenset(('perdas_detalhadas', 'resumo_perdas')),
+}
+
+# Marcador de campo ausente no registro
+_AUSENTE = object()
+
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _resumo_perdas(perdas):
+    """Resumo de perdas em ordem decrescente (como em criar_colheita)"""
+    return tuple(sorted(perdas.items(), key=lambda x: x[1], reverse=True))
+
+
+def _novas_colunas(esquema):
+    """Cria os arrays vazios das colunas de um esquema"""
+    colunas = []
+    for _, tipo in esquema:
+        if tipo == 'c':
+            colunas.extend((array('d'), array('d')))
+        else:
+            colunas.append(array(TIPOS_ARRAY[tipo]))
+    return colunas
+
+
+def _decimal(valor):
+    """True se o valor é gravado sem perda em um double (float que não é NaN)"""
+    return type(valor) is float and valor == valor
+
+
+def _codificar_coluna(campo, tipo, valores, indice_texto, extras):
+    """
+    Converte os valores de um campo em array(s) de coluna
+
+    Parâmetros:
+        campo (str): nome do campo
+        tipo (str): 'q', 'd', 's' ou 'c'
+        valores (list): valor do campo em cada registro (_AUSENTE se faltar)
+        indice_texto (function): texto -> posição na tabela de textos
+        extras (dict): recebe posição -> {campo: valor} dos valores que não
+                       cabem na coluna (gravados com o valor nulo)
+
+    Retorna:
+        list: um array (dois para coordenadas)
+    """
+    # Caminho rápido: coluna inteira do tipo esperado (NaN é o valor nulo)
+    if tipo == 'd' and all(type(v) is float and v == v for v in valores):
+        return [array('d', valores)]
+    if tipo == 'q' and all(type(v) is int and NULO_INTEIRO < v < -NULO_INTEIRO for v in valores):
+        return [array('q', valores)]
+
+    if tipo == 's':
+        def converter(v):
+            return indice_texto(v) if isinstance(v, str) else None
+        nulo = NULO_TEXTO
+    elif tipo == 'q':
+        def converter(v):
+            return v if type(v) is int and NULO_INTEIRO < v < -NULO_INTEIRO else None
+        nulo = NULO_INTEIRO
+    elif tipo == 'd':
+        # Só float: int (ex: area_total=0) vai para os extras e volta como int
+        def converter(v):
+            return v if _decimal(v) else None
+        nulo = math.nan
+    else:
+        def converter(v):
+            if type(v) is tuple and len(v) == 2 and _decimal(v[0]) and _decimal(v[1]):
+                return v
+            return None
+        nulo = (math.nan, math.nan)
+
+    codificados = []
+    for posicao, valor in enumerate(valores):
+        codificado = converter(valor)
+        if codificado is None:
+            codificado = nulo
+            if valor is not None and valor is not _AUSENTE:
+                extras.setdefault(posicao, {})[campo] = valor
+        codificados.append(codificado)
+
+    if tipo == 'c':
+        return [array('d', (lat for lat, _ in codificados)),
+                array('d', (lon for _, lon in codificados))]
+    return [array(TIPOS_ARRAY[tipo], codificados)]
+
+
+def _codificar_registros(registros, esquema, secao, indice_texto, extras, ausentes):
+    """
+    Converte registros em colunas
+
+    Parâmetros:
+        registros (list): registros (ou dicionários)
+        esquema (tuple): pares (campo, tipo)
+        secao (str): 'fazendas', 'talhoes' ou 'colheitas'
+        indice_texto (function): texto -> posição na tabela de textos
+        extras (dict): recebe posição -> {campo: valor} fora das colunas
+        ausentes (dict): recebe posição -> [campos ausentes do registro]
+
+    Retorna:
+        list: arrays das colunas
+    """
+    colunas = []
+    for campo, tipo in esquema:
+        valores = [registro.get(campo, _AUSENTE) for registro in registros]
+        if _AUSENTE in valores:
+            for posicao, valor in enumerate(valores):
+                if valor is _AUSENTE:
+                    ausentes.setdefault(posicao, []).append(campo)
+        colunas.extend(_codificar_coluna(campo, tipo, valores, indice_texto, extras))
+
+    # Campos fora do esquema
+    nomes = {campo for campo, _ in esquema} | CAMPOS_SECOES[secao]
+    for posicao, registro in enumerate(registros):
+        for campo in registro:
+            if campo not in nomes:
+                extras.setdefault(posicao, {})[campo] = registro[campo]
+
+    return colunas
+
+
+def _decodificar_registros(colunas, esquema, textos, extras, ausentes):
+    """
+    Converte colunas de volta em dicionários
+
+    Parâmetros:
+        colunas (list): arrays das colunas
+        esquema (tuple): pares (campo, tipo)
+        textos (list): tabela de textos
+        extras (dict): posição (texto) -> {campo: valor}
+        ausentes (dict): posição (texto) -> [campos ausentes]
+
+    Retorna:
+        list: dicionários dos registros
+    """
+    # Converte coluna a coluna (sentinelas -> None) e monta as linhas com zip
+    nomes = []
+    valores = []
+    i = 0
+    for campo, tipo in esquema:
+        nomes.append(campo)
+        coluna = colunas[i]
+        if tipo == 's':
+            valores.append([None if v == NULO_TEXTO else textos[v] for v in coluna])
+        elif tipo == 'q':
+            valores.append([None if v == NULO_INTEIRO else v for v in coluna.tolist()])
+        elif tipo == 'd':
+            valores.append([None if v != v else v for v in coluna.tolist()])
+        else:
+            valores.append([None if lat != lat else (lat, lon)
+                            for lat, lon in zip(coluna.tolist(), colunas[i + 1].tolist())])
+            i += 1
+        i += 1
+
+    registros = [dict(zip(nomes, linha)) for linha in zip(*valores)]
+    for posicao, sobras in extras.items():
+        registros[int(posicao)].update(sobras)
+    for posicao, campos in ausentes.items():
+        for campo in campos:
+            del registros[int(posicao)][campo]
+    return registros
+
+
+def _gravar_array(arquivo, valores):
+    """Grava um array em little-endian"""
+    if _BIG_ENDIAN:
+        valores = array(valores.typecode, valores)
+        valores.byteswap()
+    valores.tofile(arquivo)
+
+
+def gravar_snapshot(caminho, lista_fazendas, lista_colheitas):
+    """
+    Grava fazendas e colheitas no formato binário
+
+    Parâmetros:
+        caminho (str): arquivo de destino
+        lista_fazendas (list): fazendas (com seus talhões)
+        lista_colheitas (iterable): colheitas
+
+    Retorna:
+        dict: quantidade de fazendas, talhões, colheitas e bytes gravados
+    """
+    indices_textos = {}
+    textos = []
+
+    def indice_texto(texto):
+        indice = indices_textos.get(texto)
+        if indice is None:
+            indice = indices_textos[texto] = len(textos)
+            textos.append(texto)
+        return indice
+
+    extras = {'fazendas': {}, 'talhoes': {}, 'colheitas': {}}
+    ausentes = {'fazendas': {}, 'talhoes': {}, 'colheitas': {}}
+
+    # Fazendas e talhões (talhões em sequência, na ordem das fazendas)
+    talhoes = []
+    talhoes_por_fazenda = array(U32)
+    for fazenda in lista_fazendas:
+        lista_talhoes = fazenda.get('talhoes') or []
+        talhoes_por_fazenda.append(len(lista_talhoes))
+        talhoes.extend(lista_talhoes)
+    colunas_fazendas = _codificar_registros(lista_fazendas, ESQUEMA_FAZENDA, 'fazendas',
+                                            indice_texto, extras['fazendas'], ausentes['fazendas'])
+    colunas_talhoes = _codificar_registros(talhoes, ESQUEMA_TALHAO, 'talhoes',
+                                           indice_texto, extras['talhoes'], ausentes['talhoes'])
+
+    # Colheitas e perdas (seção esparsa)
+    perdas_por_colheita = array('H')
+    tipos_perda = array(U32)
+    percentuais_perda = array('d')
+
+    lista_colheitas = list(lista_colheitas)
+    for posicao, colheita in enumerate(lista_colheitas):
+        perdas = colheita.get('perdas_detalhadas')
+        if (isinstance(perdas, dict) and len(perdas) <= 0xFFFF
+                and all(type(t) is str and _decimal(p) for t, p in perdas.items())):
+            perdas_por_colheita.append(len(perdas))
+            for tipo, percentual in perdas.items():
+                tipos_perda.append(indice_texto(tipo))
+                percentuais_perda.append(percentual)
+            # resumo_perdas é reconstruído na leitura; só é gravado se diferir
+            resumo = colheita.get('resumo_perdas')
+            if resumo is not None and tuple(map(tuple, resumo)) != _resumo_perdas(perdas):
+                extras['colheitas'][posicao] = {'resumo_perdas': resumo}
+        else:
+            perdas_por_colheita.append(0)
+            extras['colheitas'][posicao] = {'perdas_detalhadas': perdas,
+                                            'resumo_perdas': colheita.get('resumo_perdas')}
+    colunas_colheitas = _codificar_registros(lista_colheitas, ESQUEMA_COLHEITA, 'colheitas',
+                                             indice_texto, extras['colheitas'], ausentes['colheitas'])
+
+    # Tabela de textos e extras
+    bytes_textos = [texto.encode('utf-8') for texto in textos]
+    tamanhos_textos = array(U32, map(len, bytes_textos))
+    blob_textos = b''.join(bytes_textos)
+    extras['ausentes'] = ausentes
+    blob_extras = json.dumps(extras, ensure_ascii=False).encode('utf-8')
+
+    num_colheitas = len(perdas_por_colheita)
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(CABECALHO.pack(
+            MAGICO, VERSAO_FORMATO, 0,
+            len(textos), len(talhoes_por_fazenda), len(talhoes), num_colheitas,
+            len(tipos_perda), len(blob_textos), len(blob_extras)
+        ))
+        _gravar_array(arquivo, tamanhos_textos)
+        arquivo.write(blob_textos)
+        for coluna in (*colunas_fazendas, talhoes_por_fazenda, *colunas_talhoes, *colunas_colheitas,
+                       perdas_por_colheita, tipos_perda, percentuais_perda):
+            _gravar_array(arquivo, coluna)
+        arquivo.write(blob_extras)
+        tamanho = arquivo.tell()
+
+    return {'fazendas': len(talhoes_por_fazenda), 'talhoes': len(talhoes),
+            'colheitas': num_colheitas, 'bytes': tamanho}
+
+
+def ler_snapshot(caminho):
+    """
+    Lê fazendas e colheitas de um snapshot binário
+
+    Parâmetro:
+        caminho (str): arquivo gravado por gravar_snapshot
+
+    Retorna:
+        tuple: (fazendas, colheitas) — listas de registros Fazenda e Colheita
+
+    Exceções:
+        ValueError: arquivo de outro formato, de versão desconhecida ou truncado
+    """
+    with open(caminho, 'rb') as arquivo:
+        dados = memoryview(arquivo.read())
+
+    if len(dados) < CABECALHO.size:
+        raise ValueError("arquivo binário truncado (cabeçalho)")
+    (magico, versao, _, num_textos, num_fazendas, num_talhoes, num_colheitas,
+     num_perdas, tamanho_textos, tamanho_extras) = CABECALHO.unpack_from(dados)
+    if magico != MAGICO:
+        raise ValueError("arquivo não é um snapshot binário do sistema")
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"versão {versao} do snapshot binário não suportada (esperada {VERSAO_FORMATO})")
+
+    deslocamento = [CABECALHO.size]
+
+    def ler_bytes(tamanho):
+        inicio = deslocamento[0]
+        if inicio + tamanho > len(dados):
+            raise ValueError("arquivo binário truncado")
+        deslocamento[0] = inicio + tamanho
+        return dados[inicio:inicio + tamanho]
+
+    def ler_array(tipo, quantidade):
+        valores = array(tipo)
+        valores.frombytes(ler_bytes(quantidade * valores.itemsize))
+        if _BIG_ENDIAN:
+            valores.byteswap()
+        return valores
+
+    def ler_colunas(esquema, quantidade):
+        return [ler_array(coluna.typecode, quantidade) for coluna in _novas_colunas(esquema)]
+
+    # Tabela de textos
+    tamanhos = ler_array(U32, num_textos)
+    blob = bytes(ler_bytes(tamanho_textos))
+    textos = []
+    inicio = 0
+    for tamanho in tamanhos:
+        textos.append(blob[inicio:inicio + tamanho].decode('utf-8'))
+        inicio += tamanho
+
+    colunas_fazendas = ler_colunas(ESQUEMA_FAZENDA, num_fazendas)
+    talhoes_por_fazenda = ler_array(U32, num_fazendas)
+    colunas_talhoes = ler_colunas(ESQUEMA_TALHAO, num_talhoes)
+    colunas_colheitas = ler_colunas(ESQUEMA_COLHEITA, num_colheitas)
+    perdas_por_colheita = ler_array('H', num_colheitas)
+    tipos_perda = ler_array(U32, num_perdas).tolist()
+    percentuais_perda = ler_array('d', num_perdas).tolist()
+    extras = json.loads(bytes(ler_bytes(tamanho_extras)).decode('utf-8'))
+    ausentes = extras.get('ausentes', {})
+
+    # Talhões e fazendas
+    talhoes = _decodificar_registros(colunas_talhoes, ESQUEMA_TALHAO, textos,
+                                     extras['talhoes'], ausentes.get('talhoes', {}))
+    fazendas = _decodificar_registros(colunas_fazendas, ESQUEMA_FAZENDA, textos,
+                                      extras['fazendas'], ausentes.get('fazendas', {}))
+    inicio = 0
+    for posicao, (dados_fazenda, quantidade) in enumerate(zip(fazendas, talhoes_por_fazenda)):
+        if 'talhoes' not in extras['fazendas'].get(str(posicao), {}):
+            dados_fazenda['talhoes'] = talhoes[inicio:inicio + quantidade]
+        inicio += quantidade
+    fazendas = [Fazenda.from_dict(f) for f in fazendas]
+
+    # Textos categóricos das colheitas (e tipos de perda) passam a ser as
+    # instâncias compartilhadas uma única vez, em vez de registro a registro
+    usados = set(tipos_perda)
+    for (campo, _), coluna in zip(ESQUEMA_COLHEITA, colunas_colheitas):
+        if campo in CAMPOS_CATEGORICOS:
+            usados.update(coluna)
+    usados.discard(NULO_TEXTO)
+    for indice in usados:
+        textos[indice] = internar(textos[indice])
+
+    # Colheitas com as perdas da seção esparsa
+    extras_colheitas = extras['colheitas']
+    colheitas = _decodificar_registros(colunas_colheitas, ESQUEMA_COLHEITA, textos,
+                                       {}, ausentes.get('colheitas', {}))
+    inicio = 0
+    for posicao, (dados_colheita, quantidade) in enumerate(zip(colheitas, perdas_por_colheita)):
+        perdas = {
+            textos[tipos_perda[i]]: percentuais_perda[i]
+            for i in range(inicio, inicio + quantidade)
+        }
+        inicio += quantidade
+        dados_colheita['perdas_detalhadas'] = perdas
+        dados_colheita['resumo_perdas'] = _resumo_perdas(perdas)
+        sobras = extras_colheitas.get(str(posicao))
+        if sobras:
+            dados_colheita.update(sobras)
+            colheitas[posicao] = Colheita.from_dict(dados_colheita)
+        else:
+            # Textos já internados: dispensa a internação de Colheita.from_dict
+            colheitas[posicao] = super(Colheita, Colheita).from_dict(dados_colheita)
+
+    return fazendas, colheitas
@@ -0,0 +1,186 @@
+"""
+Cache de resultados das análises
+Estruturas de dados: contador de versão e dicionário de resultados
+
+Toda inclusão, limpeza ou carga de fazendas e colheitas incrementa a
+versão dos dados (registrar_alteracao). As funções decoradas com
+@memorizar guardam o resultado de cada combinação de argumentos e o
+reaproveitam enquanto a versão não mudar; quando muda, o cache inteiro é
+descartado na próxima consulta.
+
+Os resultados são compartilhados entre as chamadas: quem os recebe deve
+apenas lê-los (como fazem os relatórios do sistema).
+
+Para resultados que dependem só do conteúdo de um registro (e não da
+versão dos dados), CacheLRU guarda um número limitado de itens por chave
+de conteúdo, descartando o usado há mais tempo.
+"""
+
+import functools
+from collections import OrderedDict
+
+
+# Versão atual dos dados em memória: [versão]
+_versao = [0]
+
+# Resultados guardados: (nome da função, argumentos) -> resultado
+_resultados = {}
+
+# Versão dos dados a que os resultados guardados se referem: [versão]
+_versao_resultados = [0]
+
+# Acertos e falhas por função: nome -> {'acertos': int, 'falhas': int}
+estatisticas_cache = {}
+
+# Caches LRU criados: nome -> CacheLRU
+caches_lru = {}
+
+
+def registrar_alteracao():
+    """
+    Registra que os dados em memória foram alterados
+    (invalida os resultados guardados)
+    """
+    _versao[0] += 1
+
+
+def versao_atual():
+    """
+    Retorna a versão atual dos dados em memória
+
+    Retorna:
+        int: contador de alterações
+    """
+    return _versao[0]
+
+
+def memorizar(funcao):
+    """
+    Decorador que guarda os resultados de uma análise por versão dos dados
+
+    Parâmetro:
+        funcao (function): função de análise (argumentos devem ser hashable)
+
+    Retorna:
+        function: função com cache
+    """
+    nome = funcao.__name__
+    contadores = estatisticas_cache.setdefault(nome, {'acertos': 0, 'falhas': 0})
+
+    @functools.wraps(funcao)
+    def funcao_memorizada(*args, **kwargs):
+        if _versao_resultados[0] != _versao[0]:
+            _resultados.clear()
+            _versao_resultados[0] = _versao[0]
+
+        chave = (nome, args, tuple(sorted(kwargs.items())))
+        if chave in _resultados:
+            contadores['acertos'] += 1
+            return _resultados[chave]
+
+        contadores['falhas'] += 1
+        resultado = funcao(*args, **kwargs)
+        _resultados[chave] = resultado
+        return resultado
+
+    return funcao_memorizada
+
+
+class CacheLRU:
+    """
+    Cache de tamanho limitado por chave de conteúdo (OrderedDict)
+    Ao atingir a capacidade, descarta o item usado há mais tempo
+    """
+
+    __slots__ = ('nome', 'capacidade', 'itens', 'acertos', 'falhas', 'descartes')
+
+    def __init__(self, nome, capacidade):
+        self.nome = nome
+        self.capacidade = capacidade
+        self.itens = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        caches_lru[nome] = self
+
+    def obter(self, chave):
+        """
+        Busca um item e o marca como usado recentemente
+
+        Parâmetro:
+            chave: chave do item (hashable)
+
+        Retorna:
+            valor guardado, ou None se ausente
+        """
+        valor = self.itens.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self.itens.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave, valor):
+        """
+        Guarda um item, descartando o menos usado se o cache estiver cheio
+
+        Parâmetros:
+            chave: chave do item (hashable)
+            valor: valor a guardar (não pode ser None)
+        """
+        self.itens[chave] = valor
+        self.itens.move_to_end(chave)
+        if len(self.itens) > self.capacidade:
+            self.itens.popitem(last=False)
+            self.descartes += 1
+
+    def limpar(self):
+        """Descarta os itens e zera os contadores"""
+        self.itens.clear()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do cache
+
+        Retorna:
+            dict: itens guardados, capacidade, acertos, falhas e descartes
+        """
+        return {
+            'itens': len(self.itens),
+            'capacidade': self.capacidade,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'descartes': self.descartes,
+        }
+
+
+def limpar_cache():
+    """
+    Descarta os resultados guardados e zera os contadores
+    """
+    _resultados.clear()
+    for contadores in estatisticas_cache.values():
+        contadores['acertos'] = 0
+        contadores['falhas'] = 0
+    for cache_lru in caches_lru.values():
+        cache_lru.limpar()
+
+
+def obter_estatisticas_cache():
+    """
+    Retorna os contadores de acertos e falhas do cache
+
+    Retorna:
+        dict: versão dos dados, resultados guardados, contadores por função
+              e contadores dos caches LRU
+    """
+    return {
+        'versao': _versao[0],
+        'resultados_guardados': len(_resultados),
+        'funcoes': {nome: dict(contadores) for nome, contadores in estatisticas_cache.items()},
+        'lru': {nome: cache_lru.estatisticas() for nome, cache_lru in caches_lru.items()},
+    }
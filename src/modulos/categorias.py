@@ -0,0 +1,127 @@
+"""
+Dicionário de categorias (valores categóricos compartilhados)
+Estruturas de dados: dicionários de códigos e tabelas de valores
+
+Variedades, tipos de colheita, tipos de perda e status se repetem em
+todas as colheitas. Este módulo mantém uma única instância de cada texto
+(internação) e um código inteiro por valor, para que os registros
+compartilhem as mesmas strings e os agrupamentos possam usar códigos.
+"""
+
+from config import VARIEDADES_CANA, TIPOS_COLHEITA, TIPOS_PERDA, PARAMETROS_ANALISE
+
+
+def rotulo_status(nome_parametro):
+    """
+    Converte o nome de um parâmetro de análise em rótulo de status
+    (ex: 'perda_media' -> 'PERDA MEDIA')
+
+    Parâmetro:
+        nome_parametro (str): nome do parâmetro em PARAMETROS_ANALISE
+
+    Retorna:
+        str: rótulo de status
+    """
+    return nome_parametro.replace('_', ' ').upper()
+
+
+# Valores conhecidos de cada campo categórico (a posição é o código)
+CATEGORIAS = {
+    'variedade': list(VARIEDADES_CANA),
+    'tipo_colheita': list(TIPOS_COLHEITA),
+    'tipo_perda': list(TIPOS_PERDA),
+    'status': [rotulo_status(nome) for nome, _ in PARAMETROS_ANALISE] + ["PERDA CRÍTICA"],
+}
+
+# Campos dos registros de colheita que guardam valores categóricos
+CAMPOS_CATEGORICOS = ('variedade', 'tipo_colheita', 'status')
+
+# Dicionário valor -> código de cada campo
+_codigos = {
+    campo: {valor: codigo for codigo, valor in enumerate(valores)}
+    for campo, valores in CATEGORIAS.items()
+}
+
+# Instância compartilhada de cada texto (valor -> o próprio valor)
+_internados = {}
+for _valores in CATEGORIAS.values():
+    for _valor in _valores:
+        _internados.setdefault(_valor, _valor)
+
+
+def internar(valor):
+    """
+    Retorna a instância compartilhada de um texto
+    Textos novos passam a ser a instância compartilhada
+
+    Parâmetro:
+        valor: texto (outros tipos são devolvidos sem alteração)
+
+    Retorna:
+        str: texto compartilhado
+    """
+    if not isinstance(valor, str):
+        return valor
+    return _internados.setdefault(valor, valor)
+
+
+def codigo(campo, valor):
+    """
+    Retorna o código inteiro de um valor categórico
+    Valores fora do config recebem o próximo código livre
+
+    Parâmetros:
+        campo (str): campo categórico (variedade, tipo_colheita, ...)
+        valor (str): valor do campo
+
+    Retorna:
+        int: código do valor
+    """
+    codigos = _codigos[campo]
+    cod = codigos.get(valor)
+    if cod is None:
+        cod = len(CATEGORIAS[campo])
+        codigos[valor] = cod
+        CATEGORIAS[campo].append(internar(valor))
+    return cod
+
+
+def valor(campo, cod):
+    """
+    Retorna o valor correspondente a um código
+
+    Parâmetros:
+        campo (str): campo categórico
+        cod (int): código do valor
+
+    Retorna:
+        str: valor do campo
+    """
+    return CATEGORIAS[campo][cod]
+
+
+def internar_colheita(colheita):
+    """
+    Substitui os textos categóricos de uma colheita pelas instâncias
+    compartilhadas (inclusive as chaves de perdas_detalhadas)
+
+    Parâmetro:
+        colheita: registro ou dicionário de colheita
+
+    Retorna:
+        o mesmo registro, alterado
+    """
+    for campo in CAMPOS_CATEGORICOS:
+        if campo in colheita:
+            colheita[campo] = internar(colheita[campo])
+
+    if 'perdas_detalhadas' in colheita:
+        colheita['perdas_detalhadas'] = {
+            internar(tipo): percentual
+            for tipo, percentual in colheita['perdas_detalhadas'].items()
+        }
+    if 'resumo_perdas' in colheita:
+        colheita['resumo_perdas'] = tuple(
+            (internar(tipo), percentual) for tipo, percentual in colheita['resumo_perdas']
+        )
+    return colheita
@@ -0,0 +1,116 @@
+"""
+Classificação das colheitas pelo percentual de perda
+Estruturas de dados: lista ordenada de limites e tabela de faixas
+
+As faixas são montadas uma vez a partir de config.PARAMETROS_ANALISE e
+config.ICONES_STATUS: cada faixa tem o limite superior (inclusive), o
+rótulo de status gravado na colheita e o ícone exibido nas tabelas.
+A faixa de um percentual é encontrada por busca binária (bisect) nos
+limites; classificar_lote usa numpy.searchsorted quando disponível.
+"""
+
+import bisect
+
+try:
+    import numpy as np  # type: ignore  # Importação opcional
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    NUMPY_DISPONIVEL = False
+
+from modulos.categorias import internar, rotulo_status
+from config import PARAMETROS_ANALISE, ICONES_STATUS
+
+
+# Faixa usada acima do último limite (ou para valores não comparáveis)
+FAIXA_EXCEDENTE = ("PERDA CRÍTICA", "❌ CRÍTICO")
+
+
+def montar_faixas(parametros, icones):
+    """
+    Monta a tabela de faixas de perda
+
+    Parâmetros:
+        parametros (tuple): pares (nome, limite) em ordem crescente de limite
+        icones (dict): nome do parâmetro -> ícone de status
+
+    Retorna:
+        tuple: (limites, faixas) — lista de limites e lista de pares
+               (rótulo, ícone); a última faixa é FAIXA_EXCEDENTE
+    """
+    limites = []
+    faixas = []
+    for nome, limite in parametros:
+        if limites and limite < limites[-1]:
+            raise ValueError(f"PARAMETROS_ANALISE fora de ordem em '{nome}'")
+        limites.append(limite)
+        faixas.append((internar(rotulo_status(nome)), icones.get(nome, FAIXA_EXCEDENTE[1])))
+    faixas.append((internar(FAIXA_EXCEDENTE[0]), FAIXA_EXCEDENTE[1]))
+    return limites, faixas
+
+
+# Limites e faixas (montados uma vez, na importação)
+LIMITES_PERDA, FAIXAS_PERDA = montar_faixas(PARAMETROS_ANALISE, ICONES_STATUS)
+
+# Rótulos e ícones por posição da faixa
+ROTULOS_FAIXAS = [rotulo for rotulo, _ in FAIXAS_PERDA]
+ICONES_FAIXAS = [icone for _, icone in FAIXAS_PERDA]
+
+
+def indice_faixa(percentual_perda):
+    """
+    Retorna a posição da faixa de um percentual de perda
+
+    Parâmetro:
+        percentual_perda (float): percentual de perda
+
+    Retorna:
+        int: posição em FAIXAS_PERDA (primeiro limite >= percentual)
+    """
+    if percentual_perda != percentual_perda:  # NaN
+        return len(LIMITES_PERDA)
+    return bisect.bisect_left(LIMITES_PERDA, percentual_perda)
+
+
+def classificar(percentual_perda):
+    """
+    Classifica um percentual de perda
+
+    Parâmetro:
+        percentual_perda (float): percentual de perda
+
+    Retorna:
+        tuple: (rótulo de status, ícone)
+    """
+    return FAIXAS_PERDA[indice_faixa(percentual_perda)]
+
+
+def indices_lote(percentuais):
+    """
+    Retorna a posição da faixa de vários percentuais de uma vez
+
+    Parâmetro:
+        percentuais (iterable): percentuais de perda
+
+    Retorna:
+        list: posições em FAIXAS_PERDA, na ordem dos percentuais
+    """
+    if NUMPY_DISPONIVEL:
+        valores = np.fromiter(percentuais, dtype=np.float64)
+        # NaN é ordenado depois de inf: cai na faixa excedente, como em indice_faixa
+        return np.searchsorted(LIMITES_PERDA, valores, side='left').tolist()
+    return [indice_faixa(percentual) for percentual in percentuais]
+
+
+def classificar_lote(percentuais, icone=False):
+    """
+    Classifica vários percentuais de perda de uma vez
+
+    Parâmetros:
+        percentuais (iterable): percentuais de perda
+        icone (bool): se True, retorna os ícones em vez dos rótulos
+
+    Retorna:
+        list: rótulos de status (ou ícones), na ordem dos percentuais
+    """
+    tabela = ICONES_FAIXAS if icone else ROTULOS_FAIXAS
+    return [tabela[i] for i in indices_lote(percentuais)]
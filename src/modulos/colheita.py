@@ -3,20 +3,47 @@ Módulo de gestão de colheitas
 Capítulo 4: Estruturas de dados (listas, dicionários, tuplas)
 """
 
-from datetime import datetime
+import bisect
+import copy
+from datetime import date, datetime
 from modulos.validacao import validar_data, validar_tipo_colheita, validar_producao, validar_perda
 from modulos.fazenda import buscar_talhao
-from config import TIPOS_PERDA
+from modulos.colunar import ArmazemColunar
+from modulos.registros import Colheita, carimbo_agora
+from modulos.categorias import internar, codigo
+from modulos.classificacao import indice_faixa, ROTULOS_FAIXAS
+from modulos.cache import registrar_alteracao
+from modulos.consolidacao import consolidar_colheita, limpar_consolidacao, nome_safra
+from modulos.cubo import adicionar_ao_cubo, limpar_cubo
+from modulos.quantis import incluir_colheita, limpar_esbocos, restaurar_esbocos, calcular_assinatura
+from config import TIPOS_PERDA, MES_INICIO_SAFRA, BACKEND_COLHEITAS
 
 
 # Lista global de colheitas
-colheitas = []
+# (com BACKEND_COLHEITAS = 'colunar', um armazém colunar com a mesma interface)
+colheitas = ArmazemColunar() if BACKEND_COLHEITAS == 'colunar' else []
+
+# Índices secundários (dicionários de listas), mantidos em sincronia com a
+# lista global por adicionar_colheita, carregar_colheitas e limpar_colheitas
+indice_colheitas = {}        # id -> colheita
+indice_por_fazenda = {}      # id_fazenda -> [colheitas]
+indice_por_talhao = {}       # (id_fazenda, codigo_talhao) -> [colheitas]
+indice_por_tipo = {}         # tipo_colheita -> [colheitas]
+
+# Alterações ainda não gravadas em disco (diário de modulos.arquivo):
+# ('incluir', colheita), ('limpar', None) ou ('substituir', None) quando a
+# lista inteira foi trocada (exige gravar o snapshot completo)
+alteracoes_pendentes = []
+
+# Índice ordenado por data (listas paralelas, pesquisadas com bisect)
+datas_ordenadas = []         # datas ordinais em ordem crescente
+colheitas_por_data = []      # colheitas na mesma ordem de datas_ordenadas
 
 
 def criar_colheita(id_fazenda, codigo_talhao, data_colheita, tipo_colheita, 
                    quantidade_colhida, perdas_dict):
     """
-    Cria um dicionário representando uma colheita
+    Cria um registro representando uma colheita
     
     Parâmetros:
         id_fazenda (int): ID da fazenda
@@ -27,7 +54,8 @@ def criar_colheita(id_fazenda, codigo_talhao, data_colheita, tipo_colheita,
         perdas_dict (dict): dicionário com tipos de perda e percentuais
     
     Retorna:
-        dict: dicionário com dados da colheita ou None se inválido
+        Colheita: registro com dados da colheita (acesso como dicionário)
+                  ou None se inválido
     """
     # Validações
     fazenda, talhao = buscar_talhao(id_fazenda, codigo_talhao)
@@ -67,31 +95,32 @@ def criar_colheita(id_fazenda, codigo_talhao, data_colheita, tipo_colheita,
     # Cria tupla com resumo de perdas (imutável)
     resumo_perdas = tuple(sorted(perdas_dict.items(), key=lambda x: x[1], reverse=True))
     
-    colheita = {
-        'id': len(colheitas) + 1,
-        'id_fazenda': id_fazenda,
-        'nome_fazenda': fazenda['nome'],
-        'codigo_talhao': codigo_talhao.upper(),
-        'data_colheita': data_colheita,
-        'data_registro': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-        'tipo_colheita': tipo_colheita.lower(),
-        'area_colhida': area,
-        'variedade': talhao['variedade'],
-        'quantidade_colhida': round(quantidade_colhida, 2),
-        'quantidade_perdida': round(quantidade_perdida, 2),
-        'produtividade': round(produtividade, 2),
-        'perdas_detalhadas': perdas_dict.copy(),  # cópia do dicionário
-        'resumo_perdas': resumo_perdas,  # tupla ordenada
-        'percentual_perda_total': round(total_perdas, 2),
-        'status': classificar_perda(total_perdas)
-    }
+    colheita = Colheita(
+        id=len(colheitas) + 1,
+        id_fazenda=id_fazenda,
+        nome_fazenda=fazenda['nome'],
+        codigo_talhao=codigo_talhao.upper(),
+        data_colheita=data_colheita,
+        data_ordinal=data.toordinal(),  # data como inteiro (ordenação/faixas)
+        data_registro=carimbo_agora(),
+        tipo_colheita=internar(tipo_colheita.lower()),
+        area_colhida=area,
+        variedade=talhao['variedade'],
+        quantidade_colhida=round(quantidade_colhida, 2),
+        quantidade_perdida=round(quantidade_perdida, 2),
+        produtividade=round(produtividade, 2),
+        perdas_detalhadas=perdas_dict.copy(),  # cópia do dicionário
+        resumo_perdas=resumo_perdas,  # tupla ordenada
+        percentual_perda_total=round(total_perdas, 2),
+        status=classificar_perda(total_perdas)
+    )
     
     return colheita
 
 
 def classificar_perda(percentual_perda):
     """
-    Classifica o nível de perda (usa tupla de parâmetros do config)
+    Classifica o nível de perda (faixas de PARAMETROS_ANALISE, busca binária)
     
     Parâmetro:
         percentual_perda (float): percentual de perda
@@ -99,13 +128,7 @@ def classificar_perda(percentual_perda):
     Retorna:
         str: classificação da perda
     """
-    from config import PARAMETROS_ANALISE
-    
-    for nome, limite in PARAMETROS_ANALISE:
-        if percentual_perda <= limite:
-            return nome.replace('_', ' ').upper()
-    
-    return "PERDA CRÍTICA"
+    return ROTULOS_FAIXAS[indice_faixa(percentual_perda)]
 
 
 def adicionar_colheita(colheita):
@@ -119,7 +142,12 @@ def adicionar_colheita(colheita):
         bool: True se adicionada com sucesso
     """
     if colheita:
-        colheitas.append(colheita)
+        if isinstance(colheitas, ArmazemColunar):
+            colheita = colheitas.append(colheita)  # visão da linha armazenada
+        else:
+            colheitas.append(colheita)
+        _indexar_colheita(colheita)
+        alteracoes_pendentes.append(('incluir', colheita))
         print(f"\n✓ Colheita registrada com sucesso!")
         print(f"  ID: {colheita['id']}")
         print(f"  Fazenda: {colheita['nome_fazenda']}")
@@ -141,10 +169,7 @@ def buscar_colheita_por_id(id_colheita):
     Retorna:
         dict: colheita encontrada ou None
     """
-    for colheita in colheitas:
-        if colheita['id'] == id_colheita:
-            return colheita
-    return None
+    return indice_colheitas.get(id_colheita)
 
 
 def buscar_colheitas_fazenda(id_fazenda):
@@ -157,7 +182,7 @@ def buscar_colheitas_fazenda(id_fazenda):
     Retorna:
         list: lista de colheitas
     """
-    return [c for c in colheitas if c['id_fazenda'] == id_fazenda]
+    return list(indice_por_fazenda.get(id_fazenda, []))
 
 
 def buscar_colheitas_talhao(id_fazenda, codigo_talhao):
@@ -171,8 +196,7 @@ def buscar_colheitas_talhao(id_fazenda, codigo_talhao):
     Retorna:
         list: lista de colheitas
     """
-    return [c for c in colheitas 
-            if c['id_fazenda'] == id_fazenda and c['codigo_talhao'] == codigo_talhao.upper()]
+    return list(indice_por_talhao.get((id_fazenda, codigo_talhao.upper()), []))
 
 
 def buscar_colheitas_por_tipo(tipo_colheita):
@@ -185,7 +209,7 @@ def buscar_colheitas_por_tipo(tipo_colheita):
     Retorna:
         list: lista de colheitas
     """
-    return [c for c in colheitas if c['tipo_colheita'] == tipo_colheita.lower()]
+    return list(indice_por_tipo.get(tipo_colheita.lower(), []))
 
 
 def listar_colheitas():
@@ -232,14 +256,72 @@ def exibir_colheita_detalhada(colheita):
     print("="*70)
 
 
-def obter_estatisticas_colheitas():
+def _novo_acumulado():
     """
-    Retorna estatísticas das colheitas
+    Cria a estrutura de estatísticas acumuladas (somas e contagens)
+    
+    Retorna:
+        dict: acumulador zerado
+    """
+    return {
+        'total': 0,
+        'area': 0,
+        'producao': 0,
+        'perda': 0,
+        'soma_percentual': 0,
+        'por_tipo': {},  # código do tipo -> [tipo, quantidade, producao, area, soma_perdas]
+        'por_talhao': {}  # (id_fazenda, codigo_talhao) -> [nome_fazenda, soma_perdas, quantidade]
+    }
+
+
+# Estatísticas acumuladas (somas e contagens), mantidas em sincronia pelos
+# mesmos pontos que atualizam os índices
+estatisticas_acumuladas = _novo_acumulado()
+
+
+def _acumular(acumulado, colheita):
+    """
+    Soma uma colheita às estatísticas acumuladas (O(1))
+    
+    Parâmetros:
+        acumulado (dict): acumulador de estatísticas
+        colheita (dict): colheita a acumular
+    """
+    acumulado['total'] += 1
+    acumulado['area'] += colheita['area_colhida']
+    acumulado['producao'] += colheita['quantidade_colhida']
+    acumulado['perda'] += colheita['quantidade_perdida']
+    acumulado['soma_percentual'] += colheita['percentual_perda_total']
+    
+    cod = codigo('tipo_colheita', colheita['tipo_colheita'])
+    grupo = acumulado['por_tipo'].get(cod)
+    if grupo is None:
+        grupo = acumulado['por_tipo'][cod] = [colheita['tipo_colheita'], 0, 0, 0, 0]
+    grupo[1] += 1
+    grupo[2] += colheita['quantidade_colhida']
+    grupo[3] += colheita['area_colhida']
+    grupo[4] += colheita['percentual_perda_total']
+    
+    chave = (colheita['id_fazenda'], colheita['codigo_talhao'])
+    talhao = acumulado['por_talhao'].get(chave)
+    if talhao is None:
+        talhao = acumulado['por_talhao'][chave] = [colheita['nome_fazenda'], 0, 0]
+    talhao[1] += colheita['percentual_perda_total']
+    talhao[2] += 1
+
+
+def _montar_estatisticas(acumulado):
+    """
+    Monta o dicionário de estatísticas a partir das somas acumuladas
+    
+    Parâmetro:
+        acumulado (dict): acumulador de estatísticas
     
     Retorna:
         dict: dicionário com estatísticas
     """
-    if not colheitas:
+    total = acumulado['total']
+    if not total:
         return {
             'total_colheitas': 0,
             'area_total_colhida': 0,
@@ -249,48 +331,63 @@ def obter_estatisticas_colheitas():
             'perda_media': 0
         }
     
-    area_total = sum(c['area_colhida'] for c in colheitas)
-    producao_total = sum(c['quantidade_colhida'] for c in colheitas)
-    perda_total = sum(c['quantidade_perdida'] for c in colheitas)
-    
+    area_total = acumulado['area']
+    producao_total = acumulado['producao']
     produtividade_media = producao_total / area_total if area_total > 0 else 0
     
-    # Calcula percentual médio de perda
-    perda_media = sum(c['percentual_perda_total'] for c in colheitas) / len(colheitas)
-    
-    # Agrupa por tipo de colheita
-    por_tipo = {}
-    for c in colheitas:
-        tipo = c['tipo_colheita']
-        if tipo not in por_tipo:
-            por_tipo[tipo] = {
-                'quantidade': 0,
-                'producao': 0,
-                'area': 0,
-                'perdas': []
-            }
-        por_tipo[tipo]['quantidade'] += 1
-        por_tipo[tipo]['producao'] += c['quantidade_colhida']
-        por_tipo[tipo]['area'] += c['area_colhida']
-        por_tipo[tipo]['perdas'].append(c['percentual_perda_total'])
-    
     # Calcula médias por tipo
-    for tipo in por_tipo:
-        dados = por_tipo[tipo]
-        dados['produtividade_media'] = dados['producao'] / dados['area'] if dados['area'] > 0 else 0
-        dados['perda_media'] = sum(dados['perdas']) / len(dados['perdas']) if dados['perdas'] else 0
+    por_tipo = {}
+    for tipo, quantidade, producao, area, soma_perdas in acumulado['por_tipo'].values():
+        por_tipo[tipo] = {
+            'quantidade': quantidade,
+            'producao': producao,
+            'area': area,
+            'soma_perdas': soma_perdas,
+            'produtividade_media': producao / area if area > 0 else 0,
+            'perda_media': soma_perdas / quantidade if quantidade else 0
+        }
     
     return {
-        'total_colheitas': len(colheitas),
+        'total_colheitas': total,
         'area_total_colhida': round(area_total, 2),
         'producao_total': round(producao_total, 2),
-        'perda_total': round(perda_total, 2),
+        'perda_total': round(acumulado['perda'], 2),
         'produtividade_media': round(produtividade_media, 2),
-        'perda_media': round(perda_media, 2),
+        'perda_media': round(acumulado['soma_percentual'] / total, 2),
         'por_tipo': por_tipo
     }
 
 
+def obter_estatisticas_colheitas(verificar=False):
+    """
+    Retorna estatísticas das colheitas
+    Usa as somas mantidas por adicionar/carregar/limpar colheitas,
+    sem percorrer a lista
+    
+    Parâmetro:
+        verificar (bool): se True, recalcula tudo a partir da lista e
+                          compara com as somas mantidas
+    
+    Retorna:
+        dict: dicionário com estatísticas
+    """
+    estatisticas = _montar_estatisticas(estatisticas_acumuladas)
+    
+    if verificar:
+        recalculado = _novo_acumulado()
+        for colheita in colheitas:
+            _acumular(recalculado, colheita)
+        estatisticas_recalculadas = _montar_estatisticas(recalculado)
+        
+        if estatisticas_recalculadas != estatisticas:
+            print("⚠️ Estatísticas acumuladas divergentes; usando o recálculo completo")
+            estatisticas_acumuladas.clear()
+            estatisticas_acumuladas.update(recalculado)
+            return estatisticas_recalculadas
+    
+    return estatisticas
+
+
 def comparar_metodos_colheita():
     """
     Compara perdas entre métodos de colheita (manual vs mecânica)
@@ -298,8 +395,8 @@ def comparar_metodos_colheita():
     Retorna:
         dict: comparação entre métodos
     """
-    manual = [c for c in colheitas if c['tipo_colheita'] == 'manual']
-    mecanica = [c for c in colheitas if c['tipo_colheita'] == 'mecânica']
+    manual = indice_por_tipo.get('manual', [])
+    mecanica = indice_por_tipo.get('mecânica', [])
     
     def calcular_media(lista):
         if not lista:
@@ -324,6 +421,234 @@ def limpar_colheitas():
     Remove todas as colheitas (útil para testes)
     """
     colheitas.clear()
+    _limpar_indices()
+    alteracoes_pendentes[:] = [('limpar', None)]
     print("✓ Todas as colheitas foram removidas")
 
 
+def marcar_alteracoes_gravadas():
+    """
+    Registra que as alterações pendentes foram gravadas em disco
+    """
+    alteracoes_pendentes.clear()
+
+
+def _indexar_colheita(colheita, indexar_data=True, incluir_quantis=True):
+    """
+    Inclui uma colheita nos índices secundários, nos totais
+    consolidados por mês e safra e no cubo de análise
+    
+    Parâmetros:
+        colheita (dict): colheita a indexar
+        indexar_data (bool): se False, não insere no índice por data
+                             (usado na reconstrução em lote)
+        incluir_quantis (bool): se False, não inclui nos esboços de percentis
+                                (usado ao restaurar esboços gravados)
+    """
+    if 'data_ordinal' not in colheita:
+        colheita['data_ordinal'] = converter_data_ordinal(colheita['data_colheita'])
+    
+    if indexar_data and colheita['data_ordinal'] is not None:
+        posicao = bisect.bisect_right(datas_ordenadas, colheita['data_ordinal'])
+        datas_ordenadas.insert(posicao, colheita['data_ordinal'])
+        colheitas_por_data.insert(posicao, colheita)
+    
+    indice_colheitas.setdefault(colheita['id'], colheita)
+    indice_por_fazenda.setdefault(colheita['id_fazenda'], []).append(colheita)
+    chave_talhao = (colheita['id_fazenda'], colheita['codigo_talhao'])
+    indice_por_talhao.setdefault(chave_talhao, []).append(colheita)
+    indice_por_tipo.setdefault(colheita['tipo_colheita'], []).append(colheita)
+    _acumular(estatisticas_acumuladas, colheita)
+    consolidar_colheita(colheita)
+    adicionar_ao_cubo(colheita)
+    if incluir_quantis:
+        incluir_colheita(colheita)
+    registrar_alteracao()
+
+
+def _limpar_indices():
+    """
+    Esvazia todos os índices secundários
+    """
+    indice_colheitas.clear()
+    indice_por_fazenda.clear()
+    indice_por_talhao.clear()
+    indice_por_tipo.clear()
+    datas_ordenadas.clear()
+    colheitas_por_data.clear()
+    estatisticas_acumuladas.clear()
+    estatisticas_acumuladas.update(_novo_acumulado())
+    limpar_consolidacao()
+    limpar_cubo()
+    limpar_esbocos()
+    registrar_alteracao()
+
+
+def reindexar_colheitas(incluir_quantis=True):
+    """
+    Reconstrói os índices secundários a partir da lista global
+    O índice por data é montado com uma única ordenação
+    
+    Parâmetro:
+        incluir_quantis (bool): se False, não recalcula os esboços de percentis
+    """
+    _limpar_indices()
+    for colheita in colheitas:
+        _indexar_colheita(colheita, indexar_data=False, incluir_quantis=incluir_quantis)
+    
+    datadas = [c for c in colheitas if c['data_ordinal'] is not None]
+    datadas.sort(key=lambda c: c['data_ordinal'])  # ordenação estável
+    colheitas_por_data.extend(datadas)
+    datas_ordenadas.extend(c['data_ordinal'] for c in datadas)
+
+
+def carregar_colheitas(lista_colheitas, esbocos=None, gravadas=False):
+    """
+    Substitui as colheitas em memória por uma lista carregada (JSON ou BD)
+    Procedimento que modifica a lista global e reconstrói os índices
+    
+    Parâmetros:
+        lista_colheitas (iterable): colheitas carregadas (lista ou gerador,
+                                    ex: arquivo.iterar_colheitas_json)
+        esbocos (dict): esboços de percentis gravados (opcional); usados no
+                        lugar do recálculo se corresponderem às colheitas
+        gravadas (bool): True se a lista veio dos arquivos de dados (nada a
+                         gravar); senão, a próxima gravação será completa
+    """
+    # Se a leitura falhar no meio do gerador, as colheitas em memória
+    # permanecem as anteriores (a troca só acontece ao fim da leitura);
+    # se um registro lido não puder ser indexado, as anteriores são
+    # restauradas (a cópia rasa do armazém mantém as colunas antigas, que
+    # carregar substitui sem alterar)
+    colunar = isinstance(colheitas, ArmazemColunar)
+    anteriores = copy.copy(colheitas) if colunar else colheitas[:]
+    pendentes = alteracoes_pendentes[:]
+    
+    try:
+        if colunar:
+            colheitas.carregar(lista_colheitas)
+        else:
+            colheitas[:] = lista_colheitas
+        
+        alteracoes_pendentes.clear()
+        if not gravadas:
+            alteracoes_pendentes.append(('substituir', None))
+        
+        if esbocos is None:
+            reindexar_colheitas()
+            return
+        
+        reindexar_colheitas(incluir_quantis=False)
+        if not restaurar_esbocos(esbocos, calcular_assinatura(colheitas)):
+            # Esboços de outra versão dos dados: recalcula a partir das colheitas
+            for colheita in colheitas:
+                incluir_colheita(colheita)
+    except Exception:
+        if colunar:
+            colheitas.carregar(anteriores)
+        else:
+            colheitas[:] = anteriores
+        alteracoes_pendentes[:] = pendentes
+        reindexar_colheitas()
+        raise
+
+
+def converter_data_ordinal(data):
+    """
+    Converte uma data para o seu número ordinal (dias desde 01/01/0001)
+    
+    Parâmetro:
+        data: string DD/MM/AAAA, date/datetime ou inteiro ordinal
+    
+    Retorna:
+        int: data ordinal ou None se inválida
+    """
+    if isinstance(data, int):
+        return data
+    if isinstance(data, (date, datetime)):
+        return data.toordinal()
+    try:
+        return datetime.strptime(data, '%d/%m/%Y').toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def buscar_colheitas_periodo(inicio=None, fim=None):
+    """
+    Busca colheitas realizadas entre duas datas (inclusive)
+    Pesquisa binária (bisect) no índice ordenado por data
+    
+    Parâmetros:
+        inicio: data inicial (DD/MM/AAAA, date ou ordinal); None = sem limite
+        fim: data final (DD/MM/AAAA, date ou ordinal); None = sem limite
+    
+    Retorna:
+        list: colheitas do período, em ordem de data
+    """
+    ordinal_inicio = converter_data_ordinal(inicio) if inicio is not None else None
+    ordinal_fim = converter_data_ordinal(fim) if fim is not None else None
+    
+    if (inicio is not None and ordinal_inicio is None) or \
+       (fim is not None and ordinal_fim is None):
+        print("✗ Formato de data inválido! Use DD/MM/AAAA")
+        return []
+    
+    i = 0 if ordinal_inicio is None else bisect.bisect_left(datas_ordenadas, ordinal_inicio)
+    j = len(datas_ordenadas) if ordinal_fim is None else bisect.bisect_right(datas_ordenadas, ordinal_fim)
+    
+    return colheitas_por_data[i:j]
+
+
+def obter_safra(data):
+    """
+    Identifica a safra de uma data (ex: 15/09/2024 -> '2024/2025')
+    A safra começa no mês MES_INICIO_SAFRA do config
+    
+    Parâmetro:
+        data: string DD/MM/AAAA, date/datetime ou inteiro ordinal
+    
+    Retorna:
+        str: safra no formato 'AAAA/AAAA' ou None se a data for inválida
+    """
+    ordinal = converter_data_ordinal(data)
+    if ordinal is None:
+        return None
+    
+    return nome_safra(date.fromordinal(ordinal))
+
+
+def periodo_safra(safra):
+    """
+    Retorna a primeira e a última data de uma safra
+    
+    Parâmetro:
+        safra: 'AAAA/AAAA' ou ano de início (int)
+    
+    Retorna:
+        tuple: (data_inicio, data_fim) como date, ou (None, None) se inválida
+    """
+    try:
+        ano_inicio = int(str(safra).split('/')[0])
+        inicio = date(ano_inicio, MES_INICIO_SAFRA, 1)
+        fim = date.fromordinal(date(ano_inicio + 1, MES_INICIO_SAFRA, 1).toordinal() - 1)
+    except ValueError:
+        print("✗ Safra inválida! Use AAAA/AAAA (ex: 2024/2025)")
+        return None, None
+    
+    return inicio, fim
+
+
+def buscar_colheitas_safra(safra):
+    """
+    Busca todas as colheitas de uma safra
+    
+    Parâmetro:
+        safra: 'AAAA/AAAA' ou ano de início (int)
+    
+    Retorna:
+        list: colheitas da safra, em ordem de data
+    """
+    inicio, fim = periodo_safra(safra)
+    if inicio is None:
+        return []
+    return buscar_colheitas_periodo(inicio, fim)
@@ -0,0 +1,361 @@
+"""
+Armazenamento colunar de colheitas
+Estruturas de dados compactas: arrays tipados (módulo array) em vez de
+uma lista de dicionários
+
+Cada campo numérico fica em um array('d') e cada campo categórico
+(tipo, variedade, status...) é guardado como um código inteiro pequeno,
+com uma tabela de valores por campo. Uma linha é acessada por meio de
+LinhaColheita, que se comporta como o dicionário original (colheita['campo'])
+para que o restante do sistema continue funcionando sem alterações.
+"""
+
+import math
+from array import array
+from collections.abc import Mapping
+from datetime import date, datetime
+from modulos.registros import CAMPOS_COLHEITA
+from modulos.categorias import CATEGORIAS
+from config import TIPOS_PERDA
+
+
+# Campos numéricos armazenados como double (array 'd')
+CAMPOS_NUMERICOS = (
+    'area_colhida', 'quantidade_colhida', 'quantidade_perdida',
+    'produtividade', 'percentual_perda_total'
+)
+
+# Campos inteiros (array 'q'); data_ordinal usa -1 para data ausente e
+# data_registro guarda segundos desde 01/01/0001 00:00:00 (-1 = texto fora
+# do formato 'DD/MM/AAAA HH:MM:SS', mantido em registros_texto)
+CAMPOS_INTEIROS = ('id', 'id_fazenda', 'data_ordinal', 'data_registro')
+
+# Campos categóricos e o tipo do array de códigos
+# ('B' = até 256 valores, 'H' = até 65.536, 'I' = até ~4 bilhões)
+CAMPOS_CATEGORICOS = {
+    'tipo_colheita': 'B',
+    'variedade': 'H',
+    'status': 'B',
+    'nome_fazenda': 'I',
+    'codigo_talhao': 'I',
+    'data_colheita': 'I',
+}
+
+# Limite de valores distintos para cada tipo de array de códigos
+LIMITE_CODIGOS = {'B': 0xFF, 'H': 0xFFFF, 'I': 0xFFFFFFFF}
+
+SEM_DATA = -1
+
+SEGUNDOS_DIA = 86400
+
+
+class LinhaColheita(Mapping):
+    """
+    Visão de uma linha do armazém colunar com interface de dicionário
+    Não copia dados: lê (e grava) diretamente nas colunas
+    """
+
+    __slots__ = ('_armazem', '_posicao')
+
+    def __init__(self, armazem, posicao):
+        self._armazem = armazem
+        self._posicao = posicao
+
+    def __getitem__(self, campo):
+        return self._armazem.obter_valor(self._posicao, campo)
+
+    def __setitem__(self, campo, valor):
+        self._armazem.definir_valor(self._posicao, campo, valor)
+
+    def __iter__(self):
+        yield from CAMPOS_COLHEITA
+        yield from self._armazem.extras.get(self._posicao, ())
+
+    def __len__(self):
+        return len(CAMPOS_COLHEITA) + len(self._armazem.extras.get(self._posicao, ()))
+
+    def copy(self):
+        """Retorna uma cópia da linha como dicionário comum"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"LinhaColheita({self.copy()!r})"
+
+
+class ArmazemColunar:
+    """
+    Armazém de colheitas em colunas (arrays tipados)
+    Oferece a mesma interface de lista usada pelo sistema
+    (append, extend, clear, len, iteração e índice) e agregações
+    diretas sobre as colunas
+    """
+
+    def __init__(self, lista_colheitas=None):
+        self.numericos = {campo: array('d') for campo in CAMPOS_NUMERICOS}
+        self.inteiros = {campo: array('q') for campo in CAMPOS_INTEIROS}
+        self.codigos = {campo: array(tipo) for campo, tipo in CAMPOS_CATEGORICOS.items()}
+        self.categorias = {campo: [] for campo in CAMPOS_CATEGORICOS}
+        self._mapa_categorias = {campo: {} for campo in CAMPOS_CATEGORICOS}
+        # Códigos iniciais iguais aos do dicionário de categorias do sistema
+        for campo in ('variedade', 'tipo_colheita', 'status'):
+            for valor in CATEGORIAS[campo]:
+                self._codificar(campo, valor)
+        # Perdas por tipo: uma coluna por tipo de perda (NaN = sem registro)
+        self.perdas = {tipo: array('d') for tipo in TIPOS_PERDA}
+        # Dados fora do esquema (tipos de perda desconhecidos, campos extras)
+        self.perdas_extras = {}
+        self.extras = {}
+        self.registros_texto = {}
+        self._tamanho = 0
+
+        if lista_colheitas:
+            self.extend(lista_colheitas)
+
+    # ---------- Interface de lista ----------
+
+    def __len__(self):
+        return self._tamanho
+
+    def __bool__(self):
+        return self._tamanho > 0
+
+    def __iter__(self):
+        for posicao in range(self._tamanho):
+            yield LinhaColheita(self, posicao)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [LinhaColheita(self, p) for p in range(*indice.indices(self._tamanho))]
+        if indice < 0:
+            indice += self._tamanho
+        if not 0 <= indice < self._tamanho:
+            raise IndexError("índice fora do intervalo")
+        return LinhaColheita(self, indice)
+
+    def append(self, colheita):
+        """
+        Inclui uma colheita (dicionário ou LinhaColheita) no armazém
+
+        Parâmetro:
+            colheita (dict): colheita a incluir
+
+        Retorna:
+            LinhaColheita: visão da linha incluída
+        """
+        posicao = self._tamanho
+
+        for campo in CAMPOS_NUMERICOS:
+            self.numericos[campo].append(float(colheita[campo]))
+
+        self.inteiros['id'].append(int(colheita['id']))
+        self.inteiros['id_fazenda'].append(int(colheita['id_fazenda']))
+        ordinal = colheita.get('data_ordinal')
+        if ordinal is None and 'data_ordinal' not in colheita:
+            ordinal = _converter_data(colheita['data_colheita'])
+        self.inteiros['data_ordinal'].append(SEM_DATA if ordinal is None else ordinal)
+        self.inteiros['data_registro'].append(self._codificar_registro(posicao, colheita['data_registro']))
+
+        for campo in CAMPOS_CATEGORICOS:
+            self.codigos[campo].append(self._codificar(campo, colheita[campo]))
+
+        perdas = colheita['perdas_detalhadas']
+        for tipo in TIPOS_PERDA:
+            self.perdas[tipo].append(float(perdas[tipo]) if tipo in perdas else math.nan)
+        desconhecidas = {t: p for t, p in perdas.items() if t not in self.perdas}
+        if desconhecidas:
+            self.perdas_extras[posicao] = desconhecidas
+
+        extras = {c: v for c, v in colheita.items() if c not in CAMPOS_COLHEITA}
+        if extras:
+            self.extras[posicao] = extras
+
+        self._tamanho += 1
+        return LinhaColheita(self, posicao)
+
+    def extend(self, lista_colheitas):
+        """Inclui várias colheitas no armazém"""
+        for colheita in lista_colheitas:
+            self.append(colheita)
+
+    def carregar(self, lista_colheitas):
+        """
+        Substitui o conteúdo do armazém por uma lista de colheitas
+        A lista pode conter visões deste mesmo armazém: as novas colunas
+        são montadas antes de descartar as antigas
+
+        Parâmetro:
+            lista_colheitas (list): colheitas a carregar
+        """
+        novo = ArmazemColunar(lista_colheitas)
+        self.__dict__.update(novo.__dict__)
+
+    def clear(self):
+        """Remove todas as colheitas (mantém o dicionário de categorias)"""
+        for coluna in (*self.numericos.values(), *self.inteiros.values(),
+                       *self.codigos.values(), *self.perdas.values()):
+            del coluna[:]
+        self.perdas_extras.clear()
+        self.extras.clear()
+        self.registros_texto.clear()
+        self._tamanho = 0
+
+    # ---------- Acesso a valores ----------
+
+    def _codificar(self, campo, valor):
+        """Retorna o código inteiro de um valor categórico (cria se novo)"""
+        mapa = self._mapa_categorias[campo]
+        codigo = mapa.get(valor)
+        if codigo is None:
+            codigo = len(self.categorias[campo])
+            if codigo > LIMITE_CODIGOS[CAMPOS_CATEGORICOS[campo]]:
+                raise OverflowError(f"Valores distintos demais para o campo '{campo}'")
+            mapa[valor] = codigo
+            self.categorias[campo].append(valor)
+        return codigo
+
+    def _codificar_registro(self, posicao, valor):
+        """Retorna os segundos de data_registro (SEM_DATA e guarda o valor se fora do formato)"""
+        segundos = _converter_carimbo(valor)
+        if segundos is None:
+            self.registros_texto[posicao] = valor
+            return SEM_DATA
+        self.registros_texto.pop(posicao, None)
+        return segundos
+
+    def obter_perdas(self, posicao):
+        """Reconstrói o dicionário de perdas detalhadas de uma linha"""
+        perdas = {}
+        for tipo, coluna in self.perdas.items():
+            valor = coluna[posicao]
+            if not math.isnan(valor):
+                perdas[tipo] = valor
+        perdas.update(self.perdas_extras.get(posicao, {}))
+        return perdas
+
+    def obter_valor(self, posicao, campo):
+        """Lê o valor de um campo de uma linha"""
+        if campo in self.numericos:
+            return self.numericos[campo][posicao]
+        if campo in self.codigos:
+            return self.categorias[campo][self.codigos[campo][posicao]]
+        if campo == 'data_registro':
+            segundos = self.inteiros[campo][posicao]
+            if segundos == SEM_DATA:
+                return self.registros_texto.get(posicao)
+            return _formatar_carimbo(segundos)
+        if campo in self.inteiros:
+            valor = self.inteiros[campo][posicao]
+            return None if campo == 'data_ordinal' and valor == SEM_DATA else valor
+        if campo == 'perdas_detalhadas':
+            return self.obter_perdas(posicao)
+        if campo == 'resumo_perdas':
+            return tuple(sorted(self.obter_perdas(posicao).items(),
+                                key=lambda x: x[1], reverse=True))
+        return self.extras.get(posicao, {})[campo]
+
+    def definir_valor(self, posicao, campo, valor):
+        """Grava o valor de um campo de uma linha"""
+        if campo in self.numericos:
+            self.numericos[campo][posicao] = float(valor)
+        elif campo in self.codigos:
+            self.codigos[campo][posicao] = self._codificar(campo, valor)
+        elif campo == 'data_registro':
+            self.inteiros[campo][posicao] = self._codificar_registro(posicao, valor)
+        elif campo in self.inteiros:
+            self.inteiros[campo][posicao] = SEM_DATA if valor is None else int(valor)
+        elif campo == 'perdas_detalhadas':
+            for tipo in TIPOS_PERDA:
+                self.perdas[tipo][posicao] = float(valor[tipo]) if tipo in valor else math.nan
+            desconhecidas = {t: p for t, p in valor.items() if t not in self.perdas}
+            if desconhecidas:
+                self.perdas_extras[posicao] = desconhecidas
+            else:
+                self.perdas_extras.pop(posicao, None)
+        elif campo == 'resumo_perdas':
+            pass  # derivado de perdas_detalhadas
+        else:
+            self.extras.setdefault(posicao, {})[campo] = valor
+
+    # ---------- Agregações sobre colunas ----------
+
+    def coluna(self, campo):
+        """
+        Retorna a coluna de um campo (array numérico ou de códigos)
+
+        Parâmetro:
+            campo (str): nome do campo
+
+        Retorna:
+            array: coluna do campo (sem cópia)
+        """
+        if campo in self.numericos:
+            return self.numericos[campo]
+        if campo in self.inteiros:
+            return self.inteiros[campo]
+        return self.codigos[campo]
+
+    def somar(self, campo):
+        """Soma uma coluna numérica"""
+        return math.fsum(self.numericos[campo])
+
+    def somar_por(self, campo, campo_grupo):
+        """
+        Soma uma coluna numérica agrupando por um campo categórico
+
+        Parâmetros:
+            campo (str): campo numérico a somar
+            campo_grupo (str): campo categórico de agrupamento
+
+        Retorna:
+            dict: {valor_categoria: (soma, quantidade)}
+        """
+        categorias = self.categorias[campo_grupo]
+        somas = [0.0] * len(categorias)
+        contagens = [0] * len(categorias)
+
+        for codigo, valor in zip(self.codigos[campo_grupo], self.numericos[campo]):
+            somas[codigo] += valor
+            contagens[codigo] += 1
+
+        return {categorias[codigo]: (somas[codigo], contagens[codigo])
+                for codigo in range(len(categorias)) if contagens[codigo]}
+
+    def tamanho_bytes(self):
+        """
+        Estima a memória ocupada pelas colunas (sem as tabelas de categorias)
+
+        Retorna:
+            int: bytes ocupados pelos arrays
+        """
+        colunas = (*self.numericos.values(), *self.inteiros.values(),
+                   *self.codigos.values(), *self.perdas.values())
+        return sum(c.itemsize * len(c) for c in colunas)
+
+
+def _converter_data(data_str):
+    """Converte 'DD/MM/AAAA' em data ordinal (None se inválida)"""
+    if isinstance(data_str, date):
+        return data_str.toordinal()
+    try:
+        return datetime.strptime(data_str, '%d/%m/%Y').toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def _converter_carimbo(carimbo):
+    """Converte 'DD/MM/AAAA HH:MM:SS' em segundos desde 01/01/0001 (None se em outro formato)"""
+    try:
+        segundos = (date(int(carimbo[6:10]), int(carimbo[3:5]), int(carimbo[:2])).toordinal() * SEGUNDOS_DIA
+                    + int(carimbo[11:13]) * 3600 + int(carimbo[14:16]) * 60 + int(carimbo[17:19]))
+    except (TypeError, ValueError):
+        return None
+    # O texto é reconstruído na leitura: só aceita o formato exato
+    return segundos if _formatar_carimbo(segundos) == carimbo else None
+
+
+def _formatar_carimbo(segundos):
+    """Converte segundos desde 01/01/0001 em 'DD/MM/AAAA HH:MM:SS'"""
+    dia, resto = divmod(segundos, SEGUNDOS_DIA)
+    data = date.fromordinal(dia)
+    return (f"{data.day:02d}/{data.month:02d}/{data.year:04d} "
+            f"{resto // 3600:02d}:{resto // 60 % 60:02d}:{resto % 60:02d}")
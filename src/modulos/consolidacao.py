@@ -0,0 +1,209 @@
+"""
+Consolidação de colheitas por mês e por safra
+Estruturas de dados: dicionários de totais por (período, fazenda, talhão, variedade)
+
+Os totais são atualizados a cada colheita registrada ou carregada
+(modulos.colheita chama consolidar_colheita ao indexar) e zerados junto
+com os índices. As consultas de período somam apenas os totais guardados,
+sem percorrer as colheitas nem converter datas em texto.
+"""
+
+from datetime import date
+from config import MES_INICIO_SAFRA
+
+
+# Totais mensais: ((ano, mes), id_fazenda, codigo_talhao, variedade) -> totais
+consolidado_mensal = {}
+
+# Totais por safra: (safra, id_fazenda, codigo_talhao, variedade) -> totais
+consolidado_safra = {}
+
+# Posições da lista de totais
+QTD, PRODUCAO, PERDIDA, AREA, SOMA_PERCENTUAL = range(5)
+
+# Formas de agrupamento aceitas pelas consultas e a parte da chave usada
+AGRUPAMENTOS = {
+    'periodo': lambda periodo, id_fazenda, codigo_talhao, variedade: periodo,
+    'fazenda': lambda periodo, id_fazenda, codigo_talhao, variedade: id_fazenda,
+    'talhao': lambda periodo, id_fazenda, codigo_talhao, variedade: (id_fazenda, codigo_talhao),
+    'variedade': lambda periodo, id_fazenda, codigo_talhao, variedade: variedade,
+}
+
+
+def nome_safra(dia):
+    """
+    Retorna a safra de uma data (ex: 15/09/2024 -> '2024/2025')
+    A safra começa no mês MES_INICIO_SAFRA do config
+
+    Parâmetro:
+        dia (date): data
+
+    Retorna:
+        str: safra no formato 'AAAA/AAAA'
+    """
+    ano_inicio = dia.year if dia.month >= MES_INICIO_SAFRA else dia.year - 1
+    return f"{ano_inicio}/{ano_inicio + 1}"
+
+
+def somar_colheita(consolidado, chave, colheita):
+    """
+    Soma uma colheita aos totais de uma chave
+
+    Parâmetros:
+        consolidado (dict): chave -> totais
+        chave (tuple): chave dos totais
+        colheita (dict): colheita a somar
+    """
+    totais = consolidado.get(chave)
+    if totais is None:
+        totais = consolidado[chave] = [0, 0.0, 0.0, 0.0, 0.0]
+    totais[QTD] += 1
+    totais[PRODUCAO] += colheita['quantidade_colhida']
+    totais[PERDIDA] += colheita['quantidade_perdida']
+    totais[AREA] += colheita['area_colhida']
+    totais[SOMA_PERCENTUAL] += colheita['percentual_perda_total']
+
+
+def consolidar_colheita(colheita):
+    """
+    Inclui uma colheita nos totais mensais e da safra
+    Colheitas sem data válida ficam fora da consolidação
+
+    Parâmetro:
+        colheita (dict): colheita com data_ordinal preenchida
+    """
+    if colheita['data_ordinal'] is None:
+        return
+
+    dia = date.fromordinal(colheita['data_ordinal'])
+    id_fazenda = colheita['id_fazenda']
+    codigo_talhao = colheita['codigo_talhao']
+    variedade = colheita['variedade']
+
+    somar_colheita(consolidado_mensal, ((dia.year, dia.month), id_fazenda, codigo_talhao, variedade), colheita)
+    somar_colheita(consolidado_safra, (nome_safra(dia), id_fazenda, codigo_talhao, variedade), colheita)
+
+
+def limpar_consolidacao():
+    """
+    Zera os totais mensais e por safra
+    """
+    consolidado_mensal.clear()
+    consolidado_safra.clear()
+
+
+def resumir_totais(totais):
+    """
+    Converte uma lista de totais em dicionário com médias
+
+    Parâmetro:
+        totais (list): [qtd, produção, perdida, área, soma dos percentuais]
+
+    Retorna:
+        dict: resumo do grupo
+    """
+    return {
+        'num_colheitas': totais[QTD],
+        'producao_total': totais[PRODUCAO],
+        'perda_total': totais[PERDIDA],
+        'area_total': totais[AREA],
+        'produtividade_media': totais[PRODUCAO] / totais[AREA] if totais[AREA] > 0 else 0,
+        'perda_media': totais[SOMA_PERCENTUAL] / totais[QTD] if totais[QTD] else 0,
+    }
+
+
+def _consultar(consolidado, aceitar_periodo, id_fazenda, codigo_talhao, variedade, agrupar_por):
+    """
+    Soma os totais consolidados que atendem aos filtros
+
+    Parâmetros:
+        consolidado (dict): consolidado_mensal ou consolidado_safra
+        aceitar_periodo (function): filtro do período (None = todos)
+        id_fazenda, codigo_talhao, variedade: filtros (None = todos)
+        agrupar_por (str): chave de AGRUPAMENTOS
+
+    Retorna:
+        dict: grupo -> resumo, em ordem crescente de grupo
+    """
+    if agrupar_por not in AGRUPAMENTOS:
+        print(f"✗ Agrupamento inválido! Use: {', '.join(AGRUPAMENTOS)}")
+        return {}
+    extrair_grupo = AGRUPAMENTOS[agrupar_por]
+
+    grupos = {}
+    for chave, totais in consolidado.items():
+        periodo, fazenda_chave, talhao_chave, variedade_chave = chave
+        if aceitar_periodo is not None and not aceitar_periodo(periodo):
+            continue
+        if id_fazenda is not None and fazenda_chave != id_fazenda:
+            continue
+        if codigo_talhao is not None and talhao_chave != codigo_talhao:
+            continue
+        if variedade is not None and variedade_chave != variedade:
+            continue
+
+        grupo = extrair_grupo(*chave)
+        soma = grupos.get(grupo)
+        if soma is None:
+            grupos[grupo] = list(totais)
+        else:
+            for i, valor in enumerate(totais):
+                soma[i] += valor
+
+    return {grupo: resumir_totais(grupos[grupo]) for grupo in sorted(grupos)}
+
+
+def consultar_mensal(ano=None, safra=None, id_fazenda=None, codigo_talhao=None,
+                     variedade=None, agrupar_por='periodo'):
+    """
+    Consulta produção, perdas e produtividade por mês
+
+    Parâmetros:
+        ano (int): apenas meses deste ano (opcional)
+        safra (str): apenas meses desta safra 'AAAA/AAAA' (opcional)
+        id_fazenda (int): filtro de fazenda (opcional)
+        codigo_talhao (str): filtro de talhão (opcional)
+        variedade (str): filtro de variedade (opcional)
+        agrupar_por (str): 'periodo' (mês), 'fazenda', 'talhao' ou 'variedade'
+
+    Retorna:
+        dict: grupo -> resumo; com agrupar_por='periodo' a chave é (ano, mes)
+    """
+    def aceitar_periodo(periodo):
+        if ano is not None and periodo[0] != ano:
+            return False
+        if safra is not None and nome_safra(date(periodo[0], periodo[1], 1)) != safra:
+            return False
+        return True
+
+    filtrar = aceitar_periodo if ano is not None or safra is not None else None
+    return _consultar(consolidado_mensal, filtrar, id_fazenda, codigo_talhao, variedade, agrupar_por)
+
+
+def consultar_safra(safra=None, id_fazenda=None, codigo_talhao=None,
+                    variedade=None, agrupar_por='periodo'):
+    """
+    Consulta produção, perdas e produtividade por safra
+
+    Parâmetros:
+        safra (str): apenas esta safra 'AAAA/AAAA' (opcional)
+        id_fazenda (int): filtro de fazenda (opcional)
+        codigo_talhao (str): filtro de talhão (opcional)
+        variedade (str): filtro de variedade (opcional)
+        agrupar_por (str): 'periodo' (safra), 'fazenda', 'talhao' ou 'variedade'
+
+    Retorna:
+        dict: grupo -> resumo; com agrupar_por='periodo' a chave é a safra
+    """
+    filtrar = (lambda periodo: periodo == safra) if safra is not None else None
+    return _consultar(consolidado_safra, filtrar, id_fazenda, codigo_talhao, variedade, agrupar_por)
+
+
+def listar_safras():
+    """
+    Retorna as safras com colheitas consolidadas
+
+    Retorna:
+        list: safras em ordem crescente
+    """
+    return sorted({chave[0] for chave in consolidado_safra})
@@ -0,0 +1,211 @@
+"""
+Cubo OLAP de colheitas
+Estruturas de dados: dicionários de totais por combinação de dimensões
+
+Dimensões: fazenda, talhão, variedade, tipo_colheita, status e mês.
+O cubo base guarda os totais (quantidade, produção, perda, área e soma dos
+percentuais de perda) de cada combinação das seis dimensões e é atualizado
+a cada colheita indexada por modulos.colheita.
+
+As consultas (roll-up, fatia e recorte) somam células já agregadas, nunca
+colheitas: o custo depende do número de combinações existentes, não do
+número de registros. Cada agrupamento consultado (cuboide) é montado uma
+vez a partir do cubo base e, dali em diante, também é atualizado a cada
+nova colheita.
+"""
+
+from datetime import date
+from modulos.consolidacao import somar_colheita, resumir_totais
+
+
+# Dimensões do cubo (a ordem define a posição na chave das células)
+DIMENSOES = ('fazenda', 'talhao', 'variedade', 'tipo_colheita', 'status', 'mes')
+
+# Cuboides materializados: posições das dimensões -> {chave: totais}
+# O cubo base (todas as dimensões) está sempre presente
+cuboides = {tuple(range(len(DIMENSOES))): {}}
+
+
+def _coordenadas(colheita):
+    """
+    Retorna os valores das dimensões de uma colheita
+    O talhão é identificado por (id_fazenda, codigo_talhao) e o mês por
+    (ano, mes), ou None se a colheita não tiver data válida
+
+    Parâmetro:
+        colheita (dict): colheita indexada
+
+    Retorna:
+        tuple: valores na ordem de DIMENSOES
+    """
+    ordinal = colheita['data_ordinal']
+    if ordinal is None:
+        mes = None
+    else:
+        dia = date.fromordinal(ordinal)
+        mes = (dia.year, dia.month)
+
+    return (
+        colheita['id_fazenda'],
+        (colheita['id_fazenda'], colheita['codigo_talhao']),
+        colheita['variedade'],
+        colheita['tipo_colheita'],
+        colheita['status'],
+        mes,
+    )
+
+
+def adicionar_ao_cubo(colheita):
+    """
+    Inclui uma colheita no cubo base e nos cuboides já materializados
+
+    Parâmetro:
+        colheita (dict): colheita com data_ordinal preenchida
+    """
+    coordenadas = _coordenadas(colheita)
+    for posicoes, celulas in cuboides.items():
+        chave = tuple(coordenadas[p] for p in posicoes)
+        somar_colheita(celulas, chave, colheita)
+
+
+def limpar_cubo():
+    """
+    Esvazia o cubo e descarta os cuboides materializados
+    """
+    base = tuple(range(len(DIMENSOES)))
+    for posicoes in [p for p in cuboides if p != base]:
+        del cuboides[posicoes]
+    cuboides[base].clear()
+
+
+def _posicoes(dimensoes):
+    """
+    Converte nomes de dimensões em posições (ordem de DIMENSOES)
+
+    Parâmetro:
+        dimensoes (iterable): nomes das dimensões
+
+    Retorna:
+        tuple: posições ordenadas, ou None se houver dimensão inválida
+    """
+    try:
+        return tuple(sorted({DIMENSOES.index(d) for d in dimensoes}))
+    except ValueError:
+        print(f"✗ Dimensão inválida! Use: {', '.join(DIMENSOES)}")
+        return None
+
+
+def _cuboide(posicoes):
+    """
+    Retorna o cuboide de um conjunto de dimensões, materializando-o a
+    partir do cubo base na primeira consulta
+
+    Parâmetro:
+        posicoes (tuple): posições das dimensões (ordenadas)
+
+    Retorna:
+        dict: chave -> totais
+    """
+    celulas = cuboides.get(posicoes)
+    if celulas is None:
+        celulas = {}
+        for chave_base, totais in cuboides[tuple(range(len(DIMENSOES)))].items():
+            chave = tuple(chave_base[p] for p in posicoes)
+            soma = celulas.get(chave)
+            if soma is None:
+                celulas[chave] = list(totais)
+            else:
+                for i, valor in enumerate(totais):
+                    soma[i] += valor
+        cuboides[posicoes] = celulas
+    return celulas
+
+
+def consultar_cubo(dimensoes=(), filtros=None):
+    """
+    Consulta o cubo agrupando por dimensões e filtrando por valores
+
+    Parâmetros:
+        dimensoes (tuple): dimensões do resultado (vazio = total geral)
+        filtros (dict): dimensão -> valor (fatia) ou conjunto/lista de
+                        valores aceitos (recorte)
+
+    Retorna:
+        dict: tupla com os valores das dimensões (na ordem pedida) -> resumo
+    """
+    filtros = filtros or {}
+    posicoes_grupo = _posicoes(dimensoes)
+    posicoes_filtro = _posicoes(filtros)
+    if posicoes_grupo is None or posicoes_filtro is None:
+        return {}
+
+    # O cuboide precisa ter as dimensões agrupadas e as filtradas
+    posicoes = tuple(sorted(set(posicoes_grupo) | set(posicoes_filtro)))
+    celulas = _cuboide(posicoes)
+
+    # Posição de cada dimensão dentro da chave do cuboide
+    indice = {DIMENSOES[p]: i for i, p in enumerate(posicoes)}
+    extrair = [indice[d] for d in dimensoes]
+    condicoes = []
+    for dimensao, aceito in filtros.items():
+        if isinstance(aceito, (set, frozenset, list)):
+            condicoes.append((indice[dimensao], frozenset(aceito)))
+        else:
+            condicoes.append((indice[dimensao], frozenset((aceito,))))
+
+    grupos = {}
+    for chave, totais in celulas.items():
+        if any(chave[i] not in aceitos for i, aceitos in condicoes):
+            continue
+        grupo = tuple(chave[i] for i in extrair)
+        soma = grupos.get(grupo)
+        if soma is None:
+            grupos[grupo] = list(totais)
+        else:
+            for i, valor in enumerate(totais):
+                soma[i] += valor
+
+    return {grupo: resumir_totais(totais) for grupo, totais in grupos.items()}
+
+
+def agregar(*dimensoes):
+    """
+    Roll-up: totais agrupados apenas pelas dimensões informadas
+
+    Parâmetro:
+        dimensoes (str): dimensões mantidas (as demais são somadas)
+
+    Retorna:
+        dict: tupla de valores -> resumo
+    """
+    return consultar_cubo(dimensoes)
+
+
+def fatiar(dimensao, valor, *dimensoes):
+    """
+    Fatia: fixa um valor em uma dimensão e agrupa pelas demais informadas
+    (ex: fatiar('fazenda', 3, 'variedade', 'tipo_colheita', 'mes'))
+
+    Parâmetros:
+        dimensao (str): dimensão fixada
+        valor: valor da dimensão fixada
+        dimensoes (str): dimensões do resultado
+
+    Retorna:
+        dict: tupla de valores -> resumo
+    """
+    return consultar_cubo(dimensoes, {dimensao: valor})
+
+
+def recortar(filtros, *dimensoes):
+    """
+    Recorte (dice): restringe várias dimensões a conjuntos de valores
+
+    Parâmetros:
+        filtros (dict): dimensão -> conjunto/lista de valores aceitos
+        dimensoes (str): dimensões do resultado
+
+    Retorna:
+        dict: tupla de valores -> resumo
+    """
+    return consultar_cubo(dimensoes, filtros)
@@ -17,6 +17,7 @@ except ImportError:
 
 from config import DB_CONFIG
 from modulos.arquivo import registrar_log
+from modulos.registros import Fazenda, Colheita
 
 
 def testar_conexao():
@@ -349,7 +350,7 @@ def buscar_fazendas():
         
         fazendas = []
         for row in cursor:
-            fazenda = {
+            fazenda = Fazenda.from_dict({
                 'id': row[0],
                 'nome': row[1],
                 'proprietario': row[2],
@@ -359,7 +360,7 @@ def buscar_fazendas():
                 'area_total': float(row[6]) if row[6] else 0,
                 'data_cadastro': row[7].strftime('%d/%m/%Y') if row[7] else '',
                 'talhoes': []
-            }
+            })
             fazendas.append(fazenda)
         
         cursor.close()
@@ -405,7 +406,7 @@ def buscar_colheitas():
         
         colheitas = []
         for row in cursor:
-            colheita = {
+            colheita = Colheita.from_dict({
                 'id': row[0],
                 'id_fazenda': row[1],
                 'nome_fazenda': row[2],
@@ -422,7 +423,7 @@ def buscar_colheitas():
                 'data_registro': row[13],
                 'perdas_detalhadas': {},
                 'resumo_perdas': ()
-            }
+            })
             
             # Busca perdas detalhadas
             cursor2 = conexao.cursor()
@@ -5,15 +5,26 @@ Capítulo 4: Estruturas de dados (listas, dicionários, tuplas)
 
 from datetime import datetime
 from modulos.validacao import validar_cpf, validar_cnpj, validar_area, validar_variedade
+from modulos.registros import Fazenda, Talhao, carimbo_agora
+from modulos.categorias import internar
+from modulos.cache import registrar_alteracao, memorizar
 
 
 # Lista global de fazendas (estrutura de dados principal)
 fazendas = []
 
+# Índice global de fazendas por ID (dicionário id -> fazenda, busca O(1))
+# Mantido em sincronia com a lista por adicionar/carregar/limpar fazendas
+indice_fazendas = {}
+
+# Índice de talhões por fazenda (id_fazenda -> {codigo: talhao})
+# Permite checar códigos duplicados e buscar talhões em O(1)
+indice_talhoes = {}
+
 
 def criar_fazenda(nome, proprietario, cpf_cnpj, localizacao, area_total=0):
     """
-    Cria um dicionário representando uma fazenda
+    Cria um registro representando uma fazenda
     
     Parâmetros:
         nome (str): nome da fazenda
@@ -23,7 +34,7 @@ def criar_fazenda(nome, proprietario, cpf_cnpj, localizacao, area_total=0):
         area_total (float): área total em hectares
     
     Retorna:
-        dict: dicionário com dados da fazenda
+        Fazenda: registro com dados da fazenda (acesso como dicionário)
     """
     # Validação de CPF/CNPJ
     documento_limpo = cpf_cnpj.replace('.', '').replace('-', '').replace('/', '')
@@ -42,18 +53,18 @@ def criar_fazenda(nome, proprietario, cpf_cnpj, localizacao, area_total=0):
         print("✗ Documento inválido! Use CPF (11 dígitos) ou CNPJ (14 dígitos)")
         return None
     
-    # Criação do dicionário de fazenda
-    fazenda = {
-        'id': len(fazendas) + 1,
-        'nome': nome,
-        'proprietario': proprietario,
-        'documento': cpf_cnpj,
-        'tipo_documento': tipo_doc,
-        'localizacao': localizacao,
-        'area_total': area_total,
-        'talhoes': [],  # lista de talhões
-        'data_cadastro': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-    }
+    # Criação do registro de fazenda
+    fazenda = Fazenda(
+        id=len(fazendas) + 1,
+        nome=nome,
+        proprietario=proprietario,
+        documento=cpf_cnpj,
+        tipo_documento=tipo_doc,
+        localizacao=localizacao,
+        area_total=area_total,
+        talhoes=[],  # lista de talhões
+        data_cadastro=carimbo_agora()
+    )
     
     return fazenda
 
@@ -70,6 +81,10 @@ def adicionar_fazenda(fazenda):
     """
     if fazenda:
         fazendas.append(fazenda)
+        if fazenda['id'] not in indice_fazendas:
+            indice_fazendas[fazenda['id']] = fazenda
+            _indexar_talhoes(fazenda)
+        registrar_alteracao()
         print(f"\n✓ Fazenda '{fazenda['nome']}' cadastrada com sucesso!")
         print(f"  ID: {fazenda['id']}")
         return True
@@ -86,10 +101,7 @@ def buscar_fazenda_por_id(id_fazenda):
     Retorna:
         dict: fazenda encontrada ou None
     """
-    for fazenda in fazendas:
-        if fazenda['id'] == id_fazenda:
-            return fazenda
-    return None
+    return indice_fazendas.get(id_fazenda)
 
 
 def buscar_fazenda_por_nome(nome):
@@ -111,7 +123,7 @@ def buscar_fazenda_por_nome(nome):
 
 def criar_talhao(codigo, area, variedade, ano_plantio):
     """
-    Cria um dicionário representando um talhão
+    Cria um registro representando um talhão
     
     Parâmetros:
         codigo (str): código do talhão (ex: T01)
@@ -120,7 +132,7 @@ def criar_talhao(codigo, area, variedade, ano_plantio):
         ano_plantio (int): ano do plantio
     
     Retorna:
-        dict: dicionário com dados do talhão
+        Talhao: registro com dados do talhão (acesso como dicionário)
     """
     if not validar_area(area):
         return None
@@ -131,15 +143,15 @@ def criar_talhao(codigo, area, variedade, ano_plantio):
     # Tupla de coordenadas (exemplo - pode ser expandido)
     coordenadas = (0.0, 0.0)  # (latitude, longitude)
     
-    talhao = {
-        'codigo': codigo.upper(),
-        'area': area,
-        'variedade': variedade.upper(),
-        'ano_plantio': ano_plantio,
-        'coordenadas': coordenadas,  # tupla imutável
-        'idade_anos': datetime.now().year - ano_plantio,
-        'status': 'ativo'
-    }
+    talhao = Talhao(
+        codigo=codigo.upper(),
+        area=area,
+        variedade=internar(variedade.upper()),
+        ano_plantio=ano_plantio,
+        coordenadas=coordenadas,  # tupla imutável
+        idade_anos=datetime.now().year - ano_plantio,
+        status='ativo'
+    )
     
     return talhao
 
@@ -164,16 +176,22 @@ def adicionar_talhao_fazenda(id_fazenda, talhao):
     if not talhao:
         return False
     
-    # Verifica se o código já existe
-    for t in fazenda['talhoes']:
-        if t['codigo'] == talhao['codigo']:
-            print(f"✗ Já existe um talhão com o código '{talhao['codigo']}'!")
-            return False
+    # Verifica se o código já existe (busca no índice da fazenda)
+    talhoes_fazenda = indice_talhoes.setdefault(id_fazenda, {})
+    if talhao['codigo'] in talhoes_fazenda:
+        print(f"✗ Já existe um talhão com o código '{talhao['codigo']}'!")
+        return False
     
-    fazenda['talhoes'].append(talhao)
+    # Atualiza área total da fazenda de forma incremental
+    # (o primeiro talhão substitui a área informada no cadastro)
+    if fazenda['talhoes']:
+        fazenda['area_total'] += talhao['area']
+    else:
+        fazenda['area_total'] = talhao['area']
     
-    # Atualiza área total da fazenda
-    fazenda['area_total'] = sum(t['area'] for t in fazenda['talhoes'])
+    fazenda['talhoes'].append(talhao)
+    talhoes_fazenda[talhao['codigo']] = talhao
+    registrar_alteracao()
     
     print(f"\n✓ Talhão '{talhao['codigo']}' adicionado à fazenda '{fazenda['nome']}'")
     print(f"  Área: {talhao['area']} ha")
@@ -199,11 +217,8 @@ def buscar_talhao(id_fazenda, codigo_talhao):
     if not fazenda:
         return None, None
     
-    for talhao in fazenda['talhoes']:
-        if talhao['codigo'] == codigo_talhao.upper():
-            return fazenda, talhao
-    
-    return fazenda, None
+    talhao = indice_talhoes.get(id_fazenda, {}).get(codigo_talhao.upper())
+    return fazenda, talhao
 
 
 def listar_fazendas():
@@ -247,9 +262,11 @@ def exibir_fazenda_detalhada(fazenda):
     print("="*60)
 
 
+@memorizar
 def obter_estatisticas_fazendas():
     """
     Retorna estatísticas das fazendas cadastradas
+    Resultado guardado em cache até a próxima alteração dos dados
     
     Retorna:
         dict: dicionário com estatísticas
@@ -290,6 +307,89 @@ def limpar_fazendas():
     Procedimento que modifica a lista global
     """
     fazendas.clear()
+    indice_fazendas.clear()
+    indice_talhoes.clear()
+    registrar_alteracao()
     print("✓ Todas as fazendas foram removidas")
 
 
+def _indexar_talhoes(fazenda):
+    """
+    Monta o índice de talhões (codigo -> talhao) de uma fazenda
+    Mantém a primeira ocorrência em caso de códigos repetidos
+    
+    Parâmetro:
+        fazenda (dict): fazenda a indexar
+    """
+    talhoes_fazenda = {}
+    for talhao in fazenda['talhoes']:
+        talhoes_fazenda.setdefault(talhao['codigo'], talhao)
+    indice_talhoes[fazenda['id']] = talhoes_fazenda
+
+
+def reindexar_fazendas():
+    """
+    Reconstrói os índices de fazendas e talhões a partir da lista global
+    Mantém a primeira ocorrência em caso de IDs repetidos
+    (mesmo comportamento da antiga busca linear)
+    """
+    indice_fazendas.clear()
+    indice_talhoes.clear()
+    for fazenda in fazendas:
+        if fazenda['id'] not in indice_fazendas:
+            indice_fazendas[fazenda['id']] = fazenda
+            _indexar_talhoes(fazenda)
+
+
+def carregar_fazendas(lista_fazendas):
+    """
+    Substitui as fazendas em memória por uma lista carregada (JSON ou BD)
+    Procedimento que modifica a lista global e reconstrói o índice
+    
+    Parâmetro:
+        lista_fazendas (list): lista de fazendas carregadas
+    """
+    fazendas.clear()
+    fazendas.extend(lista_fazendas)
+    reindexar_fazendas()
+    registrar_alteracao()
+
+
+def verificar_consistencia_fazendas(tolerancia=0.01):
+    """
+    Verifica se os índices e as áreas totais estão coerentes com os dados
+    Útil após carregar dados de JSON ou do banco
+    
+    Parâmetro:
+        tolerancia (float): diferença de área aceitável (hectares)
+    
+    Retorna:
+        list: lista de inconsistências encontradas (strings)
+    """
+    inconsistencias = []
+    
+    if len(indice_fazendas) != len(fazendas):
+        inconsistencias.append(
+            f"Índice com {len(indice_fazendas)} fazenda(s), lista com {len(fazendas)}"
+        )
+    
+    for fazenda in fazendas:
+        if indice_fazendas.get(fazenda['id']) is not fazenda:
+            inconsistencias.append(f"Fazenda ID {fazenda['id']} duplicada ou fora do índice")
+            continue
+        
+        talhoes_fazenda = indice_talhoes.get(fazenda['id'], {})
+        if len(talhoes_fazenda) != len(fazenda['talhoes']):
+            inconsistencias.append(
+                f"Fazenda ID {fazenda['id']}: códigos de talhão duplicados ou fora do índice"
+            )
+        
+        if fazenda['talhoes']:
+            area_calculada = sum(t['area'] for t in fazenda['talhoes'])
+            if abs(area_calculada - fazenda['area_total']) > tolerancia:
+                inconsistencias.append(
+                    f"Fazenda ID {fazenda['id']}: área total {fazenda['area_total']:.2f} ha, "
+                    f"soma dos talhões {area_calculada:.2f} ha"
+                )
+    
+    return inconsistencias
@@ -0,0 +1,277 @@
+"""
+Arquivo colunar de colheitas mapeado em memória (mmap)
+Estruturas de dados: colunas de tamanho fixo alinhadas no arquivo, lidas
+como memoryview (ou arrays NumPy) sem cópia
+
+O arquivo guarda as mesmas colunas do armazém colunar (modulos.colunar).
+Abrir o arquivo lê apenas o cabeçalho e o diretório de colunas; o sistema
+operacional carrega as páginas de cada coluna quando ela é usada. O
+resultado (ColheitasMapeadas) é um ArmazemColunar somente leitura: as
+agregações do armazém e as análises vetorizadas (modulos.analise_numpy)
+funcionam diretamente sobre os dados mapeados.
+
+Layout do arquivo (versão 2, little-endian):
+    cabeçalho   MAGICO, versão, linhas, tamanho do diretório e início dos dados
+    diretório   JSON: posição de cada coluna, tabelas de categorias, perdas
+                fora de TIPOS_PERDA, campos extras e datas de registro fora
+                do formato padrão
+    colunas     dados de cada coluna, alinhados em ALINHAMENTO bytes
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np  # type: ignore  # Importação opcional
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    NUMPY_DISPONIVEL = False
+
+from modulos.colunar import ArmazemColunar, CAMPOS_NUMERICOS, CAMPOS_INTEIROS, CAMPOS_CATEGORICOS
+
+
+# Identificação e versão do formato
+MAGICO = b'CANM'
+VERSAO_FORMATO = 2
+
+# Cabeçalho: mágico, versão, reservado, linhas, tamanho do diretório e
+# posição (em bytes) do início das colunas
+CABECALHO = struct.Struct('<4sHHQQQ')
+
+# Alinhamento do início de cada coluna (linha de cache)
+ALINHAMENTO = 64
+
+# Prefixo das colunas de perdas por tipo
+PREFIXO_PERDA = 'perdas.'
+
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _alinhar(posicao):
+    """Arredonda uma posição para o próximo múltiplo de ALINHAMENTO"""
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def _colunas_armazem(armazem):
+    """Pares (nome, array) de todas as colunas de um armazém, na ordem de gravação"""
+    return [
+        *armazem.numericos.items(),
+        *armazem.inteiros.items(),
+        *armazem.codigos.items(),
+        *((PREFIXO_PERDA + tipo, coluna) for tipo, coluna in armazem.perdas.items()),
+    ]
+
+
+def gravar_mapeado(caminho, lista_colheitas):
+    """
+    Grava as colheitas no formato colunar para mmap
+
+    Parâmetros:
+        caminho (str): arquivo de destino
+        lista_colheitas: lista de colheitas ou ArmazemColunar
+
+    Retorna:
+        dict: quantidade de colheitas e bytes gravados
+    """
+    if isinstance(lista_colheitas, ArmazemColunar):
+        armazem = lista_colheitas
+    else:
+        armazem = ArmazemColunar(lista_colheitas)
+
+    # Posições relativas ao início dos dados (o diretório não depende delas)
+    colunas = _colunas_armazem(armazem)
+    posicoes = {}
+    posicao = 0
+    for nome, coluna in colunas:
+        posicoes[nome] = [coluna.typecode, posicao, len(coluna)]
+        posicao = _alinhar(posicao + len(coluna) * coluna.itemsize)
+
+    diretorio = json.dumps({
+        'colunas': posicoes,
+        'categorias': armazem.categorias,
+        'perdas_extras': armazem.perdas_extras,
+        'extras': armazem.extras,
+        'registros_texto': armazem.registros_texto,
+    }, ensure_ascii=False).encode('utf-8')
+    inicio_dados = _alinhar(CABECALHO.size + len(diretorio))
+
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(CABECALHO.pack(MAGICO, VERSAO_FORMATO, 0, len(armazem),
+                                     len(diretorio), inicio_dados))
+        arquivo.write(diretorio)
+        for nome, coluna in colunas:
+            # Preenche até o início da coluna
+            arquivo.write(b'\0' * (inicio_dados + posicoes[nome][1] - arquivo.tell()))
+            if _BIG_ENDIAN:
+                coluna = array(coluna.typecode, coluna)
+                coluna.byteswap()
+            coluna.tofile(arquivo)
+        tamanho = arquivo.tell()
+
+    return {'colheitas': len(armazem), 'bytes': tamanho}
+
+
+class ColheitasMapeadas(ArmazemColunar):
+    """
+    Armazém colunar somente leitura sobre um arquivo mapeado em memória
+    As colunas são memoryviews do mapeamento (sem cópia); leitura de
+    linhas, iteração, coluna, somar e somar_por funcionam como no
+    ArmazemColunar. Use fechar() (ou with) para liberar o arquivo; depois
+    de fechado, os acessos levantam ValueError.
+    """
+
+    def __init__(self, caminho):
+        """
+        Abre o arquivo e lê o cabeçalho e o diretório de colunas
+
+        Parâmetro:
+            caminho (str): arquivo gravado por gravar_mapeado
+
+        Exceções:
+            ValueError: arquivo de outro formato, de versão desconhecida ou truncado
+        """
+        self.caminho = caminho
+        with open(caminho, 'rb') as arquivo:
+            cabecalho = arquivo.read(CABECALHO.size)
+            if len(cabecalho) < CABECALHO.size:
+                raise ValueError("arquivo colunar truncado (cabeçalho)")
+            magico, versao, _, linhas, tamanho_diretorio, inicio_dados = CABECALHO.unpack(cabecalho)
+            if magico != MAGICO:
+                raise ValueError("arquivo não é um arquivo colunar do sistema")
+            if versao != VERSAO_FORMATO:
+                raise ValueError(f"versão {versao} do arquivo colunar não suportada "
+                                 f"(esperada {VERSAO_FORMATO})")
+            diretorio = json.loads(arquivo.read(tamanho_diretorio).decode('utf-8'))
+            # O mapeamento continua válido depois que o arquivo é fechado
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._visao = memoryview(self._mapa)
+        self._abertas = []  # memoryviews criadas sobre o mapeamento
+        self._fechado = False
+        self._posicoes = {}
+        colunas = {}
+        for nome, (tipo, posicao, quantidade) in diretorio['colunas'].items():
+            inicio = inicio_dados + posicao
+            fim = inicio + quantidade * array(tipo).itemsize
+            if quantidade != linhas or fim > len(self._mapa):
+                self.fechar()
+                raise ValueError(f"arquivo colunar truncado (coluna '{nome}')")
+            self._posicoes[nome] = (tipo, inicio, quantidade)
+            colunas[nome] = self._ler_coluna(tipo, inicio, fim)
+
+        # Mesmos atributos do ArmazemColunar, com memoryviews no lugar dos arrays
+        self.numericos = {}
+        self.inteiros = {}
+        self.codigos = {}
+        self.perdas = {}
+        for nome, coluna in colunas.items():
+            if nome.startswith(PREFIXO_PERDA):
+                self.perdas[nome[len(PREFIXO_PERDA):]] = coluna
+            elif nome in CAMPOS_NUMERICOS:
+                self.numericos[nome] = coluna
+            elif nome in CAMPOS_INTEIROS:
+                self.inteiros[nome] = coluna
+            elif nome in CAMPOS_CATEGORICOS:
+                self.codigos[nome] = coluna
+        self.categorias = diretorio['categorias']
+        self.perdas_extras = {int(p): v for p, v in diretorio['perdas_extras'].items()}
+        self.extras = {int(p): v for p, v in diretorio['extras'].items()}
+        self.registros_texto = {int(p): v for p, v in diretorio['registros_texto'].items()}
+        self._tamanho = linhas
+
+    def _ler_coluna(self, tipo, inicio, fim):
+        """Visão de uma coluna (cópia com bytes invertidos em big-endian)"""
+        if _BIG_ENDIAN:
+            coluna = array(tipo)
+            coluna.frombytes(self._visao[inicio:fim])
+            coluna.byteswap()
+            return memoryview(coluna)
+        trecho = self._visao[inicio:fim]
+        coluna = trecho.cast(tipo)
+        self._abertas.extend((trecho, coluna))
+        return coluna
+
+    def _verificar_aberto(self):
+        """Levanta ValueError se o arquivo já foi fechado"""
+        if self._fechado:
+            raise ValueError(f"arquivo colunar mapeado já fechado: {self.caminho}")
+
+    def obter_valor(self, posicao, campo):
+        self._verificar_aberto()
+        return super().obter_valor(posicao, campo)
+
+    def somar(self, campo):
+        self._verificar_aberto()
+        return super().somar(campo)
+
+    def somar_por(self, campo, campo_grupo):
+        self._verificar_aberto()
+        return super().somar_por(campo, campo_grupo)
+
+    def coluna_numpy(self, campo):
+        """
+        Retorna a coluna de um campo como array NumPy somente leitura, sem cópia
+
+        Parâmetro:
+            campo (str): nome do campo (perdas: 'perdas.<tipo>')
+
+        Retorna:
+            ndarray: coluna do campo
+        """
+        if not NUMPY_DISPONIVEL:
+            raise ImportError("NumPy não está instalado")
+        self._verificar_aberto()
+        if _BIG_ENDIAN:
+            return np.asarray(self.coluna(campo))
+        tipo, inicio, quantidade = self._posicoes[campo]
+        return np.frombuffer(self._mapa, dtype=tipo, count=quantidade, offset=inicio)
+
+    def coluna(self, campo):
+        """Retorna a coluna de um campo como memoryview (perdas: 'perdas.<tipo>')"""
+        self._verificar_aberto()
+        if campo.startswith(PREFIXO_PERDA):
+            return self.perdas[campo[len(PREFIXO_PERDA):]]
+        return super().coluna(campo)
+
+    def fechar(self):
+        """
+        Libera o mapeamento do arquivo
+        As colunas do objeto são liberadas antes; se ainda houver colunas em
+        uso fora dele (arrays NumPy sem cópia), o arquivo continua mapeado
+        até que elas sejam descartadas (no Windows, até lá ele não pode ser
+        substituído). Em todo caso o objeto fica fechado.
+        
+        Retorna:
+            bool: True se o mapeamento foi liberado
+        """
+        self._fechado = True
+        for visao in (*reversed(self._abertas), self._visao):
+            try:
+                visao.release()
+            except BufferError:
+                pass  # exportada para um array NumPy ainda em uso
+        self._abertas.clear()
+        
+        try:
+            self._mapa.close()
+        except BufferError:
+            print(f"⚠️ Arquivo colunar {self.caminho} ainda em uso: o mapeamento "
+                  f"será liberado quando as colunas exportadas forem descartadas")
+            return False
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    # ---------- Somente leitura ----------
+
+    def _somente_leitura(self, *args, **kwargs):
+        raise TypeError("arquivo colunar mapeado é somente leitura")
+
+    append = extend = carregar = clear = definir_valor = _somente_leitura
@@ -0,0 +1,261 @@
+"""
+Agregação paralela de colheitas (concurrent.futures.ProcessPoolExecutor)
+Estruturas de dados: fatias de fazendas e agregados parciais mescláveis
+
+As colheitas são divididas em fatias por id_fazenda (cada fazenda fica
+inteira em uma fatia; as fatias são equilibradas pelo número de colheitas).
+Cada processo calcula os agregados parciais da sua fatia: somas e
+contagens gerais, por método, variedade, status e talhão, e os esboços de
+percentis. O processo principal mescla os parciais.
+
+Onde o sistema operacional permite 'fork' (Linux), os processos herdam as
+colheitas em memória e recebem apenas a lista de IDs de fazendas da fatia;
+nos demais, cada fatia é enviada com os campos usados na agregação.
+"""
+
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from modulos.colheita import indice_por_fazenda
+from modulos.consolidacao import somar_colheita, resumir_totais
+from modulos.quantis import EsbocoQuantis, METRICAS, DIMENSOES_QUANTIS
+from config import PROCESSOS_AGREGACAO, MIN_COLHEITAS_PARALELO
+
+
+# Campos enviados aos processos quando não há 'fork'
+CAMPOS_AGREGACAO = (
+    'id', 'id_fazenda', 'nome_fazenda', 'codigo_talhao', 'tipo_colheita',
+    'variedade', 'status', 'area_colhida', 'quantidade_colhida',
+    'quantidade_perdida', 'produtividade', 'percentual_perda_total'
+)
+
+# Fatias por processo (mais fatias que processos equilibra a carga)
+FATIAS_POR_PROCESSO = 4
+
+
+def _novo_parcial():
+    """Cria a estrutura vazia de agregados parciais"""
+    return {
+        'total': [0, 0.0, 0.0, 0.0, 0.0],
+        'soma_ids': 0,
+        'por_tipo': {},
+        'por_variedade': {},
+        'por_status': {},
+        'por_talhao': {},
+        'esbocos': {},
+    }
+
+
+def agregar_colheitas(lista_colheitas, incluir_esbocos=True):
+    """
+    Calcula os agregados parciais de um conjunto de colheitas
+
+    Parâmetros:
+        lista_colheitas (iterable): colheitas (dicionários ou registros)
+        incluir_esbocos (bool): se False, não monta os esboços de percentis
+
+    Retorna:
+        dict: agregados parciais (mescláveis com mesclar_parciais)
+    """
+    parcial = _novo_parcial()
+    total = parcial['total']
+    por_status = parcial['por_status']
+    por_talhao = parcial['por_talhao']
+    esbocos = parcial['esbocos']
+
+    for colheita in lista_colheitas:
+        percentual = colheita['percentual_perda_total']
+        total[0] += 1
+        total[1] += colheita['quantidade_colhida']
+        total[2] += colheita['quantidade_perdida']
+        total[3] += colheita['area_colhida']
+        total[4] += percentual
+        parcial['soma_ids'] += colheita['id']
+
+        somar_colheita(parcial['por_tipo'], colheita['tipo_colheita'], colheita)
+        somar_colheita(parcial['por_variedade'], colheita['variedade'], colheita)
+        por_status[colheita['status']] = por_status.get(colheita['status'], 0) + 1
+
+        chave_talhao = (colheita['id_fazenda'], colheita['codigo_talhao'])
+        talhao = por_talhao.get(chave_talhao)
+        if talhao is None:
+            talhao = por_talhao[chave_talhao] = [colheita['nome_fazenda'], 0, 0]
+        talhao[1] += percentual
+        talhao[2] += 1
+
+        if not incluir_esbocos:
+            continue
+        for dimensao in DIMENSOES_QUANTIS:
+            grupo = colheita[dimensao]
+            for metrica in METRICAS:
+                chave = (metrica, dimensao, grupo)
+                esboco = esbocos.get(chave)
+                if esboco is None:
+                    esboco = esbocos[chave] = EsbocoQuantis()
+                esboco.adicionar(colheita[metrica])
+
+    return parcial
+
+
+def _agregar_fazendas(ids_fazendas, incluir_esbocos=True):
+    """Agrega as colheitas herdadas (fork) das fazendas de uma fatia"""
+    return agregar_colheitas(
+        (colheita for id_fazenda in ids_fazendas for colheita in indice_por_fazenda.get(id_fazenda, ())),
+        incluir_esbocos
+    )
+
+
+def mesclar_parciais(parciais):
+    """
+    Mescla agregados parciais calculados separadamente
+
+    Parâmetro:
+        parciais (iterable): agregados gerados por agregar_colheitas
+
+    Retorna:
+        dict: agregados parciais somados
+    """
+    mesclado = _novo_parcial()
+
+    for parcial in parciais:
+        for i, valor in enumerate(parcial['total']):
+            mesclado['total'][i] += valor
+        mesclado['soma_ids'] += parcial['soma_ids']
+
+        for campo in ('por_tipo', 'por_variedade'):
+            destino = mesclado[campo]
+            for grupo, totais in parcial[campo].items():
+                soma = destino.get(grupo)
+                if soma is None:
+                    destino[grupo] = list(totais)
+                else:
+                    for i, valor in enumerate(totais):
+                        soma[i] += valor
+
+        for status, quantidade in parcial['por_status'].items():
+            mesclado['por_status'][status] = mesclado['por_status'].get(status, 0) + quantidade
+
+        for chave, (nome, soma_perdas, quantidade) in parcial['por_talhao'].items():
+            talhao = mesclado['por_talhao'].get(chave)
+            if talhao is None:
+                mesclado['por_talhao'][chave] = [nome, soma_perdas, quantidade]
+            else:
+                talhao[1] += soma_perdas
+                talhao[2] += quantidade
+
+        for chave, esboco in parcial['esbocos'].items():
+            destino = mesclado['esbocos'].get(chave)
+            if destino is None:
+                mesclado['esbocos'][chave] = esboco
+            else:
+                destino.mesclar(esboco)
+
+    return mesclado
+
+
+def dividir_fazendas(num_fatias):
+    """
+    Divide as fazendas em fatias com número parecido de colheitas
+    (maiores fazendas primeiro, cada uma na fatia menos carregada)
+
+    Parâmetro:
+        num_fatias (int): quantidade de fatias
+
+    Retorna:
+        list: listas de IDs de fazendas (fatias vazias são omitidas)
+    """
+    fatias = [[] for _ in range(num_fatias)]
+    cargas = [0] * num_fatias
+
+    por_tamanho = sorted(indice_por_fazenda, key=lambda f: len(indice_por_fazenda[f]), reverse=True)
+    for id_fazenda in por_tamanho:
+        menor = cargas.index(min(cargas))
+        fatias[menor].append(id_fazenda)
+        cargas[menor] += len(indice_por_fazenda[id_fazenda])
+
+    return [fatia for fatia in fatias if fatia]
+
+
+def usar_paralelo(num_colheitas):
+    """
+    Indica se a agregação paralela compensa para uma quantidade de colheitas
+
+    Parâmetro:
+        num_colheitas (int): colheitas a agregar
+
+    Retorna:
+        bool: True se PROCESSOS_AGREGACAO pede paralelismo e há colheitas
+              suficientes (MIN_COLHEITAS_PARALELO)
+    """
+    processos = PROCESSOS_AGREGACAO or os.cpu_count() or 1
+    return processos > 1 and num_colheitas >= MIN_COLHEITAS_PARALELO
+
+
+def agregar_em_paralelo(num_processos=None, incluir_esbocos=True):
+    """
+    Agrega todas as colheitas em memória dividindo-as por fazenda entre processos
+
+    Parâmetros:
+        num_processos (int): processos a usar (None = PROCESSOS_AGREGACAO do
+                             config; se também for None, todos os núcleos)
+        incluir_esbocos (bool): se False, não monta os esboços de percentis
+
+    Retorna:
+        dict: agregados mesclados (mesmo formato de agregar_colheitas)
+    """
+    if num_processos is None:
+        num_processos = PROCESSOS_AGREGACAO or os.cpu_count() or 1
+
+    agregar_fatia = functools.partial(_agregar_fazendas, incluir_esbocos=incluir_esbocos)
+
+    if num_processos <= 1:
+        return mesclar_parciais(map(agregar_fatia, dividir_fazendas(1)))
+
+    fatias = dividir_fazendas(num_processos * FATIAS_POR_PROCESSO)
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(num_processos, mp_context=contexto) as executor:
+            return mesclar_parciais(executor.map(agregar_fatia, fatias))
+
+    # Sem 'fork': envia os campos necessários de cada fatia
+    def campos_fatia(fatia):
+        return [
+            {campo: colheita[campo] for campo in CAMPOS_AGREGACAO}
+            for id_fazenda in fatia for colheita in indice_por_fazenda[id_fazenda]
+        ]
+
+    with ProcessPoolExecutor(num_processos) as executor:
+        return mesclar_parciais(executor.map(
+            functools.partial(agregar_colheitas, incluir_esbocos=incluir_esbocos),
+            map(campos_fatia, fatias)
+        ))
+
+
+def resumir_agregado(agregado):
+    """
+    Converte agregados mesclados em indicadores
+
+    Parâmetro:
+        agregado (dict): resultado de agregar_em_paralelo
+
+    Retorna:
+        dict: totais gerais, resumos por método e variedade, contagem por
+              status, médias por talhão e percentis (p50, p90, p99)
+    """
+    total = agregado['total']
+    return {
+        'geral': resumir_totais(total),
+        'por_tipo': {tipo: resumir_totais(t) for tipo, t in agregado['por_tipo'].items()},
+        'por_variedade': {var: resumir_totais(t) for var, t in agregado['por_variedade'].items()},
+        'por_status': dict(agregado['por_status']),
+        'por_talhao': {
+            chave: (nome, soma / quantidade, quantidade)
+            for chave, (nome, soma, quantidade) in agregado['por_talhao'].items()
+        },
+        'percentis': {
+            chave: dict(zip((50, 90, 99), esboco.quantis((0.5, 0.9, 0.99))))
+            for chave, esboco in agregado['esbocos'].items()
+        },
+    }
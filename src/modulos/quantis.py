@@ -0,0 +1,324 @@
+"""
+Esboços de quantis (percentis) de perdas e produtividade
+Estruturas de dados: esboço KLL (níveis de amostras compactadas)
+
+Cada esboço guarda no máximo algumas centenas de valores, qualquer que seja
+o número de colheitas: quando um nível enche, ele é ordenado e metade dos
+valores (posições pares ou ímpares, sorteadas) sobe para o nível seguinte,
+onde cada valor passa a representar o dobro de colheitas. Dois esboços
+podem ser mesclados somando os níveis, o que permite agregar partes
+calculadas separadamente.
+
+Há um esboço por métrica (percentual_perda_total e produtividade) e por
+método de colheita e variedade. Os esboços são atualizados a cada colheita
+indexada por modulos.colheita e podem ser gravados junto aos arquivos JSON
+(exportar_esbocos / restaurar_esbocos), evitando recalcular na carga.
+"""
+
+import math
+import random
+from config import TAMANHO_ESBOCO_QUANTIS
+
+
+# Métricas e agrupamentos acompanhados
+METRICAS = ('percentual_perda_total', 'produtividade')
+DIMENSOES_QUANTIS = ('tipo_colheita', 'variedade')
+
+# Percentis exibidos por padrão
+PERCENTIS = (50, 90, 99)
+
+# Fator de redução da capacidade a cada nível abaixo do topo
+FATOR_CAPACIDADE = 2 / 3
+
+
+class EsbocoQuantis:
+    """
+    Esboço de quantis no estilo KLL (Karnin, Lang e Liberty)
+    Os valores do nível h representam 2**h valores originais cada
+    """
+
+    __slots__ = ('k', 'n', 'minimo', 'maximo', 'niveis')
+
+    def __init__(self, k=TAMANHO_ESBOCO_QUANTIS):
+        self.k = k
+        self.n = 0
+        self.minimo = None
+        self.maximo = None
+        self.niveis = [[]]
+
+    def _capacidade(self, nivel):
+        """Capacidade de um nível (o nível mais alto tem capacidade k)"""
+        profundidade = len(self.niveis) - nivel - 1
+        return max(2, int(math.ceil(self.k * FATOR_CAPACIDADE ** profundidade)))
+
+    def _compactar(self):
+        """Compacta, de baixo para cima, os níveis que atingiram a capacidade"""
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) >= self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append([])
+                itens.sort()
+                # Com quantidade ímpar, o maior valor fica no nível
+                sobra = [itens.pop()] if len(itens) % 2 else []
+                self.niveis[nivel + 1].extend(itens[random.getrandbits(1)::2])
+                self.niveis[nivel] = sobra
+            nivel += 1
+
+    def adicionar(self, valor):
+        """
+        Inclui um valor no esboço
+
+        Parâmetro:
+            valor (float): valor observado
+        """
+        self.niveis[0].append(valor)
+        self.n += 1
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+        if len(self.niveis[0]) >= self._capacidade(0):
+            self._compactar()
+
+    def mesclar(self, outro):
+        """
+        Soma outro esboço a este (o outro não é alterado)
+
+        Parâmetro:
+            outro (EsbocoQuantis): esboço a mesclar
+        """
+        if not outro.n:
+            return
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append([])
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel].extend(itens)
+        self.n += outro.n
+        self.minimo = outro.minimo if self.minimo is None else min(self.minimo, outro.minimo)
+        self.maximo = outro.maximo if self.maximo is None else max(self.maximo, outro.maximo)
+        self._compactar()
+
+    def quantis(self, fracoes):
+        """
+        Estima vários quantis de uma vez
+
+        Parâmetro:
+            fracoes (iterable): frações entre 0 e 1 (ex: 0.5, 0.9)
+
+        Retorna:
+            list: valor estimado de cada fração (None se o esboço estiver vazio)
+        """
+        fracoes = list(fracoes)
+        if not self.n:
+            return [None] * len(fracoes)
+
+        pares = sorted((valor, 1 << nivel) for nivel, itens in enumerate(self.niveis) for valor in itens)
+        peso_total = sum(peso for _, peso in pares)
+
+        resultado = []
+        for fracao in fracoes:
+            alvo = fracao * peso_total
+            acumulado = 0
+            estimado = pares[-1][0]
+            for valor, peso in pares:
+                acumulado += peso
+                if acumulado >= alvo:
+                    estimado = valor
+                    break
+            resultado.append(estimado)
+        return resultado
+
+    def quantil(self, fracao):
+        """Estima um quantil (fração entre 0 e 1)"""
+        return self.quantis([fracao])[0]
+
+    def tamanho(self):
+        """Quantidade de valores guardados no esboço"""
+        return sum(len(itens) for itens in self.niveis)
+
+    def to_dict(self):
+        """
+        Converte o esboço em dicionário (para gravação em JSON)
+
+        Retorna:
+            dict: parâmetros e níveis do esboço
+        """
+        return {'k': self.k, 'n': self.n, 'minimo': self.minimo,
+                'maximo': self.maximo, 'niveis': self.niveis}
+
+    @classmethod
+    def from_dict(cls, dados):
+        """
+        Cria um esboço a partir de um dicionário gravado
+
+        Parâmetro:
+            dados (dict): dicionário gerado por to_dict
+
+        Retorna:
+            EsbocoQuantis: esboço restaurado
+        """
+        esboco = cls(dados['k'])
+        esboco.n = dados['n']
+        esboco.minimo = dados['minimo']
+        esboco.maximo = dados['maximo']
+        esboco.niveis = [list(itens) for itens in dados['niveis']]
+        return esboco
+
+
+# Esboços por (métrica, dimensão, valor da dimensão)
+esbocos = {}
+
+# Colheitas incluídas nos esboços: [quantidade, soma dos IDs, soma de
+# cada métrica de METRICAS] (identifica o conjunto de colheitas e os seus
+# valores ao restaurar esboços gravados)
+assinatura_esbocos = [0, 0] + [0.0] * len(METRICAS)
+
+
+def _acumular_assinatura(assinatura, colheita):
+    """Soma uma colheita a uma assinatura (mesma ordem de soma na gravação e na carga)"""
+    assinatura[0] += 1
+    assinatura[1] += colheita['id']
+    for posicao, metrica in enumerate(METRICAS, 2):
+        assinatura[posicao] += colheita[metrica]
+
+
+def calcular_assinatura(lista_colheitas):
+    """
+    Calcula a assinatura de um conjunto de colheitas
+
+    Parâmetro:
+        lista_colheitas (iterable): colheitas carregadas
+
+    Retorna:
+        list: [quantidade, soma dos IDs, soma de cada métrica]
+    """
+    assinatura = [0, 0] + [0.0] * len(METRICAS)
+    for colheita in lista_colheitas:
+        _acumular_assinatura(assinatura, colheita)
+    return assinatura
+
+
+def incluir_colheita(colheita):
+    """
+    Inclui uma colheita nos esboços de cada métrica e agrupamento
+
+    Parâmetro:
+        colheita (dict): colheita registrada
+    """
+    for dimensao in DIMENSOES_QUANTIS:
+        grupo = colheita[dimensao]
+        for metrica in METRICAS:
+            chave = (metrica, dimensao, grupo)
+            esboco = esbocos.get(chave)
+            if esboco is None:
+                esboco = esbocos[chave] = EsbocoQuantis()
+            esboco.adicionar(colheita[metrica])
+    _acumular_assinatura(assinatura_esbocos, colheita)
+
+
+def limpar_esbocos():
+    """
+    Descarta todos os esboços
+    """
+    esbocos.clear()
+    assinatura_esbocos[:] = [0, 0] + [0.0] * len(METRICAS)
+
+
+def mesclar_esbocos(outros, assinatura=None):
+    """
+    Mescla esboços calculados separadamente nos esboços globais
+
+    Parâmetros:
+        outros (dict): (métrica, dimensão, valor) -> EsbocoQuantis
+        assinatura (list): assinatura das colheitas dos outros esboços (calcular_assinatura)
+    """
+    for chave, outro in outros.items():
+        esboco = esbocos.get(chave)
+        if esboco is None:
+            esboco = esbocos[chave] = EsbocoQuantis(outro.k)
+        esboco.mesclar(outro)
+    if assinatura is not None:
+        for posicao, valor in enumerate(assinatura):
+            assinatura_esbocos[posicao] += valor
+
+
+def obter_percentis(metrica, dimensao, grupo, percentis=PERCENTIS):
+    """
+    Estima percentis de uma métrica em um grupo
+
+    Parâmetros:
+        metrica (str): 'percentual_perda_total' ou 'produtividade'
+        dimensao (str): 'tipo_colheita' ou 'variedade'
+        grupo (str): valor da dimensão (ex: 'manual', 'RB867515')
+        percentis (tuple): percentis desejados (0 a 100)
+
+    Retorna:
+        dict: percentil -> valor estimado, ou None se não houver dados
+    """
+    esboco = esbocos.get((metrica, dimensao, grupo))
+    if esboco is None or not esboco.n:
+        return None
+    return dict(zip(percentis, esboco.quantis(p / 100 for p in percentis)))
+
+
+def resumo_percentis(dimensao, percentis=PERCENTIS):
+    """
+    Estima os percentis de todas as métricas para cada grupo de uma dimensão
+
+    Parâmetros:
+        dimensao (str): 'tipo_colheita' ou 'variedade'
+        percentis (tuple): percentis desejados (0 a 100)
+
+    Retorna:
+        dict: grupo -> {métrica: {percentil: valor}}, em ordem de grupo
+    """
+    grupos = sorted({g for (_, d, g) in esbocos if d == dimensao})
+    return {
+        grupo: {metrica: obter_percentis(metrica, dimensao, grupo, percentis) for metrica in METRICAS}
+        for grupo in grupos
+    }
+
+
+def exportar_esbocos():
+    """
+    Converte os esboços em estrutura serializável (JSON)
+
+    Retorna:
+        dict: assinatura das colheitas e lista de esboços
+    """
+    return {
+        'assinatura': list(assinatura_esbocos),
+        'esbocos': [
+            {'metrica': metrica, 'dimensao': dimensao, 'grupo': grupo, 'esboco': esboco.to_dict()}
+            for (metrica, dimensao, grupo), esboco in esbocos.items()
+        ],
+    }
+
+
+def restaurar_esbocos(dados, assinatura):
+    """
+    Substitui os esboços pelos gravados, se corresponderem às colheitas carregadas
+
+    Parâmetros:
+        dados (dict): estrutura gerada por exportar_esbocos
+        assinatura (list): assinatura das colheitas carregadas (calcular_assinatura)
+
+    Retorna:
+        bool: True se restaurados; False se ausentes ou desatualizados
+    """
+    if not dados or tuple(dados.get('assinatura', ())) != tuple(assinatura):
+        return False
+
+    limpar_esbocos()
+    try:
+        for item in dados['esbocos']:
+            chave = (item['metrica'], item['dimensao'], item['grupo'])
+            esbocos[chave] = EsbocoQuantis.from_dict(item['esboco'])
+    except (KeyError, TypeError) as e:
+        print(f"⚠️ Esboços de percentis inválidos ({e}); serão recalculados")
+        limpar_esbocos()
+        return False
+    assinatura_esbocos[:] = assinatura
+    return True
@@ -0,0 +1,212 @@
+"""
+Registros compactos de fazendas, talhões e colheitas
+Classes com __slots__: cada campo ocupa uma posição fixa no objeto, sem o
+dicionário interno de uma instância comum
+
+Os registros aceitam acesso no estilo dicionário (registro['campo'],
+'campo' in registro, get, items, copy...) para que o restante do sistema
+continue funcionando sem alterações. to_dict/from_dict fazem a conversão
+para gravação em JSON e leitura do JSON/banco de dados.
+"""
+
+import time
+from collections.abc import MutableMapping
+from datetime import datetime
+from modulos.categorias import internar, internar_colheita
+
+
+# Campos de cada registro (mesma ordem dos antigos dicionários)
+CAMPOS_FAZENDA = (
+    'id', 'nome', 'proprietario', 'documento', 'tipo_documento',
+    'localizacao', 'area_total', 'talhoes', 'data_cadastro'
+)
+
+CAMPOS_TALHAO = (
+    'codigo', 'area', 'variedade', 'ano_plantio', 'coordenadas',
+    'idade_anos', 'status'
+)
+
+CAMPOS_COLHEITA = (
+    'id', 'id_fazenda', 'nome_fazenda', 'codigo_talhao', 'data_colheita',
+    'data_ordinal', 'data_registro', 'tipo_colheita', 'area_colhida',
+    'variedade', 'quantidade_colhida', 'quantidade_perdida', 'produtividade',
+    'perdas_detalhadas', 'resumo_perdas', 'percentual_perda_total', 'status'
+)
+
+# Último carimbo de data/hora gerado: [segundo (epoch), texto formatado]
+_ultimo_carimbo = [None, '']
+
+
+def carimbo_agora():
+    """
+    Retorna a data/hora atual no formato DD/MM/AAAA HH:MM:SS
+    O texto é reaproveitado enquanto o segundo não muda, evitando um
+    strftime por registro em cadastros em lote
+
+    Retorna:
+        str: data/hora formatada
+    """
+    segundo = int(time.time())
+    if segundo != _ultimo_carimbo[0]:
+        _ultimo_carimbo[0] = segundo
+        _ultimo_carimbo[1] = datetime.fromtimestamp(segundo).strftime('%d/%m/%Y %H:%M:%S')
+    return _ultimo_carimbo[1]
+
+
+class Registro(MutableMapping):
+    """
+    Base dos registros com __slots__ e interface de dicionário
+    Campos fora de CAMPOS ficam em um dicionário auxiliar (_extras),
+    criado apenas quando necessário
+    """
+
+    __slots__ = ('_extras',)
+    CAMPOS = ()
+    _CONJUNTO_CAMPOS = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._CONJUNTO_CAMPOS = frozenset(cls.CAMPOS)
+
+    def __init__(self, **campos):
+        for campo, valor in campos.items():
+            self[campo] = valor
+
+    # ---------- Interface de dicionário ----------
+
+    def __getitem__(self, campo):
+        try:
+            if campo in self._CONJUNTO_CAMPOS:
+                return getattr(self, campo)
+            return self._extras[campo]
+        except (AttributeError, TypeError):
+            raise KeyError(campo) from None
+
+    def __setitem__(self, campo, valor):
+        if campo in self._CONJUNTO_CAMPOS:
+            setattr(self, campo, valor)
+        else:
+            if not hasattr(self, '_extras'):
+                self._extras = {}
+            self._extras[campo] = valor
+
+    def __delitem__(self, campo):
+        try:
+            if campo in self._CONJUNTO_CAMPOS:
+                delattr(self, campo)
+            else:
+                del self._extras[campo]
+        except (AttributeError, TypeError):
+            raise KeyError(campo) from None
+
+    def __iter__(self):
+        for campo in self.CAMPOS:
+            if hasattr(self, campo):
+                yield campo
+        yield from getattr(self, '_extras', ())
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def copy(self):
+        """Retorna uma cópia rasa do registro como dicionário"""
+        return self.to_dict()
+
+    # ---------- Conversão ----------
+
+    def to_dict(self):
+        """
+        Converte o registro em dicionário (para gravação em JSON)
+
+        Retorna:
+            dict: dicionário com os campos do registro
+        """
+        return dict(self.items())
+
+    @classmethod
+    def from_dict(cls, dados):
+        """
+        Cria um registro a partir de um dicionário (JSON ou banco de dados)
+
+        Parâmetro:
+            dados (dict): dicionário com os campos
+
+        Retorna:
+            Registro: registro criado
+        """
+        registro = cls.__new__(cls)
+        for campo, valor in dados.items():
+            registro[campo] = valor
+        return registro
+
+
+class Talhao(Registro):
+    """Talhão de uma fazenda"""
+
+    __slots__ = CAMPOS_TALHAO
+    CAMPOS = CAMPOS_TALHAO
+
+    @classmethod
+    def from_dict(cls, dados):
+        talhao = super().from_dict(dados)
+        # JSON não tem tuplas: coordenadas voltam como lista
+        if isinstance(talhao.get('coordenadas'), list):
+            talhao['coordenadas'] = tuple(talhao['coordenadas'])
+        if 'variedade' in talhao:
+            talhao['variedade'] = internar(talhao['variedade'])
+        return talhao
+
+
+class Fazenda(Registro):
+    """Fazenda com sua lista de talhões"""
+
+    __slots__ = CAMPOS_FAZENDA
+    CAMPOS = CAMPOS_FAZENDA
+
+    def to_dict(self):
+        dados = super().to_dict()
+        if 'talhoes' in dados:
+            dados['talhoes'] = [para_dict(t) for t in dados['talhoes']]
+        return dados
+
+    @classmethod
+    def from_dict(cls, dados):
+        fazenda = super().from_dict(dados)
+        if 'talhoes' in fazenda:
+            fazenda['talhoes'] = [
+                t if isinstance(t, Talhao) else Talhao.from_dict(t)
+                for t in fazenda['talhoes']
+            ]
+        return fazenda
+
+
+class Colheita(Registro):
+    """Colheita de um talhão"""
+
+    __slots__ = CAMPOS_COLHEITA
+    CAMPOS = CAMPOS_COLHEITA
+
+    @classmethod
+    def from_dict(cls, dados):
+        colheita = super().from_dict(dados)
+        # JSON não tem tuplas: resumo_perdas volta como lista de listas
+        # (internar_colheita reconstrói como tupla de tuplas)
+        return internar_colheita(colheita)
+
+
+def para_dict(registro):
+    """
+    Converte um registro (ou dicionário) em dicionário comum
+
+    Parâmetro:
+        registro: Registro ou dict
+
+    Retorna:
+        dict: dicionário serializável
+    """
+    if isinstance(registro, Registro):
+        return registro.to_dict()
+    return registro
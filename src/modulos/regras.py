@@ -0,0 +1,371 @@
+"""
+Motor de regras de recomendação
+Estruturas de dados: regras como dados (config.REGRAS_RECOMENDACAO)
+
+As regras são compiladas uma única vez na importação: cada condição
+(campo, operador, limite) vira uma função de leitura do campo e uma função
+de comparação. A avaliação pode ser feita para uma colheita
+(recomendar) ou para todas de uma vez (avaliar_lote), que usa NumPy
+quando disponível: cada condição é comparada sobre a coluna inteira do
+campo. contar_regras_por_fazenda resume quais regras disparam em cada
+fazenda.
+
+As mensagens de cada colheita ficam em um cache LRU cuja chave são os
+campos lidos pelas regras e mensagens (perdas detalhadas, método,
+variedade, produtividade...) e a versão da tabela PRODUTIVIDADE_ESPERADA:
+colheitas com o mesmo conteúdo reaproveitam as mesmas mensagens.
+"""
+
+import math
+import operator
+import string
+
+try:
+    import numpy as np  # type: ignore  # Importação opcional
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    NUMPY_DISPONIVEL = False
+
+from modulos.cache import CacheLRU
+from modulos.colunar import ArmazemColunar
+from config import (REGRAS_RECOMENDACAO, RECOMENDACOES_PADRAO, PRODUTIVIDADE_ESPERADA,
+                    TIPOS_PERDA, TAMANHO_CACHE_RECOMENDACOES)
+
+
+# Operadores aceitos nas condições
+OPERADORES = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# Identificador das recomendações padrão (nenhuma regra disparou)
+ID_PADRAO = 'padrao'
+
+
+def _leitor_campo(campo):
+    """
+    Cria a função que lê o valor de um campo de uma colheita
+
+    Parâmetro:
+        campo (str): campo da regra ('perdas.<tipo>', 'produtividade_relativa'
+                     ou campo da colheita)
+
+    Retorna:
+        function: colheita -> valor (None se ausente)
+    """
+    if campo.startswith('perdas.'):
+        tipo = campo[len('perdas.'):]
+        return lambda colheita: colheita['perdas_detalhadas'].get(tipo)
+
+    if campo == 'produtividade_relativa':
+        def produtividade_relativa(colheita):
+            esperado = PRODUTIVIDADE_ESPERADA.get(colheita['variedade'])
+            if not esperado:
+                return None
+            return colheita['produtividade'] / esperado
+        return produtividade_relativa
+
+    return lambda colheita: colheita.get(campo)
+
+
+def compilar_regras(regras):
+    """
+    Compila as regras em tuplas prontas para avaliação
+
+    Parâmetro:
+        regras (tuple): regras no formato de config.REGRAS_RECOMENDACAO
+
+    Retorna:
+        list: tuplas (id, grupo, condições, mensagens), onde cada condição
+              é (campo, leitor, comparação, limite)
+    """
+    compiladas = []
+    for regra in regras:
+        condicoes = []
+        for campo, simbolo, limite in regra['condicoes']:
+            if simbolo not in OPERADORES:
+                raise ValueError(f"Operador inválido na regra '{regra['id']}': {simbolo}")
+            condicoes.append((campo, _leitor_campo(campo), OPERADORES[simbolo], limite))
+        compiladas.append((regra['id'], regra.get('grupo'), tuple(condicoes), tuple(regra['mensagens'])))
+    return compiladas
+
+
+# Regras compiladas (uma vez, na importação)
+regras_compiladas = compilar_regras(REGRAS_RECOMENDACAO)
+
+# Mensagens por ID de regra (inclui as recomendações padrão)
+MENSAGENS_REGRAS = {id_regra: mensagens for id_regra, _, _, mensagens in regras_compiladas}
+MENSAGENS_REGRAS[ID_PADRAO] = RECOMENDACOES_PADRAO
+
+
+def campos_usados(regras, mensagens):
+    """
+    Lista os campos da colheita lidos pelas regras e pelas mensagens
+
+    Parâmetros:
+        regras (list): regras compiladas
+        mensagens (dict): ID da regra -> mensagens
+
+    Retorna:
+        tuple: nomes dos campos, em ordem alfabética
+    """
+    campos = set()
+    for _, _, condicoes, _ in regras:
+        for campo, _, _, _ in condicoes:
+            if campo.startswith('perdas.'):
+                campos.add('perdas_detalhadas')
+            elif campo == 'produtividade_relativa':
+                campos.update(('produtividade', 'variedade'))
+            else:
+                campos.add(campo)
+    for textos in mensagens.values():
+        for texto in textos:
+            for _, nome, _, _ in string.Formatter().parse(texto):
+                if nome:
+                    campos.add(nome)
+    return tuple(sorted(campos))
+
+
+# Campos que compõem a chave do cache de recomendações
+CAMPOS_CHAVE = campos_usados(regras_compiladas, MENSAGENS_REGRAS)
+
+# Cache LRU das mensagens de recomendação
+cache_recomendacoes = CacheLRU('recomendacoes', TAMANHO_CACHE_RECOMENDACOES)
+
+
+def versao_produtividade():
+    """
+    Retorna a versão (hash do conteúdo) da tabela PRODUTIVIDADE_ESPERADA
+
+    Retorna:
+        int: muda sempre que a tabela é alterada
+    """
+    return hash(tuple(sorted(PRODUTIVIDADE_ESPERADA.items())))
+
+
+def chave_recomendacao(colheita):
+    """
+    Monta a chave de conteúdo de uma colheita para o cache de recomendações
+
+    Parâmetro:
+        colheita (dict): colheita a avaliar
+
+    Retorna:
+        tuple: versão da tabela de produtividade e valores de CAMPOS_CHAVE
+    """
+    chave = [versao_produtividade()]
+    for campo in CAMPOS_CHAVE:
+        valor = colheita.get(campo)
+        if campo == 'perdas_detalhadas':
+            valor = tuple(sorted(valor.items()))
+        chave.append(valor)
+    return tuple(chave)
+
+
+def avaliar_regras(colheita):
+    """
+    Avalia as regras para uma colheita
+
+    Parâmetro:
+        colheita (dict): colheita a avaliar
+
+    Retorna:
+        list: IDs das regras disparadas, na ordem das regras
+              ([ID_PADRAO] se nenhuma disparar)
+    """
+    disparadas = []
+    grupos_disparados = set()
+
+    for id_regra, grupo, condicoes, _ in regras_compiladas:
+        if grupo is not None and grupo in grupos_disparados:
+            continue
+        for _, ler, comparar, limite in condicoes:
+            valor = ler(colheita)
+            if valor is None or not comparar(valor, limite):
+                break
+        else:
+            disparadas.append(id_regra)
+            if grupo is not None:
+                grupos_disparados.add(grupo)
+
+    return disparadas or [ID_PADRAO]
+
+
+def mensagens_regras(ids_regras, colheita):
+    """
+    Monta as mensagens das regras disparadas
+
+    Parâmetros:
+        ids_regras (list): IDs das regras disparadas
+        colheita (dict): colheita (campos usados nas mensagens com {campo})
+
+    Retorna:
+        list: mensagens de recomendação
+    """
+    recomendacoes = []
+    for id_regra in ids_regras:
+        for mensagem in MENSAGENS_REGRAS[id_regra]:
+            recomendacoes.append(mensagem.format_map(colheita) if '{' in mensagem else mensagem)
+    return recomendacoes
+
+
+def recomendar(colheita):
+    """
+    Gera as recomendações de uma colheita a partir das regras
+    (reaproveita as mensagens de colheitas com o mesmo conteúdo)
+
+    Parâmetro:
+        colheita (dict): colheita a avaliar
+
+    Retorna:
+        list: lista de recomendações (strings)
+    """
+    chave = chave_recomendacao(colheita)
+    mensagens = cache_recomendacoes.obter(chave)
+    if mensagens is None:
+        mensagens = tuple(mensagens_regras(avaliar_regras(colheita), colheita))
+        cache_recomendacoes.guardar(chave, mensagens)
+    return list(mensagens)
+
+
+def recomendar_lote(lista_colheitas):
+    """
+    Gera as recomendações de várias colheitas (relatórios em lote)
+
+    Parâmetro:
+        lista_colheitas: lista de colheitas ou ArmazemColunar
+
+    Retorna:
+        list: pares (colheita, lista de recomendações), na ordem da lista
+    """
+    return [(colheita, recomendar(colheita)) for colheita in lista_colheitas]
+
+
+# ---------- Avaliação em lote ----------
+
+def _coluna_regra(lista_colheitas, campo, leitor, textual):
+    """
+    Monta a coluna (array NumPy) de um campo para todas as colheitas
+    No armazém colunar, lê as colunas diretamente
+
+    Parâmetros:
+        lista_colheitas: lista de colheitas ou ArmazemColunar
+        campo (str): campo da regra
+        leitor (function): função de leitura do campo
+        textual (bool): True para campos de texto (array de objetos)
+
+    Retorna:
+        tuple: (valores, presentes) — array de valores e máscara de valores existentes
+    """
+    if isinstance(lista_colheitas, ArmazemColunar):
+        armazem = lista_colheitas
+        if campo.startswith('perdas.') and campo[len('perdas.'):] in TIPOS_PERDA:
+            valores = np.array(armazem.perdas[campo[len('perdas.'):]], dtype=np.float64)
+            return valores, ~np.isnan(valores)
+        if campo in armazem.numericos:
+            valores = np.array(armazem.numericos[campo], dtype=np.float64)
+            return valores, np.ones(len(valores), dtype=bool)
+        if campo in armazem.codigos:
+            tabela = np.array(armazem.categorias[campo] + [None], dtype=object)
+            valores = tabela[np.array(armazem.codigos[campo], dtype=np.intp)]
+            return valores, np.ones(len(valores), dtype=bool)
+        if campo == 'produtividade_relativa':
+            esperado = np.array([PRODUTIVIDADE_ESPERADA.get(v) or math.nan
+                                 for v in armazem.categorias['variedade']], dtype=np.float64)
+            valores = (np.array(armazem.numericos['produtividade'], dtype=np.float64)
+                       / esperado[np.array(armazem.codigos['variedade'], dtype=np.intp)])
+            return valores, ~np.isnan(valores)
+
+    lidos = [leitor(colheita) for colheita in lista_colheitas]
+    if textual:
+        valores = np.array(lidos + [None], dtype=object)[:-1]
+        return valores, np.array([v is not None for v in lidos], dtype=bool)
+    valores = np.array([math.nan if v is None else v for v in lidos], dtype=np.float64)
+    return valores, ~np.isnan(valores)
+
+
+def _avaliar_lote_numpy(lista_colheitas):
+    """Avaliação em lote vetorizada (uma comparação por condição sobre a coluna)"""
+    n = len(lista_colheitas)
+    colunas = {}
+    disparos = {}
+    grupos_disparados = {}
+    alguma = np.zeros(n, dtype=bool)
+
+    for id_regra, grupo, condicoes, _ in regras_compiladas:
+        mascara = np.ones(n, dtype=bool)
+        for campo, leitor, comparar, limite in condicoes:
+            textual = isinstance(limite, str)
+            if (campo, textual) not in colunas:
+                colunas[(campo, textual)] = _coluna_regra(lista_colheitas, campo, leitor, textual)
+            valores, presentes = colunas[(campo, textual)]
+            mascara &= presentes & np.asarray(comparar(valores, limite), dtype=bool)
+
+        if grupo is not None:
+            anteriores = grupos_disparados.setdefault(grupo, np.zeros(n, dtype=bool))
+            mascara &= ~anteriores
+            anteriores |= mascara
+
+        disparos[id_regra] = np.flatnonzero(mascara).tolist()
+        alguma |= mascara
+
+    disparos[ID_PADRAO] = np.flatnonzero(~alguma).tolist()
+    return disparos
+
+
+def avaliar_lote(lista_colheitas):
+    """
+    Avalia as regras para todas as colheitas de uma vez
+
+    Parâmetro:
+        lista_colheitas: lista de colheitas ou ArmazemColunar
+
+    Retorna:
+        dict: ID da regra -> posições (índices na lista) das colheitas em
+              que disparou; ID_PADRAO reúne as colheitas sem nenhuma regra
+    """
+    if NUMPY_DISPONIVEL and len(lista_colheitas):
+        return _avaliar_lote_numpy(lista_colheitas)
+
+    disparos = {id_regra: [] for id_regra in MENSAGENS_REGRAS}
+    for posicao, colheita in enumerate(lista_colheitas):
+        for id_regra in avaliar_regras(colheita):
+            disparos[id_regra].append(posicao)
+    return disparos
+
+
+def contar_regras_por_fazenda(lista_colheitas):
+    """
+    Conta quantas vezes cada regra disparou em cada fazenda
+
+    Parâmetro:
+        lista_colheitas: lista de colheitas ou ArmazemColunar
+
+    Retorna:
+        dict: id_fazenda -> {ID da regra: quantidade de colheitas}
+    """
+    if isinstance(lista_colheitas, ArmazemColunar):
+        fazendas_colheitas = lista_colheitas.coluna('id_fazenda')
+    else:
+        fazendas_colheitas = [colheita['id_fazenda'] for colheita in lista_colheitas]
+
+    contagem = {}
+    disparos = avaliar_lote(lista_colheitas)
+
+    if NUMPY_DISPONIVEL and len(lista_colheitas):
+        fazendas_colheitas = np.asarray(fazendas_colheitas, dtype=np.int64)
+        for id_regra, posicoes in disparos.items():
+            ids, quantidades = np.unique(fazendas_colheitas[posicoes], return_counts=True)
+            for id_fazenda, quantidade in zip(ids.tolist(), quantidades.tolist()):
+                contagem.setdefault(id_fazenda, {})[id_regra] = quantidade
+        return contagem
+
+    for id_regra, posicoes in disparos.items():
+        for posicao in posicoes:
+            por_regra = contagem.setdefault(fazendas_colheitas[posicao], {})
+            por_regra[id_regra] = por_regra.get(id_regra, 0) + 1
+    return contagem